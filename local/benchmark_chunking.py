@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from job import Job, job_chunks_from_job
+from chunking import chunk_frame_range, chunk_frame_ranges, chunk_frame_range_by_cost, longest_processing_time_order, chunk_costs
+from simulator import SimulationConfig, simulate_chunks, simulate_queue, benchmark_profiles
+
+
+def make_job(start_frame: int, end_frame: int, concurrency: int) -> Job:
+    return Job(
+        job_name="benchmark",
+        session_id="benchmark",
+        render_node_concurrency_target=concurrency,
+        render_engine="CYCLES",
+        blend_file_path="benchmark.blend",
+        camera_name="Camera",
+        overall_start_frame=start_frame,
+        overall_end_frame=end_frame,
+        width=1920,
+        height=1080,
+        render_max_samples=2048,
+        render_adaptive_threshold=0.06,
+        eco_mode_enabled=False,
+        min_chunk_size=3,
+        max_chunk_size=72
+    )
+
+
+def quietly(fn, *args, **kwargs):
+    # The chunkers print their splits, which would drown the table.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def strategies(job: Job, frame_costs: list[float]) -> dict:
+    start, end, concurrency = job.overall_start_frame, job.overall_end_frame, job.render_node_concurrency_target
+
+    def static(total_chunk_target):
+        chunks = quietly(job_chunks_from_job, job, total_chunk_target=total_chunk_target)
+        return [(chunk.chunk_start_frame, chunk.chunk_end_frame) for chunk in chunks]
+
+    equal_chunks = static(concurrency * 2)
+    weighted = chunk_frame_range_by_cost(start, end, frame_costs, chunk_count=len(equal_chunks), min_chunk_size=job.min_chunk_size, max_chunk_size=job.max_chunk_size)
+    weighted = longest_processing_time_order(weighted, chunk_costs(weighted, start, frame_costs))
+    multi_camera = [(chunk_start, chunk_end) for _, chunk_start, chunk_end, _ in quietly(chunk_frame_ranges, [("Camera", start, end)], concurrency)]
+
+    return {
+        "static x1": ("chunks", static(concurrency)),
+        "static x2 (current)": ("chunks", equal_chunks),
+        "static x4": ("chunks", static(concurrency * 4)),
+        "chunk_frame_ranges": ("chunks", multi_camera),
+        "cost-weighted LPT": ("chunks", weighted),
+        "queue batch=1": ("queue", chunk_frame_range(start, end, 1)),
+        "queue batch=2": ("queue", chunk_frame_range(start, end, 2)),
+        "queue batch=4": ("queue", chunk_frame_range(start, end, 4)),
+    }
+
+
+def main():
+    """
+    python benchmark_chunking.py [frame_count] [concurrency]
+
+    Replays each chunking strategy against the canned cost profiles and prints makespan, billed GPU time and idle time.
+    """
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    config = SimulationConfig()
+    job = make_job(1, frame_count, concurrency)
+    print(f"{frame_count} frames, concurrency {concurrency}, {config}")
+
+    for profile_name, frame_costs in benchmark_profiles(frame_count).items():
+        print(f"\n== {profile_name}: {sum(frame_costs) / 3600:.1f} GPU-hours of frames ==")
+        print(f"{'strategy':<22}{'inputs':>8}{'makespan':>12}{'GPU-hours':>12}{'idle':>8}")
+        for name, (kind, ranges) in strategies(job, frame_costs).items():
+            if kind == "queue":
+                result = simulate_queue(ranges, 1, frame_costs, workers=concurrency, config=config)
+            else:
+                result = simulate_chunks(ranges, 1, frame_costs, config)
+            idle_share = result.idle_seconds() / result.gpu_seconds
+            print(f"{name:<22}{len(ranges):>8}{result.makespan / 60:>10.1f}m{result.gpu_seconds / 3600:>12.2f}{idle_share:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import LocalDirectoryStorage
+from download import FrameDownloader, summarize_downloads
+
+
+class SlowStorage(LocalDirectoryStorage):
+    """Local stand-in for the Volume that adds per-request latency, like a remote read would."""
+
+    def __init__(self, root: Path, latency_seconds: float):
+        super().__init__(root)
+        self.latency_seconds = latency_seconds
+
+    def read_stream(self, path, offset=0):
+        time.sleep(self.latency_seconds)
+        yield from super().read_stream(path, offset)
+
+
+def make_frames(storage_root: Path, frame_count: int, frame_bytes: int):
+    frames_dir = storage_root / "session" / "frames"
+    frames_dir.mkdir(parents=True)
+    for frame in range(1, frame_count + 1):
+        (frames_dir / f"job_{frame:04d}.exr").write_bytes(os.urandom(frame_bytes))
+
+
+def main():
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frame_bytes = 2 * 1024 * 1024
+    latency_seconds = 0.05
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage_root = Path(tmp) / "volume"
+        make_frames(storage_root, frame_count, frame_bytes)
+        storage = SlowStorage(storage_root, latency_seconds)
+
+        for workers in (1, 4, 16):
+            local_dir = Path(tmp) / f"download_{workers}"
+            started_at = time.monotonic()
+            results = FrameDownloader(storage, "session/frames", local_dir, workers=workers).download_all()
+            elapsed = time.monotonic() - started_at
+            print(f"workers={workers}: {frame_count} frames in {elapsed:.2f}s ({frame_count / elapsed:.1f} frames/s)")
+            summarize_downloads(results)
+
+        # Second pass over an existing mirror should only compare sizes.
+        started_at = time.monotonic()
+        results = FrameDownloader(storage, "session/frames", Path(tmp) / "download_16", workers=16).download_all()
+        print(f"Re-run over complete mirror: {time.monotonic() - started_at:.2f}s")
+        summarize_downloads(results)
+
+        # Simulate an interrupted transfer and resume it.
+        resumed_dir = Path(tmp) / "download_16"
+        victim = resumed_dir / "job_0001.exr"
+        data = victim.read_bytes()
+        victim.unlink()
+        (resumed_dir / "job_0001.exr.part").write_bytes(data[:len(data) // 2])
+        summarize_downloads(FrameDownloader(storage, "session/frames", resumed_dir, workers=16).download_all())
+        assert victim.read_bytes() == data, "Resumed frame doesn't match the original"
+
+
+if __name__ == "__main__":
+    main()
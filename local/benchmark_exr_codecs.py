@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from regions import read_tile
+
+CODECS = ["NONE", "ZIP", "ZIPS", "PIZ", "PXR24", "B44", "DWAA", "DWAB"]
+DEPTHS = {"16": "HALF", "32": "FLOAT"}
+
+
+def sample_frame(width: int, height: int):
+    """Float RGB buffer with smooth gradients, render-like noise and a few HDR highlights."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.stack([x / width, y / height, 0.5 + 0.5 * np.sin(x / 37.0) * np.cos(y / 23.0)], axis=-1)
+    frame *= 1.0 + 0.05 * rng.standard_normal(frame.shape).astype(np.float32)
+    for _ in range(20):
+        cx, cy, radius = rng.integers(0, width), rng.integers(0, height), rng.integers(5, 40)
+        frame[(x - cx) ** 2 + (y - cy) ** 2 < radius ** 2] *= 50.0
+    return np.clip(frame, 0.0, None).astype(np.float32)
+
+
+def write_exr(frame, path: Path, codec: str, pixel_type: str, dwa_quality: float):
+    import numpy as np
+    import OpenEXR
+    import Imath
+
+    height, width, channel_count = frame.shape
+    channel_names = ["R", "G", "B", "A"][:channel_count]
+    dtype = np.float16 if pixel_type == "HALF" else np.float32
+    header = OpenEXR.Header(width, height)
+    header["channels"] = {name: Imath.Channel(Imath.PixelType(getattr(Imath.PixelType, pixel_type))) for name in channel_names}
+    header["compression"] = Imath.Compression(getattr(Imath.Compression, f"{codec}_COMPRESSION" if codec != "NONE" else "NO_COMPRESSION"))
+    if codec in ("DWAA", "DWAB"):
+        header["dwaCompressionLevel"] = float(dwa_quality)
+    exr = OpenEXR.OutputFile(str(path), header)
+    exr.writePixels({name: np.ascontiguousarray(frame[:, :, i], dtype=dtype).tobytes() for i, name in enumerate(channel_names)})
+    exr.close()
+
+
+def main():
+    """
+    python benchmark_exr_codecs.py [frame.exr] [--width 3840 --height 2160 --dwa-quality 45]
+
+    Compares file size, encode/decode time and numeric error of the EXR codecs exr_codec in jobs.ini offers,
+    at half and full float, on a rendered frame or a synthetic one.
+    """
+    import numpy as np
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("frame", nargs="?", type=Path, help="EXR to use as the sample buffer, a synthetic frame otherwise")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--dwa-quality", type=float, default=45)
+    args = parser.parse_args()
+
+    frame = np.array(read_tile(args.frame)[:, :, :3]) if args.frame else sample_frame(args.width, args.height)
+    height, width, _ = frame.shape
+    print(f"Sample buffer {width}x{height}, {frame.nbytes / 1024 ** 2:.0f} MB as float32\n")
+    print(f"{'codec':>6} {'depth':>5} {'size MB':>8} {'ratio':>6} {'encode s':>9} {'decode s':>9} {'max rel err':>12} {'mean abs err':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in CODECS:
+            for depth, pixel_type in DEPTHS.items():
+                path = Path(tmp) / f"{codec}_{depth}.exr"
+                started_at = time.perf_counter()
+                write_exr(frame, path, codec, pixel_type, args.dwa_quality)
+                encode_seconds = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                decoded = read_tile(path)
+                decode_seconds = time.perf_counter() - started_at
+
+                error = np.abs(decoded - frame)
+                relative_error = error / np.maximum(np.abs(frame), 1e-3)
+                size = path.stat().st_size
+                print(f"{codec:>6} {depth:>5} {size / 1024 ** 2:8.1f} {frame.nbytes / size:6.1f} {encode_seconds:9.2f} {decode_seconds:9.2f} "
+                      f"{relative_error.max():12.2e} {error.mean():13.2e}")
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from benchmark_chunking import make_job
+from job import job_chunks_from_job
+from planner import candidate_plans, pareto_front, choose_plan, print_plans
+from simulator import SimulationConfig, simulate_chunks, benchmark_profiles
+
+
+def hand_picked(frame_count: int, concurrency: int, frame_costs: list[float], config: SimulationConfig):
+    """What main.py does without a plan: the job's concurrency and twice as many chunks."""
+    job = make_job(1, frame_count, concurrency)
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunks = [(chunk.chunk_start_frame, chunk.chunk_end_frame) for chunk in job_chunks_from_job(job, total_chunk_target=concurrency * 2)]
+    capped = SimulationConfig(config.cold_start_seconds, config.scene_load_seconds, concurrency, config.scaledown_seconds)
+    return len(chunks), simulate_chunks(chunks, 1, frame_costs, capped)
+
+
+def main():
+    """
+    python benchmark_planner.py [frame_count] [max_containers] [hand_picked_concurrency]
+
+    Prints the Pareto front of (wall clock, GPU hours) for the canned cost profiles, the plans picked for a few
+    deadlines and budgets, and where the hand-picked concurrency with doubled chunk target lands against the front.
+    """
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    max_containers = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    config = SimulationConfig(max_containers=max_containers)
+    print(f"{frame_count} frames, {config}")
+
+    for profile_name, frame_costs in benchmark_profiles(frame_count).items():
+        print(f"\n== {profile_name}: {sum(frame_costs) / 3600:.1f} GPU-hours of frames ==")
+        plans = candidate_plans([(1, frame_count)], 1, frame_costs, config, min_chunk_size=3, max_chunk_size=72)
+        front = pareto_front(plans)
+        for plan in front:
+            assert not any(other.makespan <= plan.makespan and other.gpu_seconds <= plan.gpu_seconds and (other.makespan, other.gpu_seconds) != (plan.makespan, plan.gpu_seconds)
+                           for other in plans), f"{plan} is dominated"
+
+        fastest, cheapest = front[0], front[-1]
+        deadline = (fastest.makespan + cheapest.makespan) / 2
+        budget = (fastest.gpu_seconds + cheapest.gpu_seconds) / 2
+        by_deadline = choose_plan(front, deadline_seconds=deadline)
+        by_budget = choose_plan(front, gpu_seconds_budget=budget)
+        assert by_deadline.makespan <= deadline and by_budget.gpu_seconds <= budget
+        print_plans(front, by_deadline)
+        print(f"Deadline {deadline / 60:.0f}m: {by_deadline}")
+        print(f"Budget {budget / 3600:.2f} GPU hours: {by_budget}")
+
+        chunk_count, result = hand_picked(frame_count, concurrency, frame_costs, config)
+        dominated_by = [plan for plan in front if plan.makespan <= result.makespan and plan.gpu_seconds <= result.gpu_seconds]
+        print(f"Hand-picked concurrency {concurrency} with {chunk_count} chunks: {result.makespan / 60:.1f}m, {result.gpu_seconds / 3600:.2f} GPU hours"
+              + (f", dominated by {len(dominated_by)} plans, eg. {dominated_by[-1]}" if dominated_by else ", on the front"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from benchmark_exr_codecs import sample_frame
+from postprocess import FfmpegEncoder, PostProcessPipeline, PreviewSettings, process_frame
+from regions import write_exr
+
+
+class NullEncoder:
+    """Stands in for ffmpeg: counts frames and checks they all have the same size."""
+
+    def __init__(self):
+        self.frames = 0
+        self.frame_size = None
+
+    def write(self, width: int, height: int, data: bytes):
+        assert self.frame_size in (None, (width, height)), "Frame size changed mid-video"
+        self.frame_size = (width, height)
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+def make_frames(directory: Path, job_name: str, count: int, width: int, height: int):
+    frame = sample_frame(width, height)
+    for i in range(1, count + 1):
+        write_exr(frame * (0.5 + i / count), directory / f"{job_name}_{i:04d}.exr")
+
+
+def deliver(source_dir: Path, frames_dir: Path, interval_seconds: float, stop_event: threading.Event, seed: int):
+    """Moves frames into `frames_dir` in a shuffled order, the way chunks finish out of order."""
+    paths = sorted(source_dir.iterdir())
+    random.Random(seed).shuffle(paths)
+    for path in paths:
+        time.sleep(interval_seconds)
+        temporary = frames_dir / f".{path.name}.tmp"
+        shutil.copyfile(path, temporary)
+        os.replace(temporary, frames_dir / path.name)
+    stop_event.set()
+
+
+def main():
+    """
+    python benchmark_postprocess.py [--frames 48 --width 1920 --height 1080 --workers 1,2,4 --ffmpeg]
+
+    Converts synthetic ACEScg EXRs with a single-threaded loop (the old ad-hoc script) and with the pipeline
+    at several pool sizes, then streams them in shuffled order to check the reorder buffer stays bounded.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=48)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, 4, os.cpu_count() or 4})))
+    parser.add_argument("--arrival-seconds", type=float, default=0.05, help="Gap between frames arriving in the streaming run")
+    parser.add_argument("--ffmpeg", action="store_true", help="Encode with ffmpeg instead of discarding the video frames")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir, previews_dir = Path(tmp) / "frames", Path(tmp) / "previews"
+        source_dir.mkdir()
+        previews_dir.mkdir()
+        make_frames(source_dir, "bench", args.frames, args.width, args.height)
+        settings = PreviewSettings(previews_dir)
+        print(f"{args.frames} synthetic {args.width}x{args.height} ACEScg frames, {os.cpu_count()} CPUs\n")
+
+        started_at = time.monotonic()
+        for path in sorted(source_dir.iterdir()):
+            process_frame(path, previews_dir / path.with_suffix(".png").name, settings)
+        baseline = args.frames / (time.monotonic() - started_at)
+        print(f"{'single-threaded':<20}{baseline:8.2f} fps")
+
+        def encoder(name: str):
+            return FfmpegEncoder(Path(tmp) / f"{name}.mp4", fps=24) if args.ffmpeg else NullEncoder()
+
+        for workers in (int(n) for n in args.workers.split(",")):
+            video = encoder(f"workers_{workers}")
+            stats = PostProcessPipeline(source_dir, "bench", 1, args.frames, settings, encoder=video, workers=workers).run()
+            print(f"{f'pipeline x{workers}':<20}{stats.frames_per_second():8.2f} fps ({stats.frames_per_second() / baseline:.2f}x), {stats}")
+            assert stats.frames == args.frames and not stats.missing, "Pipeline dropped frames"
+
+        frames_dir = Path(tmp) / "arriving"
+        frames_dir.mkdir()
+        stop_event = threading.Event()
+        workers = os.cpu_count() or 4
+        pipeline = PostProcessPipeline(frames_dir, "bench", 1, args.frames, settings, encoder=encoder("streaming"), workers=workers, max_buffered=4)
+        delivery = threading.Thread(target=deliver, args=(source_dir, frames_dir, args.arrival_seconds, stop_event, 0))
+        delivery.start()
+        stats = pipeline.run(stop_event, poll_seconds=0.05)
+        delivery.join()
+        print(f"\nstreaming, shuffled arrival every {args.arrival_seconds}s: {stats}")
+        assert stats.frames == args.frames and not stats.missing, "Streaming run dropped frames"
+        assert stats.peak_buffered_frames <= pipeline.max_buffered + 1, "Reorder buffer outgrew max_buffered"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chunking import chunk_frame_range, progressive_passes, spread_order
+from simulator import SimulationConfig, benchmark_profiles, coverage_time, simulate_frame_times
+
+
+def frame_orders(start: int, end: int, chunk_size: int, stride: int) -> list[list[int]]:
+    """Frames of each chunk in rendering order, chunks in dispatch order, like job_chunks_from_job_frames."""
+    chunks = chunk_frame_range(start, end, chunk_size)
+    if stride <= 1:
+        return [list(range(chunk_start, chunk_end + 1)) for chunk_start, chunk_end in chunks]
+    chunks = [chunks[i] for i in spread_order(len(chunks))]
+    return [[frame for first, last, step in progressive_passes(chunk_start, chunk_end, stride, start) for frame in range(first, last + 1, step)]
+            for chunk_start, chunk_end in chunks]
+
+
+def main():
+    """
+    python benchmark_progressive.py [--frames 600 --concurrency 10 --chunks-per-container 2 --strides 1,4,16]
+
+    Replays sequential and progressive frame order on the canned cost profiles and prints when the rendered frames
+    first cover the whole shot with gaps of at most 16, 8, 4 and 2 frames, next to the full makespan.
+    The defaults give chunks of 30 frames, longer than the largest stride, which is where progressive order helps.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--chunks-per-container", type=int, default=2, help="2 matches the static scheduler's chunk target")
+    parser.add_argument("--strides", default="1,4,16")
+    args = parser.parse_args()
+
+    config = SimulationConfig(max_containers=args.concurrency)
+    chunk_size = math.ceil(args.frames / (args.concurrency * args.chunks_per_container))
+    gaps = (16, 8, 4, 2)
+    print(f"{args.frames} frames, chunks of {chunk_size}, {args.concurrency} containers, {config}")
+    strides = [int(s) for s in args.strides.split(",")]
+    if max(strides) >= chunk_size:
+        print(f"WARNING: a stride of {max(strides)} doesn't fit in chunks of {chunk_size} frames, its first pass is one frame per "
+              f"chunk and it barely differs from sequential order. Use more frames or fewer containers.")
+
+    for profile_name, frame_costs in benchmark_profiles(args.frames).items():
+        print(f"\n== {profile_name} ==")
+        print(f"{'stride':<8}" + "".join(f"{f'gap<={gap}':>11}" for gap in gaps) + f"{'makespan':>11}")
+        for stride in strides:
+            frame_times = simulate_frame_times(frame_orders(1, args.frames, chunk_size, stride), 1, frame_costs, config)
+            assert sorted(frame_times) == list(range(1, args.frames + 1)), "Frames lost or rendered twice"
+            makespan = max(frame_times.values())
+            covered = [coverage_time(frame_times, 1, args.frames, gap) for gap in gaps]
+            print(f"{stride:<8}" + "".join(f"{seconds / 60:>10.1f}m" for seconds in covered) + f"{makespan / 60:>10.1f}m")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chunking import chunk_frame_range
+from simulator import SimulationConfig, simulate_speculation, benchmark_profiles
+from speculation import SpeculationPolicy
+
+
+def main():
+    """
+    python benchmark_speculation.py [--frames 300 --concurrency 20 --slow-containers 2 --slowdown 3 --max-gpu-hours 2]
+
+    Replays static chunks with a few slow containers, with and without speculative duplicates, and checks
+    that every frame still completes and duplicates stay within the GPU-seconds cap.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--slow-containers", type=int, default=2)
+    parser.add_argument("--slowdown", type=float, default=3.0, help="Cost multiplier of a slow container")
+    parser.add_argument("--max-gpu-hours", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # One chunk per container, the case where a single slow container sets the makespan.
+    chunks = chunk_frame_range(1, args.frames, math.ceil(args.frames / args.concurrency))
+    config = SimulationConfig(max_containers=args.concurrency + args.slow_containers)
+    policy = SpeculationPolicy(max_speculative_gpu_seconds=args.max_gpu_hours * 60 * 60,
+                               duplicate_startup_seconds=config.cold_start_seconds + config.scene_load_seconds)
+    slowdowns = {index: args.slowdown for index in random.Random(args.seed).sample(range(len(chunks)), args.slow_containers)}
+    print(f"{args.frames} frames in {len(chunks)} chunks, slow chunks {sorted(slowdowns)} at {args.slowdown}x, {policy}\n")
+    print(f"{'profile':<10}{'speculation':>12}{'makespan':>12}{'GPU-hours':>12}{'duplicates':>12}{'speculative':>13}")
+
+    for profile_name, frame_costs in benchmark_profiles(args.frames).items():
+        for label, chunk_policy in (("off", None), ("on", policy)):
+            result = simulate_speculation(chunks, 1, frame_costs, config, slowdowns, chunk_policy)
+            print(f"{profile_name:<10}{label:>12}{result.makespan / 60:>10.1f}m{result.gpu_seconds / 3600:>12.2f}"
+                  f"{result.duplicates:>12}{result.speculative_gpu_seconds / 3600:>12.2f}h")
+            assert result.frames_completed == args.frames, f"{profile_name}: only {result.frames_completed}/{args.frames} frames completed"
+            assert result.speculative_gpu_seconds <= policy.max_speculative_gpu_seconds, f"{profile_name}: duplicates exceeded the GPU-seconds cap"
+
+
+if __name__ == "__main__":
+    main()
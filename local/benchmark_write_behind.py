@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from write_behind import WriteBehindUploader
+
+
+class SlowFilesystem:
+    """Local stand-in for the Volume mount: every write pays a fixed latency plus size / bandwidth."""
+
+    def __init__(self, latency_seconds: float, megabytes_per_second: float):
+        self.latency_seconds = latency_seconds
+        self.bytes_per_second = megabytes_per_second * 1024 ** 2
+
+    def write_bytes(self, path: Path, data: bytes):
+        time.sleep(self.latency_seconds + len(data) / self.bytes_per_second)
+        path.write_bytes(data)
+
+    def copy_file(self, source: Path, destination: Path):
+        time.sleep(self.latency_seconds + os.path.getsize(source) / self.bytes_per_second)
+        shutil.copyfile(source, destination)
+
+
+def render_direct(frames: int, frame_data: bytes, render_seconds: float, volume_dir: Path, slow: SlowFilesystem) -> float:
+    started_at = time.monotonic()
+    for frame in range(1, frames + 1):
+        time.sleep(render_seconds)
+        slow.write_bytes(volume_dir / f"job_{frame:04d}.exr", frame_data)
+    return time.monotonic() - started_at
+
+
+def render_write_behind(frames: int, frame_data: bytes, render_seconds: float, volume_dir: Path, scratch_dir: Path, slow: SlowFilesystem, max_pending_bytes: int):
+    started_at = time.monotonic()
+    uploader = WriteBehindUploader(volume_dir, commit=lambda: time.sleep(slow.latency_seconds), max_pending_bytes=max_pending_bytes, copy_file=slow.copy_file)
+    uploader.start()
+    for frame in range(1, frames + 1):
+        time.sleep(render_seconds)
+        path = scratch_dir / f"job_{frame:04d}.exr"
+        path.write_bytes(frame_data)  # Local disk
+        uploader.frame_ready(path)
+    stats = uploader.flush()
+    return time.monotonic() - started_at, stats
+
+
+def main():
+    """
+    python benchmark_write_behind.py [--frames 40 --frame-mb 100 --render-seconds 0.5 --bandwidth-mb 200]
+
+    Compares rendering straight onto a slow shared filesystem with write_behind = True, where frames land
+    on local scratch and are copied while the next frame renders.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--frame-mb", type=float, default=100)
+    parser.add_argument("--render-seconds", type=float, default=0.5)
+    parser.add_argument("--latency-seconds", type=float, default=0.05)
+    parser.add_argument("--bandwidth-mb", type=float, default=200)
+    parser.add_argument("--scratch-mb", type=float, default=1024, help="max_pending_bytes of the write-behind copier")
+    args = parser.parse_args()
+
+    frame_data = os.urandom(int(args.frame_mb * 1024 ** 2))
+    slow = SlowFilesystem(args.latency_seconds, args.bandwidth_mb)
+    print(f"{args.frames} frames of {args.frame_mb:.0f} MB, {args.render_seconds}s render each, "
+          f"volume {args.latency_seconds * 1000:.0f}ms + {args.bandwidth_mb:.0f} MB/s\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_dir, behind_dir, scratch_dir = Path(tmp) / "direct", Path(tmp) / "behind", Path(tmp) / "scratch"
+        for directory in (direct_dir, behind_dir, scratch_dir):
+            directory.mkdir()
+
+        direct_seconds = render_direct(args.frames, frame_data, args.render_seconds, direct_dir, slow)
+        print(f"direct write:  {direct_seconds:.1f}s")
+
+        behind_seconds, stats = render_write_behind(args.frames, frame_data, args.render_seconds, behind_dir, scratch_dir, slow, int(args.scratch_mb * 1024 ** 2))
+        print(f"write-behind:  {behind_seconds:.1f}s ({direct_seconds / behind_seconds:.2f}x), {stats}")
+
+        assert sorted(os.listdir(behind_dir)) == sorted(os.listdir(direct_dir)), "Write-behind lost or left temp frames"
+        assert not os.listdir(scratch_dir), "Frames left in scratch"
+
+
+if __name__ == "__main__":
+    main()
@@ -2,71 +2,38 @@
 
 import sys
 import os
-import re
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
 
-def check_contiguous_frames(directory):
-    """
-    Checks for contiguous frames in the specified directory, assuming
-    filenames in the format: frame_XXXX.exr
-    e.g., frame_0001.exr, frame_0002.exr, etc.
-    """
-    # Regex to match the frame number from filenames like frame_0001.exr
-    pattern = re.compile(r'^frame_(\d{4})\.exr$')
-
-    # Collect frame numbers
-    frame_numbers = []
-
-    # Walk through directory and find all matching files
-    for fname in os.listdir(directory):
-        match = pattern.match(fname)
-        if match:
-            # Convert the extracted string to integer
-            frame_num = int(match.group(1))
-            frame_numbers.append(frame_num)
-
-    if not frame_numbers:
-        print("No frames matching the pattern 'frame_XXXX.exr' were found.")
-        return
-
-    # Sort frame numbers
-    frame_numbers.sort()
-
-    # Determine min and max
-    min_frame = frame_numbers[0]
-    max_frame = frame_numbers[-1]
-
-    # Identify missing frames
-    missing_frames = []
-    for frame_id in range(min_frame, max_frame + 1):
-        if frame_id not in frame_numbers:
-            missing_frames.append(frame_id)
-
-    # Print results
-    if missing_frames:
-        print("Missing frames:")
-        for mf in missing_frames:
-            # Format the frame number back to 4 digits, if desired
-            print(f"frame_{mf:04d}.exr")
-    else:
-        print("All frames are contiguous (no missing frames).")
+from frame_verify import verify_frames, print_verification, format_frame_ranges
 
 
 def main():
-    # Simple arg check
-    if len(sys.argv) < 2:
-        print("Usage: python check_frames.py <directory_path>")
+    """
+    python check_missing_frames.py <directory_path> <job_name> <start_frame> <end_frame>
+
+    Verifies a local mirror of a job's frames. To check the Volume directly instead, run
+    `modal run src/main.py::verify --session-id <id>`.
+    """
+    if len(sys.argv) < 5:
+        print("Usage: python check_missing_frames.py <directory_path> <job_name> <start_frame> <end_frame>")
         sys.exit(1)
 
     directory = sys.argv[1]
+    job_name = sys.argv[2]
+    start_frame, end_frame = int(sys.argv[3]), int(sys.argv[4])
 
     # Validate directory
     if not os.path.isdir(directory):
         print(f"Error: {directory} is not a valid directory.")
         sys.exit(1)
 
-    check_contiguous_frames(directory)
+    verification = verify_frames(directory, job_name, start_frame, end_frame)
+    print_verification(verification)
+    if not verification.is_complete():
+        print(f"\nRe-render with:\nmodal run src/main.py::main --session-id <session_id> --frames {format_frame_ranges(verification.rerender_ranges())}")
+        sys.exit(2)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from frame_verify import contiguous_ranges, format_frame_ranges
+from postprocess import FfmpegEncoder, PostProcessPipeline, PreviewSettings
+
+
+def main():
+    """
+    python postprocess_frames.py <frames_dir> <job_name> <start_frame> <end_frame> [--previews-dir previews --video review.mp4]
+
+    Converts a job's ACEScg EXRs into sRGB preview PNGs and an H.264 review video across a process pool.
+    With --follow it keeps picking up frames as `modal run src/main.py::main --download` brings them in, encoding
+    each one as soon as every earlier frame is done, until the whole range is there (or Ctrl-C).
+
+    On a partial progressive render (progressive_stride in jobs.ini), --fill blend gives a full-length fill-in
+    preview: the frames not rendered yet are crossfaded from the nearest rendered ones on either side.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("frames_dir", type=Path)
+    parser.add_argument("job_name")
+    parser.add_argument("start_frame", type=int)
+    parser.add_argument("end_frame", type=int)
+    parser.add_argument("--previews-dir", type=Path, help="Write a PNG per frame here")
+    parser.add_argument("--video", type=Path, help="Encode the frames into this .mp4 (needs ffmpeg)")
+    parser.add_argument("--fps", type=float, default=24)
+    parser.add_argument("--crf", type=int, default=18)
+    parser.add_argument("--exposure", type=float, default=0.0, help="Exposure adjustment in stops")
+    parser.add_argument("--scale", type=int, default=1, help="Downscale factor, eg. 2 for half resolution")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--max-buffered", type=int, help="Converted frames held in memory at most, 2 x workers by default")
+    parser.add_argument("--fill", choices=["repeat", "blend"], default="repeat",
+                        help="Fill frames that aren't rendered (yet) by repeating the previous one or blending its neighbours")
+    parser.add_argument("--follow", action="store_true", help="Wait for frames still being downloaded")
+    parser.add_argument("--poll-seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    if args.previews_dir is None and args.video is None:
+        parser.error("Nothing to do, pass --previews-dir and/or --video")
+
+    settings = PreviewSettings(args.previews_dir, exposure=args.exposure, scale=args.scale)
+    encoder = FfmpegEncoder(args.video, args.fps, crf=args.crf) if args.video else None
+    pipeline = PostProcessPipeline(args.frames_dir, args.job_name, args.start_frame, args.end_frame, settings,
+                                   encoder=encoder, workers=args.workers, max_buffered=args.max_buffered, fill=args.fill)
+    stop_event = threading.Event() if args.follow else None
+    try:
+        stats = pipeline.run(stop_event, poll_seconds=args.poll_seconds)
+    except KeyboardInterrupt:
+        print("Interrupted")
+        sys.exit(130)
+
+    print(stats)
+    for frame, error in stats.failed.items():
+        print(f"  frame {frame}: {error}")
+    if stats.interpolated:
+        print(f"Frames blended from their neighbours: {format_frame_ranges(contiguous_ranges(stats.interpolated))}")
+    if stats.missing:
+        print(f"Frames missing from the video (previous frame repeated): {format_frame_ranges(contiguous_ranges(stats.missing))}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
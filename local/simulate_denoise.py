@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+import OpenEXR
+import Imath
+
+from denoise import DENOISERS, DenoiseReport, InProcessFrameReadyQueue, denoise_exr, drain_ready_frames, make_denoiser, read_exr_channels
+from frame_verify import find_frames
+
+LAYER = "ViewLayer"
+
+
+def clean_frame(frame: int, width: int, height: int):
+    """A lit two-material scene whose shading and material edge move with the frame, with matching albedo and normal passes."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    edge = width * (0.3 + 0.01 * frame)
+    albedo = np.where((x < edge)[..., None], [0.8, 0.2, 0.1], [0.1, 0.4, 0.8]).astype(np.float32)
+    angle = (x / width - 0.5) * 1.2
+    normal = np.stack([np.sin(angle), np.zeros_like(angle), np.cos(angle)], axis=2).astype(np.float32)
+    shading = (0.5 + 2.0 * normal[:, :, 2:3] * (1 - y / height)[..., None]).astype(np.float32)
+    return albedo * shading, albedo, normal
+
+
+def write_noisy_frame(path: Path, color, albedo, normal, noise: float, rng, half: bool):
+    """What Cycles writes with denoising off and denoising_store_passes on: noisy Combined plus the denoising passes."""
+    height, width, _ = color.shape
+    noisy = color * (1 + rng.normal(0, noise, color.shape).astype(np.float32))
+    passes = {"Combined": ("RGBA", np.dstack([noisy, np.ones((height, width), np.float32)])),
+              "Denoising Albedo": ("RGB", albedo), "Denoising Normal": ("XYZ", normal)}
+    pixel_type = Imath.PixelType(Imath.PixelType.HALF if half else Imath.PixelType.FLOAT)
+    header = OpenEXR.Header(width, height)
+    header["compression"] = Imath.Compression(Imath.Compression.ZIP_COMPRESSION)
+    channels, pixels = {}, {}
+    for pass_name, (components, data) in passes.items():
+        for i, component in enumerate(components):
+            name = f"{LAYER}.{pass_name}.{component}"
+            channels[name] = Imath.Channel(pixel_type)
+            pixels[name] = np.ascontiguousarray(data[:, :, i], dtype=np.float16 if half else np.float32).tobytes()
+    header["channels"] = channels
+    temporary_path = path.with_name(f".{path.name}.tmp")  # Blender's render_write only fires once the file is complete
+    exr = OpenEXR.OutputFile(str(temporary_path), header)
+    exr.writePixels(pixels)
+    exr.close()
+    os.replace(temporary_path, path)
+
+
+def render_worker(frames: list, noisy_dir: Path, ready_frames: InProcessFrameReadyQueue, args, written_at: dict, seed: int):
+    """A GPU render container: renders its frames one by one, announcing each as render_write would."""
+    rng = np.random.default_rng(seed)
+    for frame in frames:
+        time.sleep(args.frame_seconds)
+        color, albedo, normal = clean_frame(frame, args.width, args.height)
+        path = noisy_dir / f"job_{frame:04d}.exr"
+        write_noisy_frame(path, color, albedo, normal, args.noise, rng, args.half)
+        written_at[frame] = time.monotonic()
+        ready_frames.put_frame(frame, str(path))
+
+
+def rms_error(frame_path: Path, frame: int, width: int, height: int, names: list) -> float:
+    channels, _ = read_exr_channels(frame_path)
+    image = np.stack([channels[name] for name in names], axis=2)
+    return float(np.sqrt(np.mean((image - clean_frame(frame, width, height)[0]) ** 2)))
+
+
+def main():
+    """
+    python simulate_denoise.py [--denoiser guided-blur|oidn] [--frames 24] [--render-workers 4] [--denoise-workers 2]
+
+    Runs the denoise_on_cpu pipeline in-process on synthetic multilayer EXRs: render threads write noisy frames
+    with albedo and normal passes and announce them, denoise threads pick them up as they land. Checks every frame
+    is denoised exactly once while rendering is still going, that the output is cleaner than the input and has
+    the layout Blender would have written, then prints the report main.py prints after a run.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--denoiser", default="guided-blur", choices=sorted(DENOISERS))
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--render-workers", type=int, default=4)
+    parser.add_argument("--denoise-workers", type=int, default=2)
+    parser.add_argument("--frame-seconds", type=float, default=0.2, help="Simulated GPU render time per frame")
+    parser.add_argument("--gpu-denoise-seconds", type=float, default=4, help="[RUN] DENOISE_GPU_SECONDS_PER_FRAME")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=180)
+    parser.add_argument("--noise", type=float, default=0.25)
+    parser.add_argument("--half", action="store_true", help="16 bit noisy frames (exr_color_depth = 16)")
+    parser.add_argument("--multilayer", action="store_true", help="Keep the denoised frames multilayer (exr_multilayer = True)")
+    args = parser.parse_args()
+    frames = list(range(1, args.frames + 1))
+
+    with tempfile.TemporaryDirectory() as root:
+        noisy_dir, frames_dir = Path(root) / "noisy", Path(root) / "frames"
+        noisy_dir.mkdir()
+        frames_dir.mkdir()
+        ready_frames = InProcessFrameReadyQueue()
+        written_at, denoised_at, stats = {}, {}, []
+
+        def denoise_worker(worker_id: int):
+            denoiser = make_denoiser(args.denoiser)
+
+            def denoise_frame(frame: int, noisy_path: str):
+                denoise_exr(Path(noisy_path), frames_dir / Path(noisy_path).name, denoiser, multilayer=args.multilayer)
+                denoised_at[frame] = time.monotonic()
+
+            stats.append(drain_ready_frames(ready_frames, worker_id, args.denoiser, denoise_frame, poll_seconds=0.1))
+
+        denoisers = [threading.Thread(target=denoise_worker, args=(worker_id,)) for worker_id in range(args.denoise_workers)]
+        renderers = [threading.Thread(target=render_worker, args=(frames[i::args.render_workers], noisy_dir, ready_frames, args, written_at, i))
+                     for i in range(args.render_workers)]
+        started_at = time.monotonic()
+        for thread in denoisers + renderers:
+            thread.start()
+        for thread in renderers:
+            thread.join()
+        rendered_at = time.monotonic()
+        ready_frames.close(len(denoisers))
+        for thread in denoisers:
+            thread.join()
+        finished_at = time.monotonic()
+
+        report = DenoiseReport(stats, args.gpu_denoise_seconds, len(frames))
+        report.print()
+        assert not report.failed_frames(), report.failed_frames()
+        assert sorted(frame for worker in stats for frame in worker.frame_seconds) == frames, "Every frame denoised exactly once"
+        assert sorted(find_frames(frames_dir, "job")) == frames
+        overlapped = sum(1 for frame in frames if denoised_at[frame] < rendered_at)
+        print(f"Rendering took {rendered_at - started_at:.1f}s, denoising finished {finished_at - rendered_at:.1f}s later; "
+              f"{overlapped}/{len(frames)} frames were denoised while the GPUs were still rendering")
+        assert overlapped > 0, "Denoising should overlap rendering"
+        print(f"Mean lag from frame written to denoised: {np.mean([denoised_at[f] - written_at[f] for f in frames]):.2f}s")
+
+        sample = frames[len(frames) // 2]
+        output_channels, output_header = read_exr_channels(frames_dir / f"job_{sample:04d}.exr")
+        if args.multilayer:
+            names = [f"{LAYER}.Combined.{component}" for component in "RGB"]
+            assert sorted(output_channels) == sorted(f"{LAYER}.Combined.{c}" for c in "RGBA"), sorted(output_channels)
+        else:
+            names = list("RGB")
+            assert sorted(output_channels) == sorted(names), sorted(output_channels)
+        expected_type = Imath.PixelType(Imath.PixelType.HALF if args.half else Imath.PixelType.FLOAT)
+        assert all(channel.type == expected_type for channel in output_header["channels"].values())
+        noisy_error = rms_error(noisy_dir / f"job_{sample:04d}.exr", sample, args.width, args.height, [f"{LAYER}.Combined.{c}" for c in "RGB"])
+        denoised_error = rms_error(frames_dir / f"job_{sample:04d}.exr", sample, args.width, args.height, names)
+        print(f"Frame {sample} RMS error against the clean render: noisy {noisy_error:.4f}, denoised ({args.denoiser}) {denoised_error:.4f}")
+        assert denoised_error < noisy_error
+
+
+if __name__ == "__main__":
+    main()
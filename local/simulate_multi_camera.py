@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import configparser
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from frame_cache import FrameCache, job_frame_prefixes, restore_cached_frames, store_rendered_frames
+from job import job_from_config
+from multi_camera import CameraSyncComparison, single_camera_jobs
+from paths import remote_job_frames_absolute_volume_directory_path
+from progress import ChunkResult
+from storage import LocalDirectoryStorage
+from telemetry import frame_costs
+
+CAMERAS = ["Camera.Fun", "Camera.003", "Top View"]
+JOB_SECTION = f"""
+[fire]
+blend_file_path = fire.blend
+camera_names = {", ".join(CAMERAS)}
+start_frame = 1
+end_frame = 4
+width = 640
+height = 360
+"""
+
+
+def chunk_record(job_name: str, cameras: list, frames: list, sync_seconds: float, render_seconds: float, switch_seconds: float) -> dict:
+    """
+    Telemetry of one chunk rendering `frames` from each of `cameras` in turn: the first render syncs the whole
+    scene, every later one that follows a different camera resyncs just the camera.
+    """
+    now, entries, previous = 1000.0, [], None
+    for frame in frames:
+        for camera in cameras:
+            seconds = render_seconds + (sync_seconds if previous is None else switch_seconds if camera != previous else 0.0)
+            entries.append({"frame": frame, "camera": camera, "started_at": now, "finished_at": now + seconds, "output_bytes": 1})
+            now += seconds
+            previous = camera
+    return {"job_name": job_name, "camera_name": cameras[0], "start_frame": frames[0], "end_frame": frames[-1], "frames": entries}
+
+
+def chunk_result(record: dict, setup_seconds: float) -> ChunkResult:
+    render_seconds = record["frames"][-1]["finished_at"] - record["frames"][0]["started_at"]
+    return ChunkResult(record["job_name"], record["camera_name"], record["start_frame"], record["end_frame"], setup_seconds, render_seconds, "")
+
+
+def main():
+    """
+    python simulate_multi_camera.py
+
+    Checks multi-camera jobs without Blender: config parsing, per-camera frame directories, frame cache keys and
+    restores, planning costs from telemetry, and the shared vs per-camera comparison camera_sync prints.
+    """
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "jobs.ini"))  # For its [DEFAULT]s
+    config.read_string(JOB_SECTION)
+    job = job_from_config(config, "fire", "session")
+    assert job.camera_names == CAMERAS and job.camera_name == CAMERAS[0] and job.is_multi_camera(), job
+    assert job.frame_subdirectories() == ["Camera.Fun", "Camera.003", "Top_View"], job.frame_subdirectories()
+    prefixes = job_frame_prefixes(job)
+    assert sorted(prefixes.values()) == sorted(f"{directory}/fire_" for directory in job.frame_subdirectories()), prefixes
+    print(f"Frame directories: {job.frame_subdirectories()}")
+
+    camera_jobs = single_camera_jobs(job)
+    assert [camera_job.frame_subdirectories() for camera_job in camera_jobs.values()] == [[""]] * len(CAMERAS)
+    assert len({camera_job.job_name for camera_job in camera_jobs.values()}) == len(CAMERAS)
+
+    # Frame cache: a frame is only a hit once every camera's render of it is cached
+    versions = {"bpy": "bpy==4.4.0", "addons": {}}
+    job.blend_content_hash = "ab" * 32
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalDirectoryStorage(Path(root))
+        frames_dir = Path(root) / str(remote_job_frames_absolute_volume_directory_path(job.session_id)).lstrip("/")
+        for prefix in prefixes.values():
+            (frames_dir / prefix).parent.mkdir(parents=True, exist_ok=True)
+            for frame in range(1, 5):
+                if not (prefix.startswith("Top_View") and frame == 4):  # One camera's render of frame 4 is missing
+                    (frames_dir / f"{prefix}{frame:04d}.exr").write_bytes(b"exr")
+        cache = FrameCache(storage)
+        stored = store_rendered_frames(cache, job, list(range(1, 5)), versions)
+        assert stored == 4 * len(CAMERAS) - 1, stored
+        cache.save()
+
+        rerun = job_from_config(config, "fire", "rerun")
+        rerun.blend_content_hash = job.blend_content_hash
+        misses = restore_cached_frames(FrameCache(storage), rerun, versions)
+        assert misses == [4], misses
+        rerun_dir = Path(root) / str(remote_job_frames_absolute_volume_directory_path(rerun.session_id)).lstrip("/")
+        assert all((rerun_dir / directory / "fire_0003.exr").exists() for directory in rerun.frame_subdirectories())
+
+    # Planning: a multi-camera chunk renders a frame once per camera, so that's what the frame costs
+    shared_record = chunk_record(job.job_name, CAMERAS, [1, 2, 3, 4], sync_seconds=40, render_seconds=10, switch_seconds=1)
+    costs = frame_costs([shared_record])
+    assert all(abs(cost - 3 * 10 - 3 * 1) < 1e-9 for frame, cost in costs.items() if frame > 1), costs
+    print(f"Frame costs: {costs}")
+
+    per_camera = {}
+    for camera, camera_job in camera_jobs.items():
+        record = chunk_record(camera_job.job_name, [camera], [1, 2, 3, 4], sync_seconds=40, render_seconds=10, switch_seconds=1)
+        per_camera[camera] = (chunk_result(record, setup_seconds=30), record)
+    comparison = CameraSyncComparison(chunk_result(shared_record, setup_seconds=30), shared_record, per_camera)
+    comparison.print()
+    assert abs(comparison.setup_seconds_saved() - 2 * 30) < 1e-9
+    assert all(abs(seconds - 40) < 1e-9 for seconds in comparison.scene_sync_seconds().values())
+    assert all(abs(seconds - 1) < 1e-9 for seconds in comparison.camera_switch_seconds().values()), comparison.camera_switch_seconds()
+    # Two scene syncs skipped, 11 camera switches paid
+    assert abs(comparison.render_seconds_saved() - (2 * 40 - 11 * 1)) < 1e-9, comparison.render_seconds_saved()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import argparse
+import functools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from multi_gpu import DeviceRenderer, render_frames_on_devices
+
+
+class FakeDevice(DeviceRenderer):
+    """
+    Stand-in for BlenderDeviceRenderer: "loads the scene" for `setup_seconds`, then sleeps per frame at the
+    device's speed. `crash` makes device 1 fail after two frames, by raising or by killing its process.
+    """
+
+    def __init__(self, setup_seconds: float, frame_seconds: float, slow_device: int, crash: str, device_index: int):
+        time.sleep(setup_seconds)
+        self.device_index = device_index
+        self.frame_seconds = frame_seconds * (2 if device_index == slow_device else 1)
+        self.crash = crash if device_index == 1 else "none"
+        self.frames = 0
+
+    def render_frame(self, frame: int):
+        if self.frames == 2 and self.crash == "raise":
+            raise RuntimeError(f"Simulated render error on device {self.device_index}, frame {frame}")
+        if self.frames == 2 and self.crash == "exit":
+            os._exit(1)  # Like a driver crash: no exception, the process is just gone
+        time.sleep(self.frame_seconds)
+        self.frames += 1
+
+
+def main():
+    """
+    python simulate_multi_gpu.py [--frames 24 --devices 4 --processes --crash raise|exit]
+
+    Runs MultiGpuRenderer's orchestration against fake devices, so no GPUs or Blender are needed. Checks every
+    frame is rendered exactly once, including when a device fails mid-chunk and its frame moves to another one.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--setup-seconds", type=float, default=0.5, help="Per-worker scene load")
+    parser.add_argument("--frame-seconds", type=float, default=0.1)
+    parser.add_argument("--slow-device", type=int, default=0, help="This device renders at half speed, -1 for none")
+    parser.add_argument("--crash", choices=["none", "raise", "exit"], default="none")
+    parser.add_argument("--processes", action="store_true", help="Workers in processes like in the container, threads otherwise")
+    args = parser.parse_args()
+
+    frames = list(range(1, args.frames + 1))
+    setup = functools.partial(FakeDevice, args.setup_seconds, args.frame_seconds, args.slow_device, args.crash)
+    single = render_frames_on_devices(frames, 1, functools.partial(FakeDevice, args.setup_seconds, args.frame_seconds, -1, "none"), processes=args.processes)
+    result = render_frames_on_devices(frames, args.devices, setup, processes=args.processes)
+
+    for worker in result.workers:
+        print(worker)
+    print(result)
+    print(f"1 device: {single.wall_seconds:.2f}s, {args.devices} devices: {result.wall_seconds:.2f}s "
+          f"({single.wall_seconds / result.wall_seconds:.2f}x), scene loaded in parallel in {result.setup_seconds():.2f}s")
+
+    assert result.rendered_frames() == frames, f"Frames lost or rendered twice: {result.rendered_frames()}"
+    assert not result.failed_frames, result.failed_frames
+    if args.slow_device >= 0 and args.crash == "none" and args.devices > 1:
+        slow, fast = result.workers[args.slow_device], max(result.workers, key=lambda worker: len(worker.frames))
+        assert len(slow.frames) < len(fast.frames), "The slow device should have taken fewer frames"
+    if args.crash != "none":
+        assert result.workers[1].error is not None and result.requeued_frames == 1, "Device 1's frame should have moved to another device"
+
+
+if __name__ == "__main__":
+    main()
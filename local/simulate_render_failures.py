@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from job import Job, JobChunk, job_chunks_from_job
+from progress import ChunkResult
+from fault_tolerance import RetryPolicy, render_with_retries
+from frame_verify import find_frames, parse_frame_ranges, verify_frames, print_verification
+
+
+class FlakyRenderer:
+    """
+    Stand-in for render_sequence that writes one file per frame and crashes when it reaches a frame of
+    `fail_frames`, the first `fail_times` times that frame comes up. Frames before it stay written.
+    """
+
+    def __init__(self, frames_dir: Path, fail_frames: set, fail_times: int):
+        self.frames_dir = frames_dir
+        self.fail_frames = fail_frames
+        self.fail_times = fail_times
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    def render(self, job_chunk: JobChunk) -> ChunkResult:
+        for frame in range(job_chunk.chunk_start_frame, job_chunk.chunk_end_frame + 1):
+            with self.lock:
+                if frame in self.fail_frames and self.failures.get(frame, 0) < self.fail_times:
+                    self.failures[frame] = self.failures.get(frame, 0) + 1
+                    raise RuntimeError(f"Simulated container crash on frame {frame}")
+            (self.frames_dir / f"{job_chunk.frame_file_prefix()}{frame:04d}.exr").write_bytes(b"frame")
+        return ChunkResult(
+            job_name=job_chunk.job.job_name,
+            camera_name=job_chunk.job.camera_name,
+            start_frame=job_chunk.chunk_start_frame,
+            end_frame=job_chunk.chunk_end_frame,
+            setup_seconds=0.0,
+            render_seconds=0.0,
+            output_path=str(self.frames_dir / job_chunk.frame_file_prefix())
+        )
+
+
+def main():
+    """
+    python simulate_render_failures.py --fail-frames 140,200-201 --fail-times 2
+
+    Runs the retry logic of main.py against a fake renderer, so no containers are started.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", type=int, default=130)
+    parser.add_argument("--end", type=int, default=430)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--fail-frames", default="140,200-201")
+    parser.add_argument("--fail-times", type=int, default=1, help="How many times each failing frame crashes before it renders")
+    parser.add_argument("--max-frame-attempts", type=int, default=3)
+    parser.add_argument("--retry-splits", type=int, default=4)
+    parser.add_argument("--retry-budget-frames", type=int, default=500)
+    args = parser.parse_args()
+
+    job = Job(
+        job_name="flaky", session_id="local", render_node_concurrency_target=args.chunks, render_engine="CYCLES",
+        blend_file_path="flaky.blend", camera_name="Camera", overall_start_frame=args.start, overall_end_frame=args.end,
+        width=1920, height=1080, render_max_samples=64, render_adaptive_threshold=0.1, eco_mode_enabled=False,
+        min_chunk_size=1, max_chunk_size=1000
+    )
+    fail_frames = {frame for start, end in parse_frame_ranges(args.fail_frames) for frame in range(start, end + 1)}
+    policy = RetryPolicy(args.max_frame_attempts, args.retry_splits, args.retry_budget_frames)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir = Path(tmp)
+        renderer = FlakyRenderer(frames_dir, fail_frames, args.fail_times)
+
+        def written_frames(job_chunk: JobChunk) -> set:
+            frames = find_frames(frames_dir, job_chunk.frame_file_prefix()[:-1])
+            return {frame for frame in frames if job_chunk.chunk_start_frame <= frame <= job_chunk.chunk_end_frame}
+
+        job_chunks = job_chunks_from_job(job, total_chunk_target=args.chunks)
+        print(f"Rendering {len(job_chunks)} chunks with {policy}, failing frames {sorted(fail_frames)} {args.fail_times}x")
+        report = render_with_retries(job_chunks, renderer.render, written_frames, max_in_flight=8, policy=policy)
+        report.print_summary()
+        verification = verify_frames(frames_dir, job.job_name, job.overall_start_frame, job.overall_end_frame)
+        # The fake frames aren't real EXRs, so only the missing frames matter here.
+        verification.invalid = {}
+        print_verification(verification)
+        assert sorted(verification.missing) == [frame for start, end in report.failed_frame_ranges(job.job_name) for frame in range(start, end + 1)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from paths import sim_cache_manifest_volume_path, sim_cache_volume_path
+from sim_cache import CacheSlot, bake_key, bake_manifest, read_bake_manifest, scene_cache_slots, prepare_for_bake, record_point_cache_indices, relink_scene_caches
+from storage import LocalDirectoryStorage
+
+
+def open_scene(extra_cloth: bool = False) -> SimpleNamespace:
+    """
+    A freshly opened copy of a fire scene, shaped like what bpy exposes: a smoke domain, a flow object (no cache of its
+    own), sparks, a geometry nodes simulation and a rigid body world. Every call returns unlinked, default cache settings.
+    """
+    def point_cache():
+        return SimpleNamespace(use_external=False, use_disk_cache=False, filepath="", name="", index=-1)
+
+    objects = [
+        SimpleNamespace(name="Smoke Domain", modifiers=[SimpleNamespace(
+            type="FLUID", fluid_type="DOMAIN", name="Fluid", domain_settings=SimpleNamespace(cache_directory="//cache_fluid", cache_type="REPLAY"))]),
+        SimpleNamespace(name="Fire/Emitter", modifiers=[SimpleNamespace(type="FLUID", fluid_type="FLOW", name="Fluid")]),
+        SimpleNamespace(name="Sparks", modifiers=[
+            SimpleNamespace(type="SUBSURF", name="Subdivision"),
+            SimpleNamespace(type="PARTICLE_SYSTEM", name="Sparks.001", particle_system=SimpleNamespace(point_cache=point_cache()))]),
+        SimpleNamespace(name="Debris", modifiers=[SimpleNamespace(
+            type="NODES", name="GeometryNodes", bake_directory="", bakes=[SimpleNamespace(use_custom_path=True)])]),
+        SimpleNamespace(name="Static", modifiers=[SimpleNamespace(type="NODES", name="Scatter", bakes=[])]),  # No simulation to bake
+    ]
+    if extra_cloth:
+        objects.append(SimpleNamespace(name="Banner", modifiers=[SimpleNamespace(type="CLOTH", name="Cloth", point_cache=point_cache())]))
+    scene = SimpleNamespace(rigidbody_world=SimpleNamespace(point_cache=point_cache()), frame_start=1, frame_end=430)
+    return SimpleNamespace(data=SimpleNamespace(objects=objects), context=SimpleNamespace(scene=scene))
+
+
+def fake_bake(bpy, bake_dir: Path) -> list:
+    """What bake_scene_caches leaves behind, without Blender: one cache file per slot where Blender would write it."""
+    slots = scene_cache_slots(bpy)
+    for file_index, (slot, settings) in enumerate(slots):
+        prepare_for_bake(slot, settings, bake_dir)
+        if slot.kind == "point_cache":
+            settings.index = file_index  # Blender assigns free indices while baking
+            directory, name = bake_dir / "blendcache_bake", f"{settings.name}_{settings.index:02d}_000300.bphys"
+        elif slot.kind == "fluid":
+            directory, name = Path(settings.cache_directory) / "data", "fluid_data_0300.vdb"
+        else:
+            directory, name = Path(settings.bake_directory) / "meta", "300.json"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / name).write_bytes(b"cache")
+    record_point_cache_indices(slots)
+    return [slot for slot, _ in slots]
+
+
+def relinked_file(slot: CacheSlot, settings) -> Path:
+    """The frame 300 file a relinked cache now reads."""
+    if slot.kind == "point_cache":
+        assert settings.use_external, slot
+        return Path(settings.filepath) / f"{settings.name}_{settings.index:02d}_000300.bphys"
+    if slot.kind == "fluid":
+        assert settings.cache_type == "REPLAY", slot
+        return Path(settings.cache_directory) / "data" / "fluid_data_0300.vdb"
+    assert not any(bake.use_custom_path for bake in settings.bakes), slot
+    return Path(settings.bake_directory) / "meta" / "300.json"
+
+
+def main():
+    """
+    python simulate_sim_cache.py
+
+    Checks the shared simulation bake without Blender or a GPU: which caches a scene has, that a freshly opened scene
+    relinked to a bake reads the files the bake wrote, and when a bake on the Volume counts as fresh.
+    """
+    versions = {"bpy": "bpy==4.4.0", "addons": {"physical-starlight-atmosphere": "1.6.4"}}
+    blend_hash = "ab" * 32
+    key = bake_key(blend_hash, versions)
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalDirectoryStorage(Path(root))
+        bake_dir = Path(root) / sim_cache_volume_path(key)
+
+        # Freshness: nothing baked yet, so every session would bake
+        assert read_bake_manifest(storage, key) is None
+
+        slots = fake_bake(open_scene(), bake_dir)
+        print(f"Baked slots: {slots}")
+        assert [slot.kind for slot in slots] == ["fluid", "point_cache", "geometry_nodes", "point_cache"], slots
+        assert len({slot.directory(bake_dir) for slot in slots if slot.kind != "point_cache"}) == 2
+        # Interrupted bake: caches on disk but no manifest yet
+        assert read_bake_manifest(storage, key) is None
+        manifest = bake_manifest(key, blend_hash, versions, slots, (1, 430), bake_seconds=1234.0)
+        storage.put_bytes(json.dumps(manifest).encode(), sim_cache_manifest_volume_path(key))
+
+        # Freshness: the same .blend and build reuse it, any change to either bakes anew
+        assert read_bake_manifest(storage, key)["slots"] == manifest["slots"]
+        assert bake_key(blend_hash, versions) == key
+        assert read_bake_manifest(storage, bake_key("cd" * 32, versions)) is None
+        assert read_bake_manifest(storage, bake_key(blend_hash, {**versions, "bpy": "bpy==4.5.0"})) is None
+        print(f"Bake {key[:12]} is fresh for the same scene and Blender build, stale otherwise")
+
+        # Relinking: every chunk opens the .blend as uploaded, relinks, and reads the baked frame 300 directly
+        bpy = open_scene()
+        relinked, missing = relink_scene_caches(bpy, bake_dir, json.loads(storage.read_bytes(sim_cache_manifest_volume_path(key))))
+        assert relinked == slots and not missing
+        for slot, settings in scene_cache_slots(bpy):
+            assert relinked_file(slot, settings).exists(), f"{slot} relinked to a missing file {relinked_file(slot, settings)}"
+        print(f"Relinked {len(relinked)} caches, each reading frame 300 from the bake")
+
+        # A cache added after the bake (but somehow the same .blend hash, eg. a stale manifest) is left alone and reported
+        bpy = open_scene(extra_cloth=True)
+        relinked, missing = relink_scene_caches(bpy, bake_dir, manifest)
+        assert missing == [CacheSlot("point_cache", "Banner", "Cloth")], missing
+        banner = bpy.data.objects[-1].modifiers[0].point_cache
+        assert not banner.use_external and banner.filepath == ""
+        print(f"Unbaked cache left to simulate: {missing}")
+
+
+if __name__ == "__main__":
+    main()
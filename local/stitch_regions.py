@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from regions import frame_regions, find_region_tiles, stitch_frame, write_exr
+from job import EXR_CODECS, load_jobs_config
+
+
+def main():
+    """
+    Reassembles region tiles (`{job}_rNN_FFFF.exr`, or raw float32 `.npy` tiles) into full frames.
+
+    Needs numpy, plus OpenEXR for .exr tiles or output. Width/height are the rendered resolution,
+    ie. after eco mode's resolution percentage. Stitched EXRs are written with the job's exr_codec, exr_color_depth
+    and exr_dwa_quality from jobs.ini unless given here.
+    """
+    parser = argparse.ArgumentParser(description="Stitch region tiles into full frames")
+    parser.add_argument("tiles_dir", type=Path)
+    parser.add_argument("job_name")
+    parser.add_argument("--width", type=int, required=True)
+    parser.add_argument("--height", type=int, required=True)
+    parser.add_argument("--columns", type=int, required=True)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--npy", action="store_true", help="Keep the stitched float32 .npy frames instead of writing EXRs")
+    parser.add_argument("--exr-codec", choices=EXR_CODECS)
+    parser.add_argument("--exr-color-depth", choices=("16", "32"))
+    parser.add_argument("--exr-dwa-quality", type=int)
+    args = parser.parse_args()
+
+    config = load_jobs_config()
+    codec = args.exr_codec or config.get(args.job_name, "exr_codec", fallback="ZIP").strip().upper()
+    color_depth = args.exr_color_depth or config.get(args.job_name, "exr_color_depth", fallback="32").strip()
+    dwa_quality = args.exr_dwa_quality if args.exr_dwa_quality is not None else config.getint(args.job_name, "exr_dwa_quality", fallback=45)
+
+    regions = frame_regions(args.width, args.height, args.columns, args.rows)
+    tiles = find_region_tiles(args.tiles_dir, args.job_name)
+    if not tiles:
+        print(f"No region tiles for '{args.job_name}' in {args.tiles_dir}")
+        sys.exit(1)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    failed = []
+    for frame, frame_tiles in sorted(tiles.items()):
+        stitched_path = args.output_dir / f"{args.job_name}_{frame:04d}.npy"
+        try:
+            stitched = stitch_frame(frame_tiles, regions, stitched_path, args.width, args.height)
+        except ValueError as e:
+            print(f"Skipping frame {frame}: {e}")
+            failed.append(frame)
+            continue
+
+        if args.npy:
+            print(f"Stitched {stitched_path}")
+            continue
+        exr_path = stitched_path.with_suffix(".exr")
+        write_exr(stitched, exr_path, codec=codec, color_depth=color_depth, dwa_quality=dwa_quality)
+        del stitched
+        stitched_path.unlink()
+        print(f"Stitched {exr_path}")
+
+    if failed:
+        print(f"{len(failed)} frames could not be stitched: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from telemetry import load_telemetry, cold_start_overhead, billed_seconds, frame_costs, percentile, stragglers, overhead_by_engine
+
+
+def print_cold_start(records):
+    print("== Cold start ==")
+    overheads = [cold_start_overhead(record) for record in records]
+    billed = sum(billed_seconds(record) for record in records)
+    print(f"Overhead before first frame: mean {statistics.mean(overheads):.1f}s, p50 {percentile(overheads, 0.5):.1f}s, max {max(overheads):.1f}s")
+    print(f"Overhead share of billed time: {sum(overheads) / billed:.1%} of {billed / 3600:.2f} GPU-hours")
+
+    # Container boot only happens before a container's first record, warm containers' later records start right away.
+    container_records = [record for record in records if record.get("first_in_container", True)]
+    python_startup = [record["container_started_at"] - record["process_started_at"] for record in container_records if record.get("process_started_at")]
+    if python_startup:
+        print(f"  process start -> our code: mean {statistics.mean(python_startup):.1f}s")
+    boot = [record["function_started_at"] - record["container_started_at"] for record in container_records]
+    print(f"  container boot -> function: mean {statistics.mean(boot):.1f}s over {len(container_records)} container starts")
+    phase_names = sorted({name for record in records for name in record["phases"]})
+    for name in phase_names:
+        values = [record["phases"][name] for record in records if name in record["phases"]]
+        print(f"  {name}: mean {statistics.mean(values):.1f}s, max {max(values):.1f}s")
+
+
+def print_frame_costs(records):
+    print("\n== Per-frame cost ==")
+    costs = frame_costs(records)
+    if not costs:
+        print("No frames recorded")
+        return
+    longest = max(costs.values())
+    for frame, seconds in costs.items():
+        bar = "#" * max(1, round(40 * seconds / longest))
+        print(f"{frame:6d} {seconds:8.1f}s {bar}")
+
+    # Grouped by EXR settings, so runs with different codecs or bit depths can be compared.
+    sizes_by_format = {}
+    for record in records:
+        output_format = json.dumps(record.get("output_format"), sort_keys=True) if record.get("output_format") else "unknown format"
+        sizes_by_format.setdefault(output_format, []).extend(frame["output_bytes"] for frame in record["frames"] if frame["output_bytes"])
+    for output_format, sizes in sizes_by_format.items():
+        if sizes:
+            print(f"Output size ({output_format}): mean {statistics.mean(sizes) / 1024 ** 2:.1f} MB/frame, total {sum(sizes) / 1024 ** 3:.2f} GB")
+
+
+def print_engine_overhead(records):
+    print("\n== Overhead vs rendering by engine ==")
+    for engine, overhead in overhead_by_engine(records).items():
+        print(f"{engine}: {overhead.chunks} chunks, {overhead.frames} frames, {overhead.billed_seconds / 3600:.2f} GPU-hours billed")
+        print(f"  {overhead.overhead_ratio():.2f}s of overhead per second of rendering "
+              f"({overhead.overhead_seconds() / overhead.billed_seconds:.0%} of billed time)")
+        print(f"  {overhead.overhead_per_chunk():.0f}s overhead per chunk, {overhead.seconds_per_frame():.1f}s per frame, "
+              f"{overhead.frames / max(1, overhead.chunks):.0f} frames per chunk")
+        # Starting points for min_chunk_size (or [RUN] EEVEE_MIN_CHUNK_SIZE) at these overhead shares.
+        suggestions = ", ".join(f"{share:.0%}: {overhead.chunk_size_for_overhead_share(share)}" for share in (0.25, 0.1, 0.05))
+        print(f"  Frames per chunk for an overhead share of {suggestions}")
+
+
+def print_stragglers(records):
+    print("\n== Stragglers ==")
+    started_at = min(record["container_started_at"] for record in records)
+    durations = [billed_seconds(record) for record in records]
+    print(f"Chunk wall time: p50 {percentile(durations, 0.5):.0f}s, p90 {percentile(durations, 0.9):.0f}s, max {max(durations):.0f}s")
+    finished = [record["function_finished_at"] - started_at for record in records]
+    print(f"Last chunk finished {max(finished):.0f}s after the first container started, p90 finish {percentile(finished, 0.9):.0f}s")
+    for record in sorted(stragglers(records), key=billed_seconds, reverse=True):
+        frames = record["frames"]
+        render_seconds = sum(frame["finished_at"] - frame["started_at"] for frame in frames)
+        label = f"{record['job_name']} {record['start_frame']}-{record['end_frame']}"
+        if record["worker_id"]:
+            label += f" {record['worker_id']}"
+        print(f"  {label}: "
+              f"{billed_seconds(record):.0f}s total, {cold_start_overhead(record):.0f}s setup, "
+              f"{render_seconds / max(1, len(frames)):.1f}s/frame over {len(frames)} frames")
+
+
+def main():
+    """
+    python telemetry_report.py <telemetry_dir> [costs.json]
+
+    <telemetry_dir> holds the *.jsonl files from `modal run src/main.py::download ... --telemetry`.
+    If costs.json is given, median per-frame seconds are written there for `frame_cost_estimates_path` in jobs.ini.
+    """
+    parser = argparse.ArgumentParser(description="Cold start, per-frame cost, overhead and straggler report of render telemetry")
+    parser.add_argument("telemetry_dir", help="Directory of *.jsonl telemetry files")
+    parser.add_argument("costs_json", nargs="?", help="Write median per-frame seconds here, for frame_cost_estimates_path")
+    args = parser.parse_args()
+
+    records = [record for record in load_telemetry(args.telemetry_dir) if record["function_finished_at"]]
+    if not records:
+        print(f"No telemetry records found in {args.telemetry_dir}")
+        sys.exit(1)
+
+    print(f"{len(records)} records, {sum(len(record['frames']) for record in records)} frames\n")
+    print_cold_start(records)
+    print_frame_costs(records)
+    print_engine_overhead(records)
+    print_stragglers(records)
+
+    if args.costs_json:
+        with open(args.costs_json, "w") as f:
+            json.dump(frame_costs(records), f, indent=2)
+        print(f"\nWrote per-frame costs to {args.costs_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import List, Optional
+from paths import BLOBS_DIRECTORY, blend_blob_volume_path, blend_blob_manifest_volume_path, session_manifest_volume_path
+from storage import RenderStorage
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def content_hash(path: Path, block_size: int = HASH_BLOCK_SIZE) -> str:
+    """Streams the file through sha256 so multi-GB .blend files are never held in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def blob_is_uploaded(storage: RenderStorage, blend_hash: str, size: int) -> bool:
+    """A blob counts as uploaded once its manifest exists and both it and the blob agree on the size."""
+    manifest_path = blend_blob_manifest_volume_path(blend_hash)
+    if not storage.exists(manifest_path):
+        return False
+    manifest = json.loads(storage.read_bytes(manifest_path))
+    if manifest.get("size") != size:
+        return False
+    blob_path = blend_blob_volume_path(blend_hash)
+    return storage.exists(blob_path) and storage.size(blob_path) == size
+
+
+def upload_blend(storage: RenderStorage, local_blend: Path, session_id: str, job_name: str) -> str:
+    """
+    Uploads a .blend into the shared blob store (unless it's already there) and points the session at it.
+
+    Returns:
+        str: The content hash identifying the blob.
+    """
+    size = local_blend.stat().st_size
+    print(f"Hashing {local_blend} ({size / 1024 ** 3:.2f} GB)...")
+    blend_hash = content_hash(local_blend)
+
+    # Reference the blob before uploading it so a concurrent gc never sees it unreferenced.
+    write_session_manifest(storage, session_id=session_id, job_name=job_name, blend_hash=blend_hash)
+
+    if blob_is_uploaded(storage, blend_hash, size):
+        print(f"Blob {blend_hash} already uploaded, skipping upload")
+        return blend_hash
+
+    print(f"Uploading blob {blend_hash}...")
+    storage.put_file(local_blend, blend_blob_volume_path(blend_hash))
+    # The manifest is written last and acts as the commit marker for the blob.
+    manifest = {"sha256": blend_hash, "size": size, "source_name": local_blend.name, "uploaded_at": time.time()}
+    storage.put_bytes(json.dumps(manifest).encode(), blend_blob_manifest_volume_path(blend_hash))
+    return blend_hash
+
+
+def write_session_manifest(storage: RenderStorage, session_id: str, job_name: str, blend_hash: str):
+    manifest = {"session_id": session_id, "job_name": job_name, "blend_sha256": blend_hash, "created_at": time.time()}
+    storage.put_bytes(json.dumps(manifest).encode(), session_manifest_volume_path(session_id))
+
+
+def read_session_manifest(storage: RenderStorage, session_id: str) -> Optional[dict]:
+    path = session_manifest_volume_path(session_id)
+    if not storage.exists(path):
+        return None  # Sessions from before the blob store carry their own project.blend
+    return json.loads(storage.read_bytes(path))
+
+
+def referenced_blob_hashes(storage: RenderStorage) -> set[str]:
+    hashes = set()
+    for entry in storage.listdir("/"):
+        session_id = Path(entry.path).name
+        if not entry.is_dir or session_id == BLOBS_DIRECTORY:
+            continue
+        manifest = read_session_manifest(storage, session_id)
+        if manifest is not None:
+            hashes.add(manifest["blend_sha256"])
+    return hashes
+
+
+def collect_unreferenced_blobs(storage: RenderStorage, min_age_seconds: float = 24 * 60 * 60, dry_run: bool = False) -> List[str]:
+    """
+    Removes blobs that no session manifest references.
+
+    Blobs younger than `min_age_seconds`, or without a manifest (upload still in progress), are kept.
+
+    Returns:
+        list: Hashes of the removed (or, on a dry run, removable) blobs.
+    """
+    referenced = referenced_blob_hashes(storage)
+    now = time.time()
+    removed = []
+    for entry in storage.listdir(BLOBS_DIRECTORY):
+        path = Path(entry.path)
+        if path.suffix != ".blend" or path.stem in referenced:
+            continue
+        manifest_path = blend_blob_manifest_volume_path(path.stem)
+        if not storage.exists(manifest_path):
+            continue
+        manifest = json.loads(storage.read_bytes(manifest_path))
+        if now - manifest.get("uploaded_at", now) < min_age_seconds:
+            continue
+
+        print(f"{'Would remove' if dry_run else 'Removing'} unreferenced blob {path.stem} ({entry.size / 1024 ** 3:.2f} GB)")
+        if not dry_run:
+            storage.remove(blend_blob_volume_path(path.stem))
+            storage.remove(manifest_path)
+        removed.append(path.stem)
+    return removed
@@ -1,5 +1,11 @@
+import hashlib
+import json
+import os
 from modal import Image
 
+# Written at image build time once the addons are installed and verified, so containers can skip scanning addon modules.
+ADDON_MANIFEST_PATH = "/opt/blender_addon_manifest.json"
+
 class BlenderAddon:
     def __init__(self, modulename: str, version: (int, int, int), filename: str):
         self.modulename = modulename
@@ -29,4 +35,30 @@ def install_and_verify(addons: list[BlenderAddon]):
 
     print('Verifying addons')
     verify_addons(addons)
+    write_addon_manifest(addons)
+
+def addons_fingerprint(addons: list[BlenderAddon]) -> str:
+    expected = sorted((addon.modulename, list(addon.version)) for addon in addons)
+    return hashlib.sha256(json.dumps(expected).encode()).hexdigest()
+
+def write_addon_manifest(addons: list[BlenderAddon]):
+    manifest = {
+        "fingerprint": addons_fingerprint(addons),
+        "addons": {addon.modulename: list(addon.version) for addon in addons},
+    }
+    with open(ADDON_MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f)
+    print(f"Wrote addon manifest {manifest['fingerprint']}")
 
+def verify_addon_manifest(addons: list[BlenderAddon]):
+    """
+    Cheap startup check: compares the expected addons' fingerprint with the manifest written when the image was built
+    (after a full verify_addons). Falls back to the module scan for images built before the manifest existed.
+    """
+    if not os.path.exists(ADDON_MANIFEST_PATH):
+        verify_addons(addons)
+        return
+    with open(ADDON_MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    if manifest["fingerprint"] != addons_fingerprint(addons):
+        raise ValueError(f"Image was built with addons {manifest['addons']}, expected {[(addon.modulename, addon.version) for addon in addons]}")
@@ -1,5 +1,8 @@
+import csv
+import heapq
+import json
 import math
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 def chunk_frames(frame_count: int, chunk_size: int) -> List[Tuple[int, int]]:
@@ -71,6 +74,204 @@ def chunk_frame_ranges(camera_ranges: List[Tuple[str, int, int]], concurrency_li
     return chunked_frames
 
 
+def chunk_frame_range_by_cost(
+        start: int,
+        end: int,
+        frame_costs: List[float],
+        chunk_count: int,
+        min_chunk_size: int = 1,
+        max_chunk_size: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Splits a frame range into contiguous chunks whose summed costs are as even as possible.
+
+    Uses a contiguous-partition DP that minimizes the most expensive chunk, so heavy sections
+    of a shot (eg. fire filling the frame) end up in shorter chunks. Chunks stay contiguous
+    so use_persistent_data keeps paying off within each one.
+
+    Args:
+        start (int): Start frame number.
+        end (int): End frame number.
+        frame_costs (list): Estimated cost per frame, frame_costs[0] belongs to `start`.
+        chunk_count (int): Desired number of chunks, reduced if the size limits make it infeasible.
+        min_chunk_size (int): Minimum frames per chunk (the last chunk may not reach it on tiny ranges).
+        max_chunk_size (int): Maximum frames per chunk, unlimited when None.
+
+    Returns:
+        list: List of (start_frame, end_frame) tuples in frame order.
+    """
+    frame_count = end - start + 1
+    if len(frame_costs) != frame_count:
+        raise ValueError(f"Expected {frame_count} frame costs, got {len(frame_costs)}")
+
+    max_chunk_size = min(max_chunk_size or frame_count, frame_count)
+    min_chunk_size = max(1, min(min_chunk_size, max_chunk_size))
+    chunk_count = max(1, min(chunk_count, frame_count // min_chunk_size or 1))
+
+    prefix = [0.0]
+    for cost in frame_costs:
+        prefix.append(prefix[-1] + cost)
+
+    # best[j][i]: lowest achievable max chunk cost when the first i frames form j chunks.
+    infinity = float("inf")
+    best = [[infinity] * (frame_count + 1) for _ in range(chunk_count + 1)]
+    split = [[0] * (frame_count + 1) for _ in range(chunk_count + 1)]
+    best[0][0] = 0.0
+    for j in range(1, chunk_count + 1):
+        for i in range(j * min_chunk_size, frame_count + 1):
+            for s in range(max(0, i - max_chunk_size), i - min_chunk_size + 1):
+                if best[j - 1][s] == infinity:
+                    continue
+                candidate = max(best[j - 1][s], prefix[i] - prefix[s])
+                if candidate < best[j][i]:
+                    best[j][i] = candidate
+                    split[j][i] = s
+
+    # Use the largest feasible chunk count; more chunks never make the heaviest one heavier.
+    feasible_counts = [j for j in range(1, chunk_count + 1) if best[j][frame_count] < infinity]
+    if not feasible_counts:
+        return chunk_frame_range(start, end, max_chunk_size)
+    j = feasible_counts[-1]
+
+    chunks = []
+    i = frame_count
+    while j > 0:
+        s = split[j][i]
+        chunks.append((start + s, start + i - 1))
+        i, j = s, j - 1
+    return list(reversed(chunks))
+
+
+def chunk_costs(chunks: List[Tuple[int, int]], start: int, frame_costs: List[float]) -> List[float]:
+    """Sums the per-frame cost of each (start_frame, end_frame) chunk, `frame_costs[0]` belonging to `start`."""
+    return [sum(frame_costs[chunk_start - start:chunk_end - start + 1]) for chunk_start, chunk_end in chunks]
+
+
+def predicted_makespan(costs: List[float], concurrency: int, chunk_overhead: float = 0.0) -> float:
+    """
+    Predicts wall-clock time when chunks are handed out in list order to the first free container.
+
+    Args:
+        costs (list): Estimated cost of each chunk, in dispatch order.
+        concurrency (int): Number of containers rendering at once.
+        chunk_overhead (float): Fixed cost paid by every chunk (cold start, scene load).
+
+    Returns:
+        float: Time at which the last chunk finishes.
+    """
+    finish_times = [0.0] * max(1, concurrency)
+    for cost in costs:
+        earliest = heapq.heappop(finish_times)
+        heapq.heappush(finish_times, earliest + chunk_overhead + cost)
+    return max(finish_times)
+
+
+def longest_processing_time_order(chunks: List[Tuple[int, int]], costs: List[float]) -> List[Tuple[int, int]]:
+    """Orders chunks heaviest first (LPT) so the expensive ones don't start last and straggle."""
+    return [chunk for _, chunk in sorted(zip(costs, chunks), key=lambda pair: -pair[0])]
+
+
+def progressive_passes(start: int, end: int, stride: int, origin: int) -> List[Tuple[int, int, int]]:
+    """
+    Splits a frame range into coarse-to-fine passes, each an animation render with a frame step.
+
+    With a stride of 16, every 16th frame comes first, then the frames halfway between them (every 16th
+    again, offset by 8), then the remaining every-8th, every-4th and finally every other frame. Frames are
+    aligned to `origin` (the job's first frame), so each pass lines up across all chunks of a job.
+
+    Args:
+        start (int): Start frame number.
+        end (int): End frame number.
+        stride (int): Gap between the frames of the first pass, a power of two.
+        origin (int): Frame every pass is aligned to.
+
+    Returns:
+        list: (first_frame, last_frame, frame_step) per non-empty pass, in rendering order.
+    """
+    levels = [(0, stride)]
+    step = stride
+    while step > 1:
+        levels.append((step // 2, step))
+        step //= 2
+
+    passes = []
+    for offset, step in levels:
+        first = start + (offset - (start - origin)) % step
+        if first <= end:
+            passes.append((first, first + (end - first) // step * step, step))
+    return passes
+
+
+def spread_order(count: int) -> List[int]:
+    """
+    Indices 0..count-1 in bit-reversed order, eg. 0, 4, 2, 6, 1, 5, 3, 7.
+
+    Dispatching chunks in this order spreads every prefix (the chunks of one wave of containers) evenly across the shot.
+    """
+    bits = max(1, (count - 1).bit_length())
+    return sorted(range(count), key=lambda i: int(format(i, f"0{bits}b")[::-1], 2))
+
+
+def interpolate_frame_costs(samples: Dict[int, float], start: int, end: int) -> List[float]:
+    """
+    Expands sparse per-frame timings (eg. an eco run that rendered every Nth frame) into a cost for every frame in the range.
+
+    Frames between samples are linearly interpolated, frames outside the sampled span take the nearest sample.
+
+    Args:
+        samples (dict): Frame number -> measured render time.
+        start (int): Start frame number.
+        end (int): End frame number.
+
+    Returns:
+        list: Cost per frame, index 0 belonging to `start`.
+    """
+    if not samples:
+        raise ValueError("No frame cost samples to interpolate from")
+
+    sampled_frames = sorted(samples)
+    costs = []
+    upper = 0
+    for frame in range(start, end + 1):
+        while upper < len(sampled_frames) and sampled_frames[upper] < frame:
+            upper += 1
+        if upper == 0:
+            costs.append(samples[sampled_frames[0]])
+        elif upper == len(sampled_frames):
+            costs.append(samples[sampled_frames[-1]])
+        else:
+            hi = sampled_frames[upper]
+            lo = sampled_frames[upper - 1]
+            t = (frame - lo) / (hi - lo)
+            costs.append(samples[lo] + t * (samples[hi] - samples[lo]))
+    return costs
+
+
+def load_frame_costs(path: str) -> Dict[int, float]:
+    """
+    Loads per-frame render times, eg. exported from a previous eco-mode run.
+
+    Only relative costs matter, so timings from a lower-resolution eco pass are fine to reuse.
+
+    Args:
+        path (str): A .json file mapping frame -> seconds, or a .csv file with `frame,seconds` rows.
+
+    Returns:
+        dict: Frame number -> seconds.
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            return {int(frame): float(seconds) for frame, seconds in json.load(f).items()}
+
+    costs = {}
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip().lstrip("-").isdigit():
+                continue  # Header or blank line
+            costs[int(row[0])] = float(row[1])
+    return costs
+
+
 def test():
     # Example: Flattened Camera Ranges
     # camera_ranges = [
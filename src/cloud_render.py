@@ -1,10 +1,27 @@
+import functools
+import json
+import sys
+import time
+import modal
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Optional
+from telemetry import RenderTelemetry, PROCESS_STARTED_AT, CONTAINER_STARTED_AT
 from dependencies import app, rendering_image, volume, addons
-from paths import VOLUME_MOUNT_PATH
+from paths import VOLUME_MOUNT_PATH, remote_job_telemetry_directory_path, remote_job_frames_directory_path, remote_job_noisy_frames_directory_path, blend_blob_remote_path, sim_cache_remote_path, sim_cache_manifest_volume_path
 from job import JobChunk, Job
 from utils import print_general_info
-from blender_addons import verify_addons
+from blender_addons import verify_addons, verify_addon_manifest
+from frame_queue import ModalFrameQueue, WorkerStats, FrameBatch, drain_frame_queue
+from progress import ChunkResult
+from frame_verify import FrameVerification, verify_frames
+from write_behind import WriteBehindUploader
+from startup import StartupProfile
+from multi_gpu import DeviceRenderer, render_frames_on_devices
+from sim_cache import bake_scene_caches, bake_manifest, relink_scene_caches
+from denoise import DenoiseStats, ModalFrameReadyQueue, make_denoiser, denoise_exr, drain_ready_frames
 
-@app.function(
+render_function_options = dict(
     gpu="L40S",
     cpu=4,
     memory=(8 * 1024),
@@ -14,55 +31,570 @@ from blender_addons import verify_addons
     timeout=(8 * 60 * 60),  # 8 hours.
     retries=0  # No need to burn money if there's an issue...
 )
-def render_sequence(job_chunk: JobChunk) -> str:
-    import bpy
+
+@app.function(**render_function_options)
+def render_sequence(job_chunk: JobChunk) -> ChunkResult:
+    started_at = time.monotonic()
+    telemetry = RenderTelemetry(
+        job_name=job_chunk.job.job_name,
+        session_id=job_chunk.job.session_id,
+        camera_name=job_chunk.job.camera_name,
+        start_frame=job_chunk.chunk_start_frame,
+        end_frame=job_chunk.chunk_end_frame,
+        region_index=job_chunk.region.index if job_chunk.region is not None else None,
+        worker_id="reverse" if job_chunk.reverse else None  # A speculative duplicate gets its own telemetry file
+    )
+    with telemetry.phase("import_bpy"):
+        import bpy
     print(f"render sequence job chunk: {job_chunk}")
+    with telemetry.recording(bpy, remote_job_telemetry_directory_path(job_chunk.job.session_id)):
+        with telemetry.phase("verify_addons"):
+            verify_addon_manifest(addons)
+        configure_rendering(bpy, job_chunk, telemetry)
+        print_general_info(bpy.context)
+        render_started_at = time.monotonic()
+        with write_behind_frames(bpy, job_chunk, telemetry), announce_ready_frames(bpy, job_chunk.job):
+            render_chunk_frames(bpy, job_chunk)  # Render the entire frame range
+    result = ChunkResult(
+        job_name=job_chunk.job.job_name,
+        camera_name=job_chunk.job.camera_name,
+        start_frame=job_chunk.chunk_start_frame,
+        end_frame=job_chunk.chunk_end_frame,
+        setup_seconds=render_started_at - started_at,
+        render_seconds=time.monotonic() - render_started_at,
+        output_path=job_chunk.make_remote_frame_path()
+    )
+    print(f"Successfully rendered: {result}")
+    return result
+
+
+@app.function(**render_function_options)
+def render_queue_worker(job: Job, frame_queue, worker_id: int) -> WorkerStats:
+    """Keeps one scene loaded and renders batches pulled from the shared `frame_queue` (a modal.Queue) until it's empty."""
+    telemetry = RenderTelemetry(
+        job_name=job.job_name,
+        session_id=job.session_id,
+        camera_name=job.camera_name,
+        start_frame=job.overall_start_frame,
+        end_frame=job.overall_end_frame,
+        worker_id=f"worker-{worker_id}"
+    )
+    with telemetry.phase("import_bpy"):
+        import bpy
+    print(f"render queue worker {worker_id} for job: {job}")
+
+    # Entered by the first batch's setup, so a worker that found the queue empty writes no record.
+    recording = ExitStack()
+
+    def setup(batch: FrameBatch):
+        recording.enter_context(telemetry.recording(bpy, remote_job_telemetry_directory_path(job.session_id)))
+        with telemetry.phase("verify_addons"):
+            verify_addon_manifest(addons)
+        configure_rendering(bpy, JobChunk(job=job, chunk_start_frame=batch[0], chunk_end_frame=batch[1]), telemetry)
+        print_general_info(bpy.context)
+
+    def render_batch(batch: FrameBatch):
+        print(f"Worker {worker_id} rendering frames {batch[0]}-{batch[1]}")
+        job_chunk = JobChunk(job=job, chunk_start_frame=batch[0], chunk_end_frame=batch[1])
+        with write_behind_frames(bpy, job_chunk, telemetry), announce_ready_frames(bpy, job):
+            render_chunk_frames(bpy, job_chunk)
+
+    with recording:
+        stats = drain_frame_queue(ModalFrameQueue(frame_queue), worker_id=worker_id, setup=setup, render_batch=render_batch)
+        if stats.failed_batches:
+            telemetry.record["error"] = stats.failed_batches[-1][1]
+    print(f"Worker finished: {stats}")
+    return stats
+
+
+@app.cls(**render_function_options, enable_memory_snapshot=True)
+class WarmRenderer:
+    """
+    Renders many chunks per container without reloading the scene.
+
+    Importing bpy and checking addons happens before the memory snapshot, so new containers restore it instead
+    of paying for it again. Entering then opens `blend_path` once. Later chunks of the same job only change frame
+    range and output path, so persistent data and the BVH survive between them.
+    A chunk from another job or .blend falls back to reconfiguring (and if needed reloading) the scene.
+    """
+    blend_path: str = modal.parameter(default="")
+
+    @modal.enter(snap=True)
+    def import_blender(self):
+        # No GPU is attached while snapshotting, device setup stays in configure_scene.
+        import bpy
+        verify_addon_manifest(addons)
+
+    @modal.enter(snap=False)
+    def load(self):
+        # Module level timestamps come from the snapshotted process, telemetry measures this container from its restore.
+        self.restored_at = time.time()
+        started_at = time.monotonic()
+        import bpy
+        self.loaded_blend_path = None
+        self.configured_job_key = None
+        self.scene_loads = 0
+        self.warm_chunks = 0
+        if self.blend_path:
+            bpy.ops.wm.open_mainfile(filepath=self.blend_path)
+            self.loaded_blend_path = self.blend_path
+            self.scene_loads += 1
+        self.enter_seconds = time.monotonic() - started_at
+        print(f"Warm renderer ready in {self.enter_seconds:.1f}s, blend_path={self.blend_path}")
+
+    @modal.method()
+    def render_chunk(self, job_chunk: JobChunk) -> ChunkResult:
+        started_at = time.monotonic()
+        import bpy
+        print(f"warm render job chunk: {job_chunk}")
+        telemetry = RenderTelemetry(
+            job_name=job_chunk.job.job_name,
+            session_id=job_chunk.job.session_id,
+            camera_name=job_chunk.job.camera_name,
+            start_frame=job_chunk.chunk_start_frame,
+            end_frame=job_chunk.chunk_end_frame,
+            region_index=job_chunk.region.index if job_chunk.region is not None else None,
+            worker_id="reverse" if job_chunk.reverse else None,
+            container_started_at=self.restored_at
+        )
+        # The first chunk of a container also pays for entering it.
+        enter_seconds, self.enter_seconds = self.enter_seconds, 0.0
+        if enter_seconds:
+            telemetry.record["phases"]["container_enter"] = enter_seconds
+
+        with telemetry.recording(bpy, remote_job_telemetry_directory_path(job_chunk.job.session_id)):
+            scene_reused = self.prepare_scene(bpy, job_chunk, telemetry)
+            render_started_at = time.monotonic()
+            with write_behind_frames(bpy, job_chunk, telemetry), announce_ready_frames(bpy, job_chunk.job):
+                render_chunk_frames(bpy, job_chunk)
+
+        result = ChunkResult(
+            job_name=job_chunk.job.job_name,
+            camera_name=job_chunk.job.camera_name,
+            start_frame=job_chunk.chunk_start_frame,
+            end_frame=job_chunk.chunk_end_frame,
+            setup_seconds=enter_seconds + render_started_at - started_at,
+            render_seconds=time.monotonic() - render_started_at,
+            output_path=job_chunk.make_remote_frame_path(),
+            scene_reused=scene_reused
+        )
+        print(f"Successfully rendered: {result}. Scene loads: {self.scene_loads}, warm chunks: {self.warm_chunks}")
+        return result
+
+    def prepare_scene(self, bpy, job_chunk: JobChunk, telemetry: RenderTelemetry) -> bool:
+        """Returns True when the loaded, configured scene could be reused as-is."""
+        blend_path = job_chunk.remote_blender_proj_path()
+        job_key = (job_chunk.job.session_id, job_chunk.job.job_name)
+        scene_reused = blend_path == self.loaded_blend_path and job_key == self.configured_job_key
+
+        if blend_path != self.loaded_blend_path:
+            print(f"Loading {blend_path} (previously {self.loaded_blend_path})")
+            with telemetry.phase("open_mainfile"):
+                bpy.ops.wm.open_mainfile(filepath=blend_path)
+            self.loaded_blend_path = blend_path
+            self.configured_job_key = None
+            self.scene_loads += 1
+
+        if job_key != self.configured_job_key:
+            relink_simulation_caches(bpy, job_chunk.job, telemetry)
+            configure_scene(bpy, job_chunk.job, telemetry)
+            print_general_info(bpy.context)
+            self.configured_job_key = job_key
+        else:
+            self.warm_chunks += 1
+
+        configure_chunk(bpy, job_chunk)
+        return scene_reused
+
+
+@app.cls(**render_function_options)
+class MultiGpuRenderer:
+    """
+    Renders a chunk with one Blender process per GPU of the container, see Job.gpus_per_container.
+
+    main.py requests the GPUs with `with_options`. Every worker opens the .blend from the Volume (after the first,
+    from the page cache), pins itself to its device and is handed single frames of the chunk until none are left.
+    """
+
+    @modal.method()
+    def render_chunk(self, job_chunk: JobChunk) -> ChunkResult:
+        started_at = time.monotonic()
+        print(f"multi-GPU render job chunk on {job_chunk.job.gpus_per_container} devices: {job_chunk}")
+        result = render_frames_on_devices(
+            job_chunk.frames_in_render_order(),
+            job_chunk.job.gpus_per_container,
+            functools.partial(BlenderDeviceRenderer, job_chunk)
+        )
+        for worker in result.workers:
+            print(worker)
+        print(result)
+        if result.failed_frames:
+            # The dispatcher's retries pick up whatever frames didn't make it.
+            raise RuntimeError(f"Frames {sorted(result.failed_frames)} failed on every device: {result.failed_frames}")
+
+        return ChunkResult(
+            job_name=job_chunk.job.job_name,
+            camera_name=job_chunk.job.camera_name,
+            start_frame=job_chunk.chunk_start_frame,
+            end_frame=job_chunk.chunk_end_frame,
+            setup_seconds=result.setup_seconds(),
+            render_seconds=time.monotonic() - started_at - result.setup_seconds(),
+            output_path=job_chunk.make_remote_frame_path(),
+            gpu_count=job_chunk.job.gpus_per_container
+        )
+
+
+class BlenderDeviceRenderer(DeviceRenderer):
+    """Runs in a MultiGpuRenderer worker process: the chunk's scene, rendering on one GPU only."""
+
+    def __init__(self, job_chunk: JobChunk, device_index: int):
+        self.job_chunk = job_chunk
+        self.telemetry = RenderTelemetry(
+            job_name=job_chunk.job.job_name,
+            session_id=job_chunk.job.session_id,
+            camera_name=job_chunk.job.camera_name,
+            start_frame=job_chunk.chunk_start_frame,
+            end_frame=job_chunk.chunk_end_frame,
+            region_index=job_chunk.region.index if job_chunk.region is not None else None,
+            worker_id=f"gpu{device_index}"
+        )
+        with self.telemetry.phase("import_bpy"):
+            import bpy
+        self.bpy = bpy
+        # Open until close(), or until setup or a frame fails: the worker process gets no other chance to write the record.
+        self.recording = ExitStack()
+        self.recording.enter_context(self.telemetry.recording(bpy, remote_job_telemetry_directory_path(job_chunk.job.session_id)))
+        with self.failures_recorded():
+            with self.telemetry.phase("verify_addons"):
+                verify_addon_manifest(addons)
+            configure_rendering(bpy, job_chunk, self.telemetry)
+            pin_cycles_device(bpy, device_index)
+
+    @contextmanager
+    def failures_recorded(self):
+        try:
+            yield
+        except BaseException:
+            self.recording.__exit__(*sys.exc_info())
+            raise
+
+    def render_frame(self, frame: int):
+        with self.failures_recorded():
+            render_frame(self.bpy, self.job_chunk, frame)
+
+    def close(self):
+        self.recording.close()
+
+
+@app.function(
+    cpu=8,
+    image=rendering_image,
+    volumes={VOLUME_MOUNT_PATH: volume},
+    timeout=(30 * 60)
+)
+def verify_session_frames(session_id: str, job_name: str, start_frame: int, end_frame: int, noisy: bool = False, subdirectory: str = "") -> FrameVerification:
+    """
+    Runs next to the Volume so EXR headers are read from the mount rather than downloaded.
+
+    `noisy` checks the frames denoise_on_cpu jobs render, before the denoise workers have written the final ones.
+    `subdirectory` is a camera's directory of a multi-camera job.
+    """
+    volume.reload()
+    directory = remote_job_noisy_frames_directory_path(session_id) if noisy else remote_job_frames_directory_path(session_id)
+    return verify_frames(directory / subdirectory, job_name, start_frame, end_frame, workers=32)
+
+
+@app.function(
+    cpu=8,
+    memory=(16 * 1024),
+    image=rendering_image,
+    volumes={VOLUME_MOUNT_PATH: volume},
+    timeout=(8 * 60 * 60)
+)
+def denoise_frames(job: Job, frame_ready_queue, worker_id: int) -> DenoiseStats:
+    """
+    CPU-only denoising for denoise_on_cpu jobs: denoises the noisy frames render containers announce on
+    `frame_ready_queue` (a modal.Queue) into the session's frames directory, until main closes the queue.
+    """
+    denoiser = make_denoiser(job.denoiser)
+    frames_dir = remote_job_frames_directory_path(job.session_id)
+    frames_dir.mkdir(parents=True, exist_ok=True)
+
+    def denoise_frame(frame: int, noisy_path: str):
+        volume.reload()  # The render container committed the frame after this container's view of the Volume was taken
+        width, height = denoise_exr(Path(noisy_path), frames_dir / Path(noisy_path).name, denoiser, multilayer=job.exr_multilayer)
+        volume.commit()  # Visible to downloads and the frame cache as soon as it's done
+        print(f"Denoise worker {worker_id} denoised frame {frame} ({width}x{height})")
+
+    stats = drain_ready_frames(ModalFrameReadyQueue(frame_ready_queue), worker_id=worker_id, denoiser_name=job.denoiser, denoise_frame=denoise_frame)
+    print(f"Denoise worker finished: {stats}")
+    return stats
+
+
+@app.function(
+    cpu=16,
+    memory=(32 * 1024),
+    image=rendering_image,
+    volumes={VOLUME_MOUNT_PATH: volume},
+    timeout=(8 * 60 * 60)
+)
+def bake_simulations(job: Job, key: str, versions: dict) -> dict:
+    """
+    Bakes the job scene's simulation caches once into the shared sim_cache directory, on CPUs only since Mantaflow,
+    point caches and geometry nodes simulate there anyway. The manifest is written last and marks the bake as usable.
+    """
+    started_at = time.monotonic()
+    import bpy
+    verify_addon_manifest(addons)
+    bpy.ops.wm.open_mainfile(filepath=str(blend_blob_remote_path(job.blend_content_hash, validate=True)))
+    scene = bpy.context.scene
+    slots = bake_scene_caches(bpy, sim_cache_remote_path(key))
+    manifest = bake_manifest(key, job.blend_content_hash, versions, slots, (scene.frame_start, scene.frame_end), time.monotonic() - started_at)
+    manifest_path = VOLUME_MOUNT_PATH / sim_cache_manifest_volume_path(key)
+    manifest_path.with_suffix(".tmp").write_text(json.dumps(manifest))
+    manifest_path.with_suffix(".tmp").rename(manifest_path)
+    volume.commit()
+    print(f"Baked {len(slots)} simulation caches into {key}: {slots}")
+    return manifest
+
+
+def measure_startup(variant: str, submitted_at: float, profile: Optional[StartupProfile] = None) -> dict:
+    """Times the remaining cold start steps of a render container: bpy import, addon checks and device init."""
+    profile = profile or StartupProfile(variant, submitted_at, {
+        "scheduling": max(0.0, PROCESS_STARTED_AT - submitted_at),  # Queueing, image pull and container boot
+        "python_startup": CONTAINER_STARTED_AT - PROCESS_STARTED_AT,
+    })
+    started_at = time.time()
+    import bpy
+    profile.add("import_bpy", started_at)
+
+    started_at = time.time()
     verify_addons(addons)
-    configure_rendering(bpy, job_chunk)
-    print_general_info(bpy.context)
-    bpy.ops.render.render(animation=True)  # Render the entire frame range
-    return f"Successfully rendered frames {job_chunk.chunk_start_frame}-{job_chunk.chunk_end_frame} for {job_chunk.job.camera_name} at {bpy.context.scene.render.filepath}"
+    profile.add("verify_addons_scan", started_at)
+    started_at = time.time()
+    verify_addon_manifest(addons)
+    profile.add("verify_addon_manifest", started_at)
+
+    started_at = time.time()
+    cycles = bpy.context.preferences.addons["cycles"]
+    cycles.preferences.compute_device_type = "OPTIX"
+    cycles.preferences.get_devices()
+    for device in cycles.preferences.devices:
+        device.use = device.type != "CPU"
+    profile.add("device_init", started_at)
+    result = profile.finish()
+    print(f"Startup profile: {result}")
+    return result
 
 
-def configure_rendering(bpy, job_chunk: JobChunk):
-    bpy.ops.wm.open_mainfile(filepath=job_chunk.remote_blender_proj_path())
+@app.function(**render_function_options)
+def profile_startup(submitted_at: float) -> dict:
+    return measure_startup("cold", submitted_at)
 
-    frame_path = job_chunk.make_remote_frame_path()
-    bpy.context.scene.render.filepath = frame_path
 
-    # Set Camera
-    camera_obj = bpy.data.objects.get(job_chunk.job.camera_name)
-    if not camera_obj:
-        raise ValueError(f"Camera '{job_chunk.job.camera_name}' not found in Blender project.")
-    bpy.context.scene.camera = camera_obj
+@app.cls(**render_function_options, enable_memory_snapshot=True)
+class SnapshotStartupProfiler:
+    """The same measurement, with bpy imported and addons verified before the memory snapshot like WarmRenderer."""
+
+    @modal.enter(snap=True)
+    def import_blender(self):
+        started_at = time.time()
+        import bpy
+        verify_addon_manifest(addons)
+        self.snapshot_seconds = time.time() - started_at
+
+    @modal.enter(snap=False)
+    def restored(self):
+        self.restored_at = time.time()
+
+    @modal.method()
+    def profile(self, submitted_at: float) -> dict:
+        # Module level timestamps come from the snapshotted process, so everything up to restore is one phase.
+        profile = StartupProfile("snapshot", submitted_at, {"scheduling_and_restore": max(0.0, self.restored_at - submitted_at)})
+        return measure_startup("snapshot", submitted_at, profile)
+
+
+def render_chunk_frames(bpy, job_chunk: JobChunk):
+    scene = bpy.context.scene
+    if job_chunk.reverse or job_chunk.job.is_multi_camera():
+        # Frame by frame: a speculative copy runs backwards, multi-camera jobs render each frame from every camera in turn.
+        for frame in job_chunk.frames_in_render_order():
+            render_frame(bpy, job_chunk, frame)
+    else:
+        # One pass for contiguous chunks. Progressive chunks render a strided pass per level, persistent data carries over between them.
+        for first_frame, last_frame, frame_step in job_chunk.render_passes():
+            scene.frame_start, scene.frame_end, scene.frame_step = first_frame, last_frame, frame_step
+            bpy.ops.render.render(animation=True)
+    scene.frame_start, scene.frame_end, scene.frame_step = job_chunk.chunk_start_frame, job_chunk.chunk_end_frame, 1
+
+
+def render_frame(bpy, job_chunk: JobChunk, frame: int):
+    """
+    Renders one frame, from each of the job's cameras in turn for multi-camera jobs. With persistent data, switching
+    the camera between renders only resyncs the camera, the scene (BVH, textures, shaders) stays as the first render built it.
+    """
+    scene = bpy.context.scene
+    # A single-frame animation render keeps output naming and frame handlers identical to rendering the whole chunk.
+    scene.frame_start = scene.frame_end = frame
+    if not job_chunk.job.is_multi_camera():
+        bpy.ops.render.render(animation=True)
+        return
+    for camera_name in job_chunk.job.camera_names:
+        scene.camera = bpy.data.objects[camera_name]
+        scene.render.filepath = job_chunk.make_remote_frame_path(camera_name)
+        bpy.ops.render.render(animation=True)
+    scene.camera = bpy.data.objects[job_chunk.job.camera_name]
+    scene.render.filepath = job_chunk.make_remote_frame_path()
+
+
+@contextmanager
+def write_behind_frames(bpy, job_chunk: JobChunk, telemetry: RenderTelemetry):
+    """
+    For write-behind jobs, copies each frame Blender writes to scratch onto the Volume while the next one renders.
+
+    Leaving the block (also on error) flushes the backlog and commits the Volume, so finished frames aren't lost.
+    Must be entered inside telemetry.recording so telemetry sizes each frame before it leaves scratch.
+    """
+    if not job_chunk.job.renders_to_scratch():
+        yield None
+        return
+
+    # Speculative execution watches frames appear on the Volume, so they're committed one by one.
+    commit_every = 1 if job_chunk.job.speculative_execution else 8
+    uploader = WriteBehindUploader(remote_job_frames_directory_path(job_chunk.job.session_id), commit=volume.commit, commit_every=commit_every)
+    uploader.start()
+
+    @bpy.app.handlers.persistent
+    def on_render_write(scene, *args):
+        # render_write rather than render_post, which runs before the file exists.
+        uploader.frame_ready(Path(scene.render.frame_path(frame=scene.frame_current)))
+
+    bpy.app.handlers.render_write.append(on_render_write)
+    try:
+        yield uploader
+    finally:
+        bpy.app.handlers.render_write.remove(on_render_write)
+        stats = uploader.flush()
+        telemetry.record.setdefault("write_behind", []).append(stats.as_dict())
+        print(f"Write-behind finished: {stats}")
+
+
+@contextmanager
+def announce_ready_frames(bpy, job: Job):
+    """
+    For denoise_on_cpu jobs, commits each noisy frame Blender writes to the Volume and queues it for the denoise workers,
+    so denoising overlaps the rest of the render instead of waiting for the chunk.
+    """
+    if job.frame_ready_queue is None:
+        yield
+        return
+
+    ready_frames = ModalFrameReadyQueue(job.frame_ready_queue)
+
+    @bpy.app.handlers.persistent
+    def on_render_write(scene, *args):
+        volume.commit()  # Other containers only see committed files
+        ready_frames.put_frame(scene.frame_current, scene.render.frame_path(frame=scene.frame_current))
+
+    bpy.app.handlers.render_write.append(on_render_write)
+    try:
+        yield
+    finally:
+        bpy.app.handlers.render_write.remove(on_render_write)
+
+
+def configure_rendering(bpy, job_chunk: JobChunk, telemetry: RenderTelemetry):
+    with telemetry.phase("open_mainfile"):
+        bpy.ops.wm.open_mainfile(filepath=job_chunk.remote_blender_proj_path())
+    relink_simulation_caches(bpy, job_chunk.job, telemetry)
+    configure_scene(bpy, job_chunk.job, telemetry)
+    configure_chunk(bpy, job_chunk)
+
+
+def relink_simulation_caches(bpy, job: Job, telemetry: RenderTelemetry):
+    """Points the freshly opened scene's simulation caches at the job's shared bake, if it has one (see bake_simulations)."""
+    if job.sim_cache_key is None:
+        return
+    with telemetry.phase("relink_sim_caches"):
+        manifest = json.loads((VOLUME_MOUNT_PATH / sim_cache_manifest_volume_path(job.sim_cache_key)).read_text())
+        relinked, missing = relink_scene_caches(bpy, sim_cache_remote_path(job.sim_cache_key), manifest)
+    print(f"Relinked {len(relinked)} simulation caches to bake {job.sim_cache_key}: {relinked}")
+    if missing:
+        print(f"WARNING: Caches not in the bake, simulated from their first frame: {missing}")
+
+
+def configure_chunk(bpy, job_chunk: JobChunk):
+    """Frame range and output path, the only settings that differ between chunks of the same job."""
+    frame_path = job_chunk.make_scratch_frame_path() if job_chunk.job.renders_to_scratch() else job_chunk.make_remote_frame_path()
+    bpy.context.scene.render.filepath = frame_path
 
     bpy.context.scene.frame_start = job_chunk.chunk_start_frame
     bpy.context.scene.frame_end = job_chunk.chunk_end_frame
+    bpy.context.scene.frame_step = 1
+
+    render = bpy.context.scene.render
+    if job_chunk.region is not None:
+        width, height = job_chunk.job.output_resolution()
+        render.use_border = True
+        render.use_crop_to_border = True  # Tiles are written at region size and stitched locally
+        render.border_min_x, render.border_max_x, render.border_min_y, render.border_max_y = job_chunk.region.blender_border(width, height)
+    else:
+        render.use_border = False
+
 
-    bpy.context.scene.render.resolution_x = job_chunk.job.width
-    bpy.context.scene.render.resolution_y = job_chunk.job.height
+def configure_scene(bpy, job: Job, telemetry: RenderTelemetry):
+    # Set Camera, multi-camera jobs switch between theirs for every frame (see render_frame)
+    for camera_name in job.camera_names:
+        if not bpy.data.objects.get(camera_name):
+            raise ValueError(f"Camera '{camera_name}' not found in Blender project.")
+    bpy.context.scene.camera = bpy.data.objects[job.camera_name]
+
+    bpy.context.scene.render.resolution_x = job.width
+    bpy.context.scene.render.resolution_y = job.height
 
     bpy.context.scene.render.image_settings.color_management = 'OVERRIDE'
     bpy.context.scene.render.image_settings.linear_colorspace_settings.name = 'ACEScg'
 
-    bpy.context.scene.render.image_settings.file_format = 'OPEN_EXR'
-    bpy.context.scene.render.image_settings.color_mode = 'RGB'
-    bpy.context.scene.render.image_settings.color_depth = '32'
+    configure_exr_output(bpy, job)
+    telemetry.record["output_format"] = job.exr_output_settings()
+    telemetry.record["render_engine"] = job.render_engine
 
-    if job_chunk.job.render_engine == "CYCLES":
-        configure_rendering_cycles(bpy, job_chunk.job)
+    if job.render_engine == "CYCLES":
+        configure_rendering_cycles(bpy, job, telemetry)
+    elif job.render_engine == "BLENDER_EEVEE_NEXT":
+        configure_rendering_eevee(bpy, job, telemetry)
     else:
-        raise ValueError(f"Rendering engine '{job_chunk.job.render_engine}' not supported.")
+        raise ValueError(f"Rendering engine '{job.render_engine}' not supported.")
+
+
+def configure_exr_output(bpy, job: Job):
+    image_settings = bpy.context.scene.render.image_settings
+    # Noisy frames carry the denoising passes, the denoise workers write single layer frames again unless exr_multilayer is set.
+    image_settings.file_format = 'OPEN_EXR_MULTILAYER' if job.exr_multilayer or job.denoise_on_cpu else 'OPEN_EXR'
+    image_settings.color_mode = 'RGB'
+    image_settings.color_depth = job.exr_color_depth
+    image_settings.exr_codec = job.exr_codec  # DWAA/DWAB at OpenEXR's default level, Blender 4.2 has no setting for it
 
+    view_layer = bpy.context.view_layer
+    for name in job.exr_passes:
+        if not hasattr(view_layer, f"use_pass_{name}"):
+            raise ValueError(f"Unknown render pass '{name}'.")
+        setattr(view_layer, f"use_pass_{name}", True)
 
-def configure_rendering_cycles(bpy, job: Job):
+
+def configure_rendering_cycles(bpy, job: Job, telemetry: RenderTelemetry):
     print(f"Configuring rendering for CYCLES")
     bpy.context.scene.render.engine = "CYCLES"
 
     cycles = bpy.context.preferences.addons["cycles"]
     cycles.preferences.compute_device_type = "OPTIX"
     bpy.context.scene.cycles.device = 'GPU'
-    bpy.context.scene.cycles.denoising_use_gpu = True
+    if job.denoise_on_cpu:
+        # Noisy beauty plus albedo and normal passes, denoised by denoise_frames on CPU containers instead.
+        bpy.context.scene.cycles.use_denoising = False
+        bpy.context.view_layer.cycles.denoising_store_passes = True
+    else:
+        bpy.context.scene.cycles.denoising_use_gpu = True
     bpy.context.scene.cycles.use_auto_tile = False
     bpy.context.scene.render.use_persistent_data = True
 
@@ -70,18 +602,51 @@ def configure_rendering_cycles(bpy, job: Job):
     bpy.context.scene.cycles.samples = job.render_max_samples
     bpy.context.scene.cycles.use_adaptive_sampling = True
 
+    bpy.context.scene.render.resolution_percentage = job.resolution_percentage()
     if job.eco_mode_enabled:
         bpy.context.scene.cycles.adaptive_threshold = 0.2
-
-        if job.height > 1500:
-            bpy.context.scene.render.resolution_percentage = 25
-        else:
-            bpy.context.scene.render.resolution_percentage = 66 # Eg. 720p if 1080p
     else:
-        bpy.context.scene.render.resolution_percentage = 100
         bpy.context.scene.cycles.adaptive_threshold = job.render_adaptive_threshold
 
     # reload the devices to update the configuration
-    cycles.preferences.get_devices()
-    for device in cycles.preferences.devices:
-        device.use = device.type != "CPU"
+    with telemetry.phase("device_setup"):
+        cycles.preferences.get_devices()
+        for device in cycles.preferences.devices:
+            device.use = device.type != "CPU"
+
+
+def configure_rendering_eevee(bpy, job: Job, telemetry: RenderTelemetry):
+    print(f"Configuring rendering for BLENDER_EEVEE_NEXT")
+    bpy.context.scene.render.engine = "BLENDER_EEVEE_NEXT"
+    bpy.context.scene.eevee.taa_render_samples = job.render_samples()
+    bpy.context.scene.render.resolution_percentage = job.resolution_percentage()
+
+    # EEVEE draws through OpenGL on an EGL context (see EGL-setup.sh). If the NVIDIA EGL vendor isn't picked up it
+    # silently falls back to Mesa's software rasterizer, rendering on the CPU at a fraction of the speed.
+    with telemetry.phase("device_setup"):
+        renderer = gpu_renderer_name()
+    telemetry.record["gpu_renderer"] = renderer
+    print(f"EEVEE GPU renderer: {renderer or 'unknown until the first render'}")
+    if renderer and any(name in renderer.lower() for name in ("llvmpipe", "softpipe", "swrast")):
+        print(f"WARNING: EEVEE is rendering on the CPU through {renderer}, check the EGL setup")
+
+
+def gpu_renderer_name() -> Optional[str]:
+    """OpenGL renderer string of Blender's GPU context, if one is up yet (eg. "NVIDIA L4/PCIe/SSE2")."""
+    try:
+        import gpu
+        return gpu.platform.renderer_get()
+    except (ImportError, AttributeError, SystemError, RuntimeError):
+        return None
+
+
+def pin_cycles_device(bpy, device_index: int):
+    """Leaves only the `device_index`-th GPU of the configured compute device type enabled."""
+    preferences = bpy.context.preferences.addons["cycles"].preferences
+    gpus = [device for device in preferences.devices if device.type == preferences.compute_device_type]
+    if device_index >= len(gpus):
+        raise RuntimeError(f"Device {device_index} requested but only {len(gpus)} {preferences.compute_device_type} devices found: {[device.name for device in gpus]}")
+    pinned_id = gpus[device_index].id  # RNA wrappers are recreated on access, so compare ids rather than objects
+    for device in preferences.devices:
+        device.use = device.id == pinned_id
+    print(f"Pinned to device {device_index}: {gpus[device_index].name}")
@@ -0,0 +1,363 @@
+import configparser
+import os
+import queue
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (frame, path of the noisy EXR) handed from render workers to denoise workers as each frame lands on the Volume.
+ReadyFrame = Tuple[int, str]
+# Put once per denoise worker after the last frame, None can't mark the end since a Modal Queue get returns it on timeout.
+NO_MORE_FRAMES: ReadyFrame = (-1, "")
+
+# Multilayer EXR passes Cycles writes with view_layer.cycles.denoising_store_passes, next to the noisy Combined pass.
+COMBINED_PASS = "Combined"
+ALBEDO_PASS = "Denoising Albedo"
+NORMAL_PASS = "Denoising Normal"
+DENOISING_PASS_PREFIX = "Denoising "
+
+
+class FrameReadyQueue:
+    """
+    Frames rendered but not yet denoised, linking GPU render workers to CPU denoise workers.
+
+    Like FrameQueue, backends are a Modal Queue in the cloud or an in-process queue locally.
+    """
+
+    def put_frame(self, frame: int, path: str):
+        raise NotImplementedError
+
+    def get_frame(self, timeout: float) -> Optional[ReadyFrame]:
+        """The next frame, NO_MORE_FRAMES once rendering is done, or None if nothing arrived within `timeout`."""
+        raise NotImplementedError
+
+    def close(self, worker_count: int):
+        """Tells every denoise worker to finish once the frames queued so far are done."""
+        for _ in range(worker_count):
+            self.put_frame(*NO_MORE_FRAMES)
+
+
+class InProcessFrameReadyQueue(FrameReadyQueue):
+    def __init__(self):
+        self._frames = queue.Queue()
+
+    def put_frame(self, frame: int, path: str):
+        self._frames.put((frame, path))
+
+    def get_frame(self, timeout: float) -> Optional[ReadyFrame]:
+        try:
+            return self._frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ModalFrameReadyQueue(FrameReadyQueue):
+    def __init__(self, queue):
+        # `queue` is a modal.Queue, passed in so this module doesn't need Modal installed.
+        self.queue = queue
+
+    def put_frame(self, frame: int, path: str):
+        self.queue.put((frame, path))
+
+    def get_frame(self, timeout: float) -> Optional[ReadyFrame]:
+        ready = self.queue.get(block=True, timeout=timeout)  # Returns None on timeout.
+        return tuple(ready) if ready is not None else None
+
+
+# Denoisers. NumPy (and OIDN) are imported lazily, the render image only needs them in denoise containers.
+
+class Denoiser:
+    """Denoises a (height, width, 3) float32 beauty image, guided by its albedo and normal passes when given."""
+    name = ""
+
+    def denoise(self, color, albedo=None, normal=None):
+        raise NotImplementedError
+
+
+class OidnDenoiser(Denoiser):
+    """Intel Open Image Denoise on the CPU, the same denoiser Cycles runs in the render loop."""
+    name = "oidn"
+
+    def __init__(self):
+        import oidn
+        self.oidn = oidn
+        self.device = oidn.NewDevice(oidn.DEVICE_TYPE_CPU)
+        oidn.CommitDevice(self.device)
+
+    def denoise(self, color, albedo=None, normal=None):
+        import numpy as np
+        oidn = self.oidn
+        height, width, _ = color.shape
+        # Shared images are read in place, so they must stay referenced (and contiguous) until the filter has run.
+        images = {"color": np.ascontiguousarray(color, dtype=np.float32)}
+        if albedo is not None:
+            images["albedo"] = np.ascontiguousarray(albedo, dtype=np.float32)
+            if normal is not None:  # OIDN only takes a normal pass together with albedo
+                images["normal"] = np.ascontiguousarray(normal, dtype=np.float32)
+        images["output"] = np.empty_like(images["color"])
+        denoise_filter = oidn.NewFilter(self.device, "RT")
+        try:
+            for name, image in images.items():
+                oidn.SetSharedFilterImage(denoise_filter, name, image, oidn.FORMAT_FLOAT3, width, height)
+            set_filter_hdr(denoise_filter)
+            oidn.CommitFilter(denoise_filter)
+            oidn.ExecuteFilter(denoise_filter)
+        finally:
+            oidn.ReleaseFilter(denoise_filter)
+        error = oidn.GetDeviceError(self.device)
+        if error:
+            raise RuntimeError(f"OIDN failed with error {error}")
+        return images["output"]
+
+
+def set_filter_hdr(denoise_filter: int):
+    """Frames are linear scene-referred EXRs. The oidn bindings don't wrap oidnSetFilter1b, the loaded library has it."""
+    import ctypes
+    import oidn
+    library_dir = Path(oidn.__file__).parent / "lib.linux.x64"
+    library = ctypes.CDLL(str(library_dir / f"libOpenImageDenoise.so.{oidn.oidn_version}"))  # Already loaded, dlopen returns it
+    library.oidnSetFilter1b.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_bool]
+    library.oidnSetFilter1b(denoise_filter, b"hdr", True)
+
+
+class GuidedBlurDenoiser(Denoiser):
+    """
+    Stand-in for OIDN where it isn't installed: a cross-bilateral blur weighted by albedo and normal similarity,
+    so edges in the guide passes survive. Far below OIDN's quality, but exercises the same inputs and outputs.
+    """
+    name = "guided-blur"
+
+    def __init__(self, radius: int = 2, albedo_sigma: float = 0.1, normal_sigma: float = 0.3):
+        self.radius = radius
+        self.albedo_sigma = albedo_sigma
+        self.normal_sigma = normal_sigma
+
+    def denoise(self, color, albedo=None, normal=None):
+        import numpy as np
+        color = np.asarray(color, dtype=np.float32)
+        height, width, _ = color.shape
+        pad = self.radius
+        padded = {"color": np.pad(color, ((pad, pad), (pad, pad), (0, 0)), mode="edge")}
+        guides = [(name, np.asarray(guide, dtype=np.float32), sigma)
+                  for name, guide, sigma in (("albedo", albedo, self.albedo_sigma), ("normal", normal, self.normal_sigma)) if guide is not None]
+        for name, guide, _ in guides:
+            padded[name] = np.pad(guide, ((pad, pad), (pad, pad), (0, 0)), mode="edge")
+
+        total = np.zeros_like(color)
+        weight_sum = np.zeros((height, width, 1), dtype=np.float32)
+        for dy in range(-pad, pad + 1):
+            for dx in range(-pad, pad + 1):
+                window = (slice(pad + dy, pad + dy + height), slice(pad + dx, pad + dx + width))
+                weight = np.full((height, width, 1), np.exp(-(dx * dx + dy * dy) / (2 * pad * pad or 1)), dtype=np.float32)
+                for name, guide, sigma in guides:
+                    difference = padded[name][window] - guide
+                    weight *= np.exp(-np.sum(difference * difference, axis=2, keepdims=True) / (2 * sigma * sigma))
+                total += padded["color"][window] * weight
+                weight_sum += weight
+        return total / np.maximum(weight_sum, 1e-8)
+
+
+DENOISERS: Dict[str, Callable[[], Denoiser]] = {
+    OidnDenoiser.name: OidnDenoiser,
+    GuidedBlurDenoiser.name: GuidedBlurDenoiser,
+}
+
+
+def make_denoiser(name: str) -> Denoiser:
+    if name not in DENOISERS:
+        raise ValueError(f"Unknown denoiser '{name}', expected one of {sorted(DENOISERS)}")
+    return DENOISERS[name]()
+
+
+# Multilayer EXR reading and writing, OpenEXR is imported lazily like in regions.py.
+
+def read_exr_channels(path: Path) -> Tuple[Dict[str, object], dict]:
+    """Every channel of an EXR as a (height, width) float32 array, and the header to write them back with."""
+    import numpy as np
+    import OpenEXR
+    import Imath
+
+    exr = OpenEXR.InputFile(str(path))
+    header = exr.header()
+    data_window = header["dataWindow"]
+    width = data_window.max.x - data_window.min.x + 1
+    height = data_window.max.y - data_window.min.y + 1
+    float_type = Imath.PixelType(Imath.PixelType.FLOAT)
+    channels = {name: np.frombuffer(exr.channel(name, float_type), dtype=np.float32).reshape(height, width) for name in header["channels"]}
+    exr.close()
+    return channels, header
+
+
+def pass_channels(channels: Dict[str, object], pass_name: str, components: str) -> Optional[List[str]]:
+    """
+    Channel names of a pass, eg. "ViewLayer.Denoising Albedo.R", or the bare "R", "G", "B" of a single layer beauty.
+
+    Returns None if the EXR doesn't have the pass.
+    """
+    names = []
+    for component in components:
+        suffix = f"{pass_name}.{component}"
+        matches = [name for name in channels if name.endswith(f".{suffix}") or name == suffix]
+        if not matches and pass_name == COMBINED_PASS and component in channels:
+            matches = [component]
+        if not matches:
+            return None
+        names.append(matches[0])
+    return names
+
+
+def stacked(channels: Dict[str, object], names: Optional[List[str]]):
+    import numpy as np
+    return np.stack([channels[name] for name in names], axis=2) if names else None
+
+
+def write_exr_channels(channels: Dict[str, object], header: dict, path: Path):
+    """
+    Writes (height, width) channels with `header`, whose "channels" gives each one's pixel type (half floats stay half).
+
+    The EXR goes to a temporary file first and is renamed into place, so nothing ever sees a partial frame.
+    """
+    import numpy as np
+    import OpenEXR
+    import Imath
+
+    half = Imath.PixelType(Imath.PixelType.HALF)
+    pixels = {name: np.ascontiguousarray(data, dtype=np.float16 if header["channels"][name].type == half else np.float32).tobytes()
+              for name, data in channels.items()}
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    exr = OpenEXR.OutputFile(str(temporary_path), header)
+    exr.writePixels(pixels)
+    exr.close()
+    os.replace(temporary_path, path)
+
+
+def denoise_exr(noisy_path: Path, output_path: Path, denoiser: Denoiser, multilayer: bool) -> Tuple[int, int]:
+    """
+    Denoises the combined pass of a noisy multilayer frame into `output_path`, guided by its albedo and normal passes.
+
+    The denoising passes only exist for this stage and are dropped. A multilayer output keeps every other pass as-is,
+    otherwise it's the single layer RGB EXR Blender would have written. Returns the (width, height) of the frame.
+    """
+    import OpenEXR
+
+    channels, header = read_exr_channels(noisy_path)
+    color_names = pass_channels(channels, COMBINED_PASS, "RGB")
+    if color_names is None:
+        raise ValueError(f"{noisy_path} has no combined pass, channels: {sorted(channels)}")
+    albedo = stacked(channels, pass_channels(channels, ALBEDO_PASS, "RGB"))
+    normal = stacked(channels, pass_channels(channels, NORMAL_PASS, "XYZ"))
+    if albedo is None:
+        print(f"WARNING: {noisy_path.name} has no denoising passes, denoising the beauty alone")
+
+    denoised = denoiser.denoise(stacked(channels, color_names), albedo, normal)
+    height, width = denoised.shape[:2]
+    if multilayer:
+        output = {name: data for name, data in channels.items() if f".{DENOISING_PASS_PREFIX}" not in name and not name.startswith(DENOISING_PASS_PREFIX)}
+        output.update({name: denoised[:, :, i] for i, name in enumerate(color_names)})
+        output_header = dict(header)
+        output_header["channels"] = {name: header["channels"][name] for name in output}
+    else:
+        output = {component: denoised[:, :, i] for i, component in enumerate("RGB")}
+        output_header = OpenEXR.Header(width, height)
+        output_header["compression"] = header["compression"]
+        output_header["channels"] = {component: header["channels"][name] for component, name in zip("RGB", color_names)}
+    write_exr_channels(output, output_header, output_path)
+    return width, height
+
+
+class DenoiseStats:
+    """One denoise worker's frames and where its time went, mirroring WorkerStats for render workers."""
+
+    def __init__(self, worker_id: int, denoiser: str, started_at: float):
+        self.worker_id = worker_id
+        self.denoiser = denoiser
+        self.started_at = started_at
+        self.finished_at = started_at
+        self.frame_seconds: Dict[int, float] = {}
+        self.failed: Dict[int, str] = {}
+
+    def __repr__(self):
+        return (f"DenoiseStats(worker_id={self.worker_id}, denoiser={self.denoiser}, frames={len(self.frame_seconds)}, failed={len(self.failed)}, "
+                f"busy_seconds={self.busy_seconds():.1f}, wall_seconds={self.wall_seconds():.1f}, utilization={self.utilization():.0%})")
+
+    def busy_seconds(self) -> float:
+        return sum(self.frame_seconds.values())
+
+    def wall_seconds(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+    def utilization(self) -> float:
+        wall_seconds = self.wall_seconds()
+        return self.busy_seconds() / wall_seconds if wall_seconds > 0 else 0.0
+
+
+def drain_ready_frames(
+        ready_frames: FrameReadyQueue,
+        worker_id: int,
+        denoiser_name: str,
+        denoise_frame: Callable[[int, str], None],
+        poll_seconds: float = 30,
+        clock: Callable[[], float] = time.monotonic
+) -> DenoiseStats:
+    """
+    Denoises frames as render workers queue them, until NO_MORE_FRAMES.
+
+    A frame that fails to denoise is recorded and skipped, its noisy EXR is still on the Volume to retry from.
+    """
+    stats = DenoiseStats(worker_id=worker_id, denoiser=denoiser_name, started_at=clock())
+    while True:
+        ready = ready_frames.get_frame(timeout=poll_seconds)
+        if ready is None:
+            continue  # Rendering is still underway, eg. every GPU worker is between frames
+        frame, path = ready
+        if (frame, path) == NO_MORE_FRAMES:
+            break
+        started_at = clock()
+        try:
+            denoise_frame(frame, path)
+        except Exception as e:
+            stats.failed[frame] = repr(e)
+            print(f"Denoise worker {worker_id} failed on frame {frame}: {e!r}")
+            continue
+        stats.frame_seconds[frame] = clock() - started_at
+    stats.finished_at = clock()
+    return stats
+
+
+class DenoiseReport:
+    """What moving denoising off the GPUs bought: GPU-seconds saved per frame against the CPU time spent instead."""
+
+    def __init__(self, worker_stats: List[DenoiseStats], gpu_denoise_seconds_per_frame: float, rendered_frames: int):
+        self.worker_stats = worker_stats
+        self.gpu_denoise_seconds_per_frame = gpu_denoise_seconds_per_frame
+        self.rendered_frames = rendered_frames
+
+    def denoised_frames(self) -> int:
+        return sum(len(stats.frame_seconds) for stats in self.worker_stats)
+
+    def failed_frames(self) -> List[int]:
+        return sorted(frame for stats in self.worker_stats for frame in stats.failed)
+
+    def cpu_seconds_per_frame(self) -> float:
+        frames = self.denoised_frames()
+        return sum(stats.busy_seconds() for stats in self.worker_stats) / frames if frames else 0.0
+
+    def gpu_seconds_saved(self) -> float:
+        return self.gpu_denoise_seconds_per_frame * self.denoised_frames()
+
+    def print(self):
+        for stats in sorted(self.worker_stats, key=lambda s: s.worker_id):
+            print(stats)
+        print(f"CPU denoising: {self.denoised_frames()}/{self.rendered_frames} frames, {self.cpu_seconds_per_frame():.1f} CPU container seconds per frame, "
+              f"{self.gpu_denoise_seconds_per_frame:.1f} GPU-seconds saved per frame, {self.gpu_seconds_saved() / 3600:.2f} GPU-hours saved in total")
+        if self.failed_frames():
+            print(f"WARNING: Frames left noisy: {self.failed_frames()}")
+
+
+def gpu_denoise_seconds_from_config(config: configparser.ConfigParser) -> float:
+    """
+    [RUN].DENOISE_GPU_SECONDS_PER_FRAME, what denoising in the render loop costs per frame on the GPU.
+
+    It isn't observable from a run that skips it, measure it by rendering a few frames with and without denoise_on_cpu.
+    """
+    return config.getfloat("RUN", "DENOISE_GPU_SECONDS_PER_FRAME", fallback=4)
@@ -26,12 +26,34 @@ rendering_image = (
     # Blender Addons
     .add_local_dir("remote_resources/blender_addons", remote_path="/tmp/blender_addons", copy=True)
     .run_function(install_and_verify, kwargs={'addons': addons})
+    # CPU denoising of denoise_on_cpu jobs, see denoise.py
+    .pip_install("OpenEXR", "oidn")
     .add_local_python_source("dependencies") 
     .add_local_python_source("paths") 
     .add_local_python_source("job")
     .add_local_python_source("utils")
     .add_local_python_source("blender_addons")
     .add_local_python_source("chunking")
+    .add_local_python_source("frame_queue")
+    .add_local_python_source("storage")
+    .add_local_python_source("blend_cache")
+    .add_local_python_source("progress")
+    .add_local_python_source("download")
+    .add_local_python_source("telemetry")
+    .add_local_python_source("simulator")
+    .add_local_python_source("dispatch")
+    .add_local_python_source("regions")
+    .add_local_python_source("frame_verify")
+    .add_local_python_source("fault_tolerance")
+    .add_local_python_source("frame_cache")
+    .add_local_python_source("write_behind")
+    .add_local_python_source("startup")
+    .add_local_python_source("speculation")
+    .add_local_python_source("multi_gpu")
+    .add_local_python_source("planner")
+    .add_local_python_source("sim_cache")
+    .add_local_python_source("denoise")
+    .add_local_python_source("multi_camera")
 )
 
 volume = modal.Volume.from_name("distributed-render", create_if_missing=True)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class ChunkDispatcher:
+    """
+    Runs work items through a blocking `render_fn` with at most `max_in_flight` running at once.
+
+    Pending items start highest priority first (FIFO within a priority) and results are yielded
+    as they complete. `render_fn` is typically a Modal function's `.remote`, but any callable works,
+    so the scheduling can be exercised locally with a fake renderer.
+    """
+
+    def __init__(self, render_fn: Callable[[Any], Any], max_in_flight: int):
+        self.render_fn = render_fn
+        self.max_in_flight = max(1, max_in_flight)
+        self._pending = []
+        self._sequence = itertools.count()
+
+    def submit(self, item: Any, priority: int = 0):
+        heapq.heappush(self._pending, (-priority, next(self._sequence), item))
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def results(self) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """
+        Yields (item, result, error) as items finish; exactly one of result/error is set.
+
+        Items may be submitted while iterating (eg. retries), they are picked up as slots free up.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            in_flight = {}
+            while self._pending or in_flight:
+                while self._pending and len(in_flight) < self.max_in_flight:
+                    _, _, item = heapq.heappop(self._pending)
+                    in_flight[executor.submit(self.render_fn, item)] = item
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    error = future.exception()
+                    yield item, (None if error else future.result()), error
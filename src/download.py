@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from storage import RenderStorage, StoragePath, StorageEntry
+
+PARTIAL_SUFFIX = ".part"
+MANIFEST_NAME = ".download_manifest.json"
+
+
+class DownloadResult:
+    def __init__(self, remote_path: str, status: str, bytes_transferred: int = 0, error: Optional[str] = None):
+        self.remote_path = remote_path
+        self.status = status  # "downloaded", "resumed", "skipped" or "failed"
+        self.bytes_transferred = bytes_transferred
+        self.error = error
+
+    def __repr__(self):
+        return f"DownloadResult(remote_path={self.remote_path}, status={self.status}, bytes_transferred={self.bytes_transferred}, error={self.error})"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FrameDownloader:
+    """
+    Mirrors a Volume directory into a local one with a bounded pool of download threads.
+
+    Files already present with the expected size (and, with `verify_hashes`, the hash recorded
+    when they were downloaded) are skipped. Interrupted transfers are kept as `.part` files and
+    resumed from where they stopped.
+    """
+
+    def __init__(self, storage: RenderStorage, remote_dir: StoragePath, local_dir: Path, workers: int = 8, verify_hashes: bool = False):
+        self.storage = storage
+        self.remote_dir = remote_dir
+        self.local_dir = Path(local_dir).expanduser()
+        self.workers = max(1, workers)
+        self.verify_hashes = verify_hashes
+        self._manifest_lock = threading.Lock()
+        self._manifest: Dict[str, dict] = self._load_manifest()
+
+    def _manifest_path(self) -> Path:
+        return self.local_dir / MANIFEST_NAME
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if self._manifest_path().exists():
+            return json.loads(self._manifest_path().read_text())
+        return {}
+
+    def _record(self, name: str, size: int, sha256: str):
+        with self._manifest_lock:
+            self._manifest[name] = {"size": size, "sha256": sha256}
+            temporary_path = self._manifest_path().with_suffix(PARTIAL_SUFFIX)
+            temporary_path.write_text(json.dumps(self._manifest))
+            os.replace(temporary_path, self._manifest_path())
+
+    def is_complete(self, entry: StorageEntry) -> bool:
+        name = Path(entry.path).name
+        local_path = self.local_dir / name
+        if not local_path.exists() or local_path.stat().st_size != entry.size:
+            return False
+        if not self.verify_hashes:
+            return True
+        recorded = self._manifest.get(name)
+        return recorded is not None and recorded["size"] == entry.size and recorded["sha256"] == file_sha256(local_path)
+
+    def download_entry(self, entry: StorageEntry) -> DownloadResult:
+        name = Path(entry.path).name
+        if self.is_complete(entry):
+            return DownloadResult(entry.path, "skipped")
+
+        local_path = self.local_dir / name
+        partial_path = local_path.with_name(name + PARTIAL_SUFFIX)
+        offset = partial_path.stat().st_size if partial_path.exists() else 0
+        if offset > entry.size:
+            offset = 0  # Stale partial from a different version of the file
+        try:
+            with open(partial_path, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                f.truncate()
+                transferred = 0
+                for block in self.storage.read_stream(entry.path, offset=offset):
+                    f.write(block)
+                    transferred += len(block)
+            if partial_path.stat().st_size != entry.size:
+                raise IOError(f"Expected {entry.size} bytes, got {partial_path.stat().st_size}")
+            os.replace(partial_path, local_path)
+        except Exception as e:
+            return DownloadResult(entry.path, "failed", error=str(e))
+
+        self._record(name, entry.size, file_sha256(local_path))
+        return DownloadResult(entry.path, "resumed" if offset else "downloaded", bytes_transferred=transferred)
+
+    def pending_entries(self) -> List[StorageEntry]:
+        return [entry for entry in self.storage.listdir(self.remote_dir) if not entry.is_dir]
+
+    def download_all(self, entries: Optional[List[StorageEntry]] = None) -> List[DownloadResult]:
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        entries = self.pending_entries() if entries is None else entries
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self.download_entry, entries))
+
+    def follow(self, stop_event: threading.Event, poll_seconds: float = 30) -> List[DownloadResult]:
+        """
+        Keeps pulling new frames until `stop_event` is set, eg. while the render is still running.
+
+        A file is only fetched once its size has been stable across two polls, so frames that
+        are still being written aren't downloaded half-way. Call download_all() afterwards for a final pass.
+        """
+        results = []
+        previous_sizes: Dict[str, int] = {}
+        while not stop_event.is_set():
+            entries = self.pending_entries()
+            stable = [entry for entry in entries if previous_sizes.get(entry.path) == entry.size and not self.is_complete(entry)]
+            previous_sizes = {entry.path: entry.size for entry in entries}
+            if stable:
+                results += self.download_all(stable)
+                print(f"Downloaded {len(stable)} frames while rendering")
+            stop_event.wait(poll_seconds)
+        return results
+
+
+def summarize_downloads(results: List[DownloadResult]):
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    transferred = sum(result.bytes_transferred for result in results)
+    print(f"Downloads: {counts}, {transferred / 1024 ** 2:.1f} MB transferred")
+    for result in results:
+        if result.status == "failed":
+            print(f"Failed to download {result.remote_path}: {result.error}")
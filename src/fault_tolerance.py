@@ -0,0 +1,158 @@
+import configparser
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+from chunking import chunk_frame_range
+from dispatch import ChunkDispatcher
+from frame_verify import contiguous_ranges, format_frame_ranges
+from job import JobChunk
+
+
+class RetryPolicy:
+    """
+    Args:
+        max_frame_attempts: How many times a frame may be part of a failed chunk before it is given up on.
+        retry_splits: Chunks a failed chunk's missing frames are resubmitted as, besides the frame it likely died on.
+            Few enough that every retry doesn't pay a cold start and scene load for a couple of frames.
+        retry_budget_frames: Maximum number of frames resubmitted over the whole run.
+    """
+
+    def __init__(self, max_frame_attempts: int = 3, retry_splits: int = 4, retry_budget_frames: int = 500):
+        self.max_frame_attempts = max_frame_attempts
+        self.retry_splits = max(1, retry_splits)
+        self.retry_budget_frames = retry_budget_frames
+
+    def __repr__(self):
+        return f"RetryPolicy(max_frame_attempts={self.max_frame_attempts}, retry_splits={self.retry_splits}, retry_budget_frames={self.retry_budget_frames})"
+
+    def retry_ranges(self, missing: List[int]) -> List[Tuple[int, int]]:
+        """
+        The first missing frame on its own, it's most likely the one that crashed the chunk and would take the
+        frames after it down again. The rest split into up to `retry_splits` chunks of about equal size.
+        """
+        if not missing:
+            return []
+        rest = missing[1:]
+        ranges = [(missing[0], missing[0])]
+        if rest:
+            chunk_size = math.ceil(len(rest) / self.retry_splits)
+            for start, end in contiguous_ranges(rest):
+                ranges += chunk_frame_range(start, end, chunk_size)
+        return ranges
+
+
+def retry_policy_from_config(config: configparser.ConfigParser) -> RetryPolicy:
+    """Reads the optional [RUN] MAX_FRAME_ATTEMPTS, RETRY_SPLITS and RETRY_BUDGET_FRAMES keys."""
+    return RetryPolicy(
+        max_frame_attempts=config.getint("RUN", "MAX_FRAME_ATTEMPTS", fallback=3),
+        retry_splits=config.getint("RUN", "RETRY_SPLITS", fallback=4),
+        retry_budget_frames=config.getint("RUN", "RETRY_BUDGET_FRAMES", fallback=500)
+    )
+
+
+class FrameFailure:
+    def __init__(self, job_name: str, region_index: Optional[int], frames: Tuple[int, int], reason: str):
+        self.job_name = job_name
+        self.region_index = region_index
+        self.frames = frames
+        self.reason = reason
+
+    def __repr__(self):
+        region = f" region {self.region_index}" if self.region_index is not None else ""
+        return f"FrameFailure({self.job_name}{region} frames {self.frames[0]}-{self.frames[1]}: {self.reason})"
+
+
+class RunReport:
+    def __init__(self):
+        self.results = []  # ChunkResults of successful chunks
+        self.chunk_errors: List[Tuple[JobChunk, str]] = []
+        self.recovered_frames = 0  # Frames written by chunks that failed part way
+        self.resubmitted_chunks = 0
+        self.resubmitted_frames = 0
+        self.failures: List[FrameFailure] = []
+
+    def failed_frame_count(self) -> int:
+        return sum(failure.frames[1] - failure.frames[0] + 1 for failure in self.failures)
+
+    def is_success(self) -> bool:
+        return not self.failures
+
+    def failed_frame_ranges(self, job_name: str) -> List[Tuple[int, int]]:
+        frames = [frame for failure in self.failures if failure.job_name == job_name for frame in range(failure.frames[0], failure.frames[1] + 1)]
+        return contiguous_ranges(frames)
+
+    def print_summary(self):
+        rendered = sum(result.frame_count() for result in self.results)
+        print(f"Run report: {len(self.results)} chunks succeeded ({rendered} frames), {len(self.chunk_errors)} chunk failures, "
+              f"{self.recovered_frames} frames kept from failed chunks, {self.resubmitted_chunks} chunks ({self.resubmitted_frames} frames) resubmitted, "
+              f"{self.failed_frame_count()} frames failed")
+        for chunk, error in self.chunk_errors:
+            print(f"  {chunk.job.job_name} chunk {chunk.chunk_start_frame}-{chunk.chunk_end_frame} failed: {error}")
+        for failure in self.failures:
+            print(f"  gave up on {failure}")
+        for job_name in dict.fromkeys(failure.job_name for failure in self.failures):
+            print(f"  {job_name} frames to re-render: {format_frame_ranges(self.failed_frame_ranges(job_name))}")
+
+
+def render_with_retries(
+        chunks: List[JobChunk],
+        render_fn: Callable[[JobChunk], object],
+        written_frames_fn: Callable[[JobChunk], set],
+        max_in_flight: int,
+        policy: RetryPolicy,
+        on_result: Optional[Callable[[object], None]] = None
+) -> RunReport:
+    """
+    Renders chunks, catching failures per chunk instead of aborting the run.
+
+    When a chunk fails, `written_frames_fn` reports which of its frames made it to storage. Those are
+    kept and only the missing frames are resubmitted (see RetryPolicy.retry_ranges) until they succeed,
+    exhaust `max_frame_attempts` or the run's `retry_budget_frames` runs out.
+    """
+    report = RunReport()
+    attempts: Dict[Tuple[str, Optional[int], int], int] = {}
+    dispatcher = ChunkDispatcher(render_fn, max_in_flight=max_in_flight)
+    for chunk in chunks:
+        dispatcher.submit(chunk, priority=chunk.job.priority)
+
+    for chunk, result, error in dispatcher.results():
+        if error is None:
+            report.results.append(result)
+            if on_result is not None:
+                on_result(result)
+            continue
+
+        region_index = chunk.region.index if chunk.region is not None else None
+        print(f"Chunk {chunk.chunk_start_frame}-{chunk.chunk_end_frame} of {chunk.job.job_name} failed: {error!r}")
+        report.chunk_errors.append((chunk, repr(error)))
+
+        try:
+            written = written_frames_fn(chunk)
+        except Exception as e:
+            print(f"Couldn't check written frames, retrying the whole chunk: {e!r}")
+            written = set()
+        missing = [frame for frame in range(chunk.chunk_start_frame, chunk.chunk_end_frame + 1) if frame not in written]
+        report.recovered_frames += chunk.chunk_end_frame - chunk.chunk_start_frame + 1 - len(missing)
+
+        retryable = []
+        for frame in missing:
+            key = (chunk.job.job_name, region_index, frame)
+            attempts[key] = attempts.get(key, 0) + 1
+            if attempts[key] < policy.max_frame_attempts:
+                retryable.append(frame)
+        exhausted = sorted(set(missing) - set(retryable))
+        for frames in contiguous_ranges(exhausted):
+            report.failures.append(FrameFailure(chunk.job.job_name, region_index, frames, f"failed {policy.max_frame_attempts} times, last error: {error!r}"))
+
+        for retry_start, retry_end in policy.retry_ranges(retryable):
+            # Whatever budget is left still gets used, a range that doesn't fit is cut short.
+            budget_end = min(retry_end, retry_start + policy.retry_budget_frames - report.resubmitted_frames - 1)
+            if budget_end < retry_end:
+                report.failures.append(FrameFailure(chunk.job.job_name, region_index, (max(retry_start, budget_end + 1), retry_end), "retry budget exhausted"))
+            if budget_end < retry_start:
+                continue
+            report.resubmitted_chunks += 1
+            report.resubmitted_frames += budget_end - retry_start + 1
+            print(f"Resubmitting frames {retry_start}-{budget_end} of {chunk.job.job_name}")
+            dispatcher.submit(JobChunk(job=chunk.job, chunk_start_frame=retry_start, chunk_end_frame=budget_end, region=chunk.region), priority=chunk.job.priority)
+
+    return report
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from paths import camera_directory, frame_cache_index_volume_path, frame_cache_object_volume_path, remote_job_frames_absolute_volume_directory_path
+from storage import RenderStorage
+from job import Job, JobChunk
+
+# Bump whenever configure_scene changes how frames come out (file format, color management, ...), invalidating every cached frame.
+FRAME_CACHE_FORMAT_VERSION = 1
+
+
+def renderer_versions(addons: list, bpy_package_name: str) -> dict:
+    """The Blender build and addon versions baked into the rendering image, part of every cache key."""
+    return {
+        "bpy": bpy_package_name,
+        "addons": {addon.modulename: ".".join(str(part) for part in addon.version) for addon in addons},
+    }
+
+
+# (region index or None for whole frames, camera name) of one file a job writes per frame.
+FrameOutput = Tuple[Optional[int], str]
+
+
+def frame_cache_key(job: Job, frame: int, region_index: Optional[int], versions: dict, camera_name: Optional[str] = None) -> str:
+    """sha256 over every input that affects the pixels of one frame (or region tile) of a job, from `camera_name` or the job's camera."""
+    inputs = {
+        "format": FRAME_CACHE_FORMAT_VERSION,
+        "blend_sha256": job.blend_content_hash,
+        "camera": camera_name or job.camera_name,
+        "frame": frame,
+        "resolution": [job.width, job.height, job.resolution_percentage()],
+        "region": [job.region_columns, job.region_rows, region_index],
+        "samples": job.render_samples(),
+        "adaptive_threshold": job.render_adaptive_threshold,
+        "eco": job.eco_mode_enabled,
+        "engine": job.render_engine,
+        "exr": job.exr_output_settings(),
+        "versions": versions,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def job_frame_prefixes(job: Job) -> Dict[FrameOutput, str]:
+    """Frame file prefix, relative to the frames directory, per region tile or camera of the job."""
+    if job.region_count() > 1:
+        return {(region.index, job.camera_name): JobChunk(job, job.overall_start_frame, job.overall_end_frame, region).frame_file_prefix() for region in job.regions()}
+    prefix = JobChunk(job, job.overall_start_frame, job.overall_end_frame).frame_file_prefix()
+    if job.is_multi_camera():
+        return {(None, camera_name): f"{camera_directory(camera_name)}/{prefix}" for camera_name in job.camera_names}
+    return {(None, job.camera_name): prefix}
+
+
+class FrameCache:
+    """
+    Content-addressed frames on the Volume, shared between sessions.
+
+    Objects live at `frame_cache/<key[:2]>/<key>.exr`. A single JSON index maps each key to its size and
+    timestamps, so looking up thousands of frames costs one read, and only the orchestrator writes it.
+    """
+
+    def __init__(self, storage: RenderStorage, workers: int = 16):
+        self.storage = storage
+        self.workers = workers
+        self.index: Dict[str, dict] = self._read_index()
+        self._removed: set = set()
+
+    def _read_index(self) -> Dict[str, dict]:
+        path = frame_cache_index_volume_path()
+        if not self.storage.exists(path):
+            return {}
+        return json.loads(self.storage.read_bytes(path))
+
+    def lookup(self, keys: List[str]) -> set:
+        return {key for key in keys if key in self.index}
+
+    def restore(self, destinations: Dict[str, str]) -> set:
+        """Copies cached objects (key -> session frame path) into place and marks them as used. Returns the keys that couldn't be copied."""
+        failed = self._copy_all({key: (frame_cache_object_volume_path(key), destination) for key, destination in destinations.items()})
+        now = time.time()
+        for key in destinations:
+            if key not in failed:
+                self.index[key]["last_used_at"] = now
+        return failed
+
+    def store(self, sources: Dict[str, str], sizes: Dict[str, int]) -> set:
+        """Copies freshly rendered frames (key -> session frame path) into the cache. Returns the keys that couldn't be copied."""
+        failed = self._copy_all({key: (source, frame_cache_object_volume_path(key)) for key, source in sources.items()})
+        now = time.time()
+        for key in sources:
+            if key in failed:
+                continue
+            self.index[key] = {"size": sizes[key], "stored_at": now, "last_used_at": now}
+            self._removed.discard(key)
+        return failed
+
+    def _copy_all(self, copies: Dict[str, Tuple[str, str]]) -> set:
+        # One bad object (eg. a truncated write or a Volume hiccup) only costs its own frame, not the whole run.
+        def copy(item):
+            key, (source, destination) = item
+            try:
+                self.storage.copy(source, destination)
+            except Exception as e:
+                print(f"Frame cache: couldn't copy {source} to {destination}: {e!r}")
+                return key
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            failed = {key for key in executor.map(copy, copies.items()) if key is not None}
+        if failed:
+            print(f"Frame cache: {len(failed)} frames couldn't be copied")
+        return failed
+
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self.index.values())
+
+    def evict(self, max_bytes: int, max_age_seconds: float) -> List[str]:
+        """Drops entries unused for `max_age_seconds`, then least recently used ones until under `max_bytes`."""
+        now = time.time()
+        evicted = [key for key, entry in self.index.items() if now - entry["last_used_at"] > max_age_seconds]
+        expired = set(evicted)
+        remaining = sorted((key for key in self.index if key not in expired), key=lambda key: self.index[key]["last_used_at"])
+        total = sum(self.index[key]["size"] for key in remaining)
+        while remaining and total > max_bytes:
+            key = remaining.pop(0)
+            total -= self.index[key]["size"]
+            evicted.append(key)
+
+        for key in evicted:
+            self.storage.remove(frame_cache_object_volume_path(key))
+            del self.index[key]
+            self._removed.add(key)
+        return evicted
+
+    def save(self):
+        # Merge with whatever another run saved meanwhile instead of overwriting its entries.
+        latest = self._read_index()
+        for key, entry in latest.items():
+            if key in self._removed:
+                continue
+            if key not in self.index or entry["last_used_at"] > self.index[key]["last_used_at"]:
+                self.index[key] = entry
+        self.storage.put_bytes(json.dumps(self.index).encode(), frame_cache_index_volume_path())
+
+
+def restore_cached_frames(cache: FrameCache, job: Job, versions: dict) -> List[int]:
+    """
+    Copies every cached frame of the job's rendered ranges into its session.
+
+    A frame counts as cached only when all of its region tiles (or cameras) are. Returns the frames still to render.
+    """
+    frames_dir = remote_job_frames_absolute_volume_directory_path(job.session_id)
+    prefixes = job_frame_prefixes(job)
+    destinations, frames = {}, {}
+    misses = []
+    for start, end in job.rendered_frame_ranges():
+        for frame in range(start, end + 1):
+            keys = {output: frame_cache_key(job, frame, output[0], versions, camera_name=output[1]) for output in prefixes}
+            if len(cache.lookup(list(keys.values()))) < len(keys):
+                misses.append(frame)
+                continue
+            for output, key in keys.items():
+                destinations[key] = str(frames_dir / f"{prefixes[output]}{frame:04d}.exr")
+                frames[key] = frame
+
+    if destinations:
+        print(f"Frame cache: restoring {len(destinations)} cached frames of {job.job_name} into session {job.session_id}")
+        failed = cache.restore(destinations)
+        # A frame whose copy failed is rendered again, like any other miss.
+        misses = sorted(set(misses) | {frames[key] for key in failed})
+    print(f"Frame cache: {job.rendered_frame_count() - len(misses)} hits, {len(misses)} misses for {job.job_name}")
+    return misses
+
+
+def store_rendered_frames(cache: FrameCache, job: Job, frames: List[int], versions: dict) -> int:
+    """Adds the given frames of the session to the cache, skipping any that aren't on the Volume or fail to copy. Returns the number stored."""
+    frames_dir = remote_job_frames_absolute_volume_directory_path(job.session_id)
+    prefixes = job_frame_prefixes(job)
+    written = {}
+    for directory in {Path(prefix).parent for prefix in prefixes.values()}:  # Per-camera subdirectories of multi-camera jobs
+        written.update({str(directory / Path(entry.path).name): entry.size for entry in cache.storage.listdir(frames_dir / directory) if not entry.is_dir and entry.size > 0})
+    sources, sizes = {}, {}
+    for (region_index, camera_name), prefix in prefixes.items():
+        for frame in frames:
+            name = str(Path(f"{prefix}{frame:04d}.exr"))
+            if name in written:
+                key = frame_cache_key(job, frame, region_index, versions, camera_name=camera_name)
+                sources[key] = str(frames_dir / name)
+                sizes[key] = written[name]
+    failed = cache.store(sources, sizes)
+    return len(sources) - len(failed)
@@ -0,0 +1,150 @@
+import time
+from collections import deque
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+
+# Inclusive (start_frame, end_frame) range handed to a worker in one pull.
+FrameBatch = Tuple[int, int]
+
+
+class FrameQueue:
+    """
+    Shared pool of frame batches that render workers pull from until it runs dry.
+
+    Backends only need to support bulk insertion and a non-blocking pop, so the
+    scheduler can run against a Modal Queue in the cloud or an in-process deque locally.
+    """
+
+    def put_batches(self, batches: List[FrameBatch]):
+        raise NotImplementedError
+
+    def pop_batch(self) -> Optional[FrameBatch]:
+        raise NotImplementedError
+
+
+class InProcessFrameQueue(FrameQueue):
+    def __init__(self, batches: Optional[List[FrameBatch]] = None):
+        self._batches = deque()
+        self._lock = Lock()
+        if batches:
+            self.put_batches(batches)
+
+    def put_batches(self, batches: List[FrameBatch]):
+        with self._lock:
+            self._batches.extend(tuple(batch) for batch in batches)
+
+    def pop_batch(self) -> Optional[FrameBatch]:
+        with self._lock:
+            if not self._batches:
+                return None
+            return self._batches.popleft()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._batches)
+
+
+class ModalFrameQueue(FrameQueue):
+    def __init__(self, queue):
+        # `queue` is a modal.Queue, passed in so this module doesn't need Modal installed.
+        self.queue = queue
+
+    def put_batches(self, batches: List[FrameBatch]):
+        self.queue.put_many([tuple(batch) for batch in batches])
+
+    def pop_batch(self) -> Optional[FrameBatch]:
+        batch = self.queue.get(block=False)  # Returns None once the queue is empty.
+        return tuple(batch) if batch is not None else None
+
+
+class WorkerStats:
+    def __init__(self, worker_id: int, started_at: float):
+        self.worker_id = worker_id
+        self.started_at = started_at
+        self.finished_at = started_at
+        self.setup_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.batches: List[FrameBatch] = []
+        self.frame_count = 0
+        self.failed_batches: List[Tuple[FrameBatch, str]] = []
+
+    def __repr__(self):
+        return (f"WorkerStats(worker_id={self.worker_id}, batches={len(self.batches)}, frames={self.frame_count}, failed_batches={len(self.failed_batches)}, "
+                f"setup_seconds={self.setup_seconds:.1f}, busy_seconds={self.busy_seconds:.1f}, "
+                f"wall_seconds={self.wall_seconds():.1f}, utilization={self.utilization():.0%})")
+
+    def wall_seconds(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+    def utilization(self) -> float:
+        """Fraction of the worker's lifetime spent rendering (setup and idle time excluded)."""
+        wall_seconds = self.wall_seconds()
+        return self.busy_seconds / wall_seconds if wall_seconds > 0 else 0.0
+
+
+def drain_frame_queue(
+        frame_queue: FrameQueue,
+        worker_id: int,
+        setup: Callable[[FrameBatch], None],
+        render_batch: Callable[[FrameBatch], None],
+        clock: Callable[[], float] = time.monotonic
+) -> WorkerStats:
+    """
+    Pulls batches from the queue until it is empty, rendering each one.
+
+    A worker whose setup or render fails records the batch in `failed_batches` and stops pulling, like a
+    failed device in multi_gpu; the rest of the queue is left to the other workers.
+
+    Args:
+        frame_queue (FrameQueue): Shared queue of frame batches.
+        worker_id (int): Identifier reported back in the stats.
+        setup (callable): Called once with the first batch, before it is rendered (eg. scene load).
+            Skipped entirely if the queue is already empty.
+        render_batch (callable): Renders a single batch.
+        clock (callable): Monotonic time source, injectable for tests.
+
+    Returns:
+        WorkerStats: Setup, busy and wall time for this worker, and the batch it failed on if any.
+    """
+    stats = WorkerStats(worker_id=worker_id, started_at=clock())
+
+    batch = frame_queue.pop_batch()
+    if batch is not None:
+        setup_started_at = clock()
+        try:
+            setup(batch)
+        except Exception as e:
+            print(f"Worker {worker_id} setup failed: {e!r}")
+            stats.failed_batches.append((batch, repr(e)))
+            batch = None
+        stats.setup_seconds = clock() - setup_started_at
+
+    while batch is not None:
+        render_started_at = clock()
+        try:
+            render_batch(batch)
+        except Exception as e:
+            print(f"Worker {worker_id} failed frames {batch[0]}-{batch[1]}: {e!r}")
+            stats.failed_batches.append((batch, repr(e)))
+            break
+        finally:
+            stats.busy_seconds += clock() - render_started_at
+        stats.batches.append(batch)
+        stats.frame_count += batch[1] - batch[0] + 1
+        batch = frame_queue.pop_batch()
+
+    stats.finished_at = clock()
+    return stats
+
+
+def print_utilization_report(worker_stats: List[WorkerStats]):
+    for stats in sorted(worker_stats, key=lambda s: s.worker_id):
+        print(stats)
+
+    total_wall_seconds = sum(stats.wall_seconds() for stats in worker_stats)
+    total_busy_seconds = sum(stats.busy_seconds for stats in worker_stats)
+    total_setup_seconds = sum(stats.setup_seconds for stats in worker_stats)
+    fleet_utilization = total_busy_seconds / total_wall_seconds if total_wall_seconds > 0 else 0.0
+    print(f"Fleet: {len(worker_stats)} workers, {sum(s.frame_count for s in worker_stats)} frames, "
+          f"busy {total_busy_seconds:.1f}s, setup {total_setup_seconds:.1f}s, wall {total_wall_seconds:.1f}s, "
+          f"utilization {fleet_utilization:.0%}")
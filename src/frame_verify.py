@@ -0,0 +1,165 @@
+import math
+import os
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+EXR_MAGIC = 20000630
+# Scanlines per chunk for each EXR compression type (NONE, RLE, ZIPS, ZIP, PIZ, PXR24, B44, B44A, DWAA, DWAB).
+EXR_LINES_PER_CHUNK = {0: 1, 1: 1, 2: 1, 3: 16, 4: 32, 5: 16, 6: 32, 7: 32, 8: 32, 9: 256}
+EXR_TILED_FLAG = 0x200
+EXR_MULTIPART_FLAG = 0x1000
+
+
+def frame_file_pattern(job_name: str) -> re.Pattern:
+    """Matches the `{job_name}_NNNN.exr` files Blender writes for JobChunk.make_remote_frame_path()."""
+    return re.compile(rf"^{re.escape(job_name)}_(\d{{4,}})\.exr$")
+
+
+def find_frames(directory: Path, job_name: str) -> Dict[int, Path]:
+    pattern = frame_file_pattern(job_name)
+    frames = {}
+    for entry in os.scandir(directory):
+        match = pattern.match(entry.name)
+        if match:
+            frames[int(match.group(1))] = Path(entry.path)
+    return frames
+
+
+def missing_frames(present: set, start: int, end: int) -> List[int]:
+    """Frames of the configured start..end range absent from `present`, via a bitmap over the range."""
+    bitmap = bytearray(end - start + 1)
+    for frame in present:
+        if start <= frame <= end:
+            bitmap[frame - start] = 1
+    return [start + i for i, seen in enumerate(bitmap) if not seen]
+
+
+def contiguous_ranges(frames: List[int]) -> List[Tuple[int, int]]:
+    ranges = []
+    for frame in sorted(set(frames)):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], frame)
+        else:
+            ranges.append((frame, frame))
+    return ranges
+
+
+def format_frame_ranges(ranges: List[Tuple[int, int]]) -> str:
+    """eg. [(130, 140), (200, 200)] -> "130-140,200", the format main's --frames option takes."""
+    return ",".join(f"{start}-{end}" if start != end else f"{start}" for start, end in ranges)
+
+
+def parse_frame_ranges(text: str) -> List[Tuple[int, int]]:
+    ranges = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        start, end = int(start), int(end or start)
+        if end < start:
+            raise ValueError(f"Invalid frame range '{part}'")
+        ranges.append((start, end))
+    return contiguous_ranges([frame for start, end in ranges for frame in range(start, end + 1)])
+
+
+def _read_null_terminated(f) -> bytes:
+    data = bytearray()
+    while (byte := f.read(1)) not in (b"", b"\0"):
+        data += byte
+    return bytes(data)
+
+
+def check_exr(path: Path) -> Optional[str]:
+    """
+    Returns why `path` isn't a complete EXR, or None if it looks fine.
+
+    Parses the header and the scanline offset table, then checks that the last chunk fits in the file,
+    which catches truncated writes as well as empty and non-EXR files. Tiled and multi-part files
+    only get the header checks.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return "zero-byte file"
+        with open(path, "rb") as f:
+            magic, version = struct.unpack("<ii", f.read(8).ljust(8, b"\0"))
+            if magic != EXR_MAGIC:
+                return "not an EXR file"
+
+            attributes = {}
+            while name := _read_null_terminated(f):
+                _read_null_terminated(f)  # Attribute type
+                length_bytes = f.read(4)
+                if len(length_bytes) < 4:
+                    return "truncated header"
+                value = f.read(struct.unpack("<i", length_bytes)[0])
+                if name in (b"dataWindow", b"compression"):
+                    attributes[name] = value
+            if b"dataWindow" not in attributes or b"compression" not in attributes:
+                return "truncated header"
+            if version & (EXR_TILED_FLAG | EXR_MULTIPART_FLAG):
+                return None
+
+            _, y_min, _, y_max = struct.unpack("<iiii", attributes[b"dataWindow"])
+            lines_per_chunk = EXR_LINES_PER_CHUNK.get(attributes[b"compression"][0], 1)
+            chunk_count = math.ceil((y_max - y_min + 1) / lines_per_chunk)
+            table = f.read(8 * chunk_count)
+            if len(table) < 8 * chunk_count:
+                return "truncated offset table"
+            offsets = struct.unpack(f"<{chunk_count}Q", table)
+            if not offsets or min(offsets) == 0 or max(offsets) >= size:
+                return f"incomplete offset table ({size} bytes)"
+
+            f.seek(max(offsets))
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return "truncated last chunk"
+            _, data_size = struct.unpack("<ii", chunk_header)
+            if max(offsets) + 8 + data_size > size:
+                return f"truncated: last chunk ends at {max(offsets) + 8 + data_size}, file is {size} bytes"
+    except OSError as e:
+        return f"unreadable: {e}"
+    return None
+
+
+class FrameVerification:
+    def __init__(self, job_name: str, start_frame: int, end_frame: int, missing: List[int], invalid: Dict[int, str]):
+        self.job_name = job_name
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.missing = missing
+        self.invalid = invalid
+
+    def __repr__(self):
+        return (f"FrameVerification(job_name={self.job_name}, range={self.start_frame}-{self.end_frame}, "
+                f"missing={len(self.missing)}, invalid={len(self.invalid)})")
+
+    def rerender_ranges(self) -> List[Tuple[int, int]]:
+        return contiguous_ranges(self.missing + list(self.invalid))
+
+    def is_complete(self) -> bool:
+        return not self.missing and not self.invalid
+
+
+def verify_frames(directory: Path, job_name: str, start_frame: int, end_frame: int, workers: int = 16) -> FrameVerification:
+    """Checks the job's configured frame range (not just min..max of what's there) for missing or broken frames."""
+    frames = find_frames(directory, job_name) if Path(directory).is_dir() else {}
+    in_range = {frame: path for frame, path in frames.items() if start_frame <= frame <= end_frame}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        problems = dict(zip(in_range, executor.map(check_exr, in_range.values())))
+    invalid = {frame: problem for frame, problem in sorted(problems.items()) if problem is not None}
+    return FrameVerification(job_name, start_frame, end_frame, missing_frames(set(in_range), start_frame, end_frame), invalid)
+
+
+def print_verification(verification: FrameVerification):
+    print(verification)
+    for frame, problem in verification.invalid.items():
+        print(f"  frame {frame}: {problem}")
+    if verification.is_complete():
+        print(f"All {verification.end_frame - verification.start_frame + 1} frames present and complete.")
+    else:
+        print(f"Frames to re-render: {format_frame_ranges(verification.rerender_ranges())}")
@@ -1,12 +1,35 @@
 import os
+import uuid
 import configparser
-from typing import Literal
-from paths import blender_proj_remote_path, remote_job_frames_directory_path
-from chunking import chunk_frame_range
+from typing import TYPE_CHECKING, Literal, Optional
+from paths import blender_proj_remote_path, blend_blob_remote_path, camera_directory, remote_job_frames_directory_path, remote_job_noisy_frames_directory_path, local_scratch_frames_directory_path
+from regions import Region, frame_regions, region_file_prefix
+from denoise import DENOISERS
+from chunking import chunk_frame_range, chunk_frame_range_by_cost, progressive_passes, spread_order, chunk_costs, predicted_makespan, longest_processing_time_order, load_frame_costs, interpolate_frame_costs
 import math
 
+if TYPE_CHECKING:
+    from planner import RenderPlan  # planner -> simulator -> speculation imports this module
+
 # Allowed render engine values.
 RenderEngine = Literal["BLENDER_EEVEE_NEXT", "CYCLES"]
+# Engines whose frames take seconds, so per-container overhead (cold start, addon checks, .blend load, EGL and shader setup)
+# outweighs rendering unless chunks are long. Jobs rendering with them take their chunking keys from the [RUN]
+# <prefix>_<key> values below unless their own section sets them, rather than the Cycles-tuned [DEFAULT]s.
+FAST_FRAME_ENGINE_PREFIXES = {"BLENDER_EEVEE_NEXT": "EEVEE"}
+FAST_FRAME_CHUNKING_DEFAULTS = {"render_node_concurrency_target": 4, "min_chunk_size": 60, "max_chunk_size": 1000, "queue_batch_size": 24}
+# EEVEE render samples in eco mode, render_max_samples and render_adaptive_threshold are Cycles-only.
+EEVEE_ECO_SAMPLES = 16
+# "static" pre-splits the range into one chunk per container, "queue" has workers pull small batches until the range is done,
+# "warm" sends the static chunks to WarmRenderer containers that keep the scene loaded between chunks.
+Scheduler = Literal["static", "queue", "warm"]
+# Allowed values of Blender's image_settings.exr_codec. DWAA/DWAB are lossy.
+ExrCodec = Literal["NONE", "ZIP", "ZIPS", "PIZ", "PXR24", "RLE", "B44", "B44A", "DWAA", "DWAB"]
+EXR_CODECS = ("NONE", "ZIP", "ZIPS", "PIZ", "PXR24", "RLE", "B44", "B44A", "DWAA", "DWAB")
+# The pinned bpy (4.2) has no DWA level setting, its DWAA/DWAB frames always use OpenEXR's default.
+BLENDER_DWA_QUALITY = 45
+# "16" is half float, "32" full float.
+ExrColorDepth = Literal["16", "32"]
 
 class Job:
     """
@@ -34,7 +57,32 @@ class Job:
             render_adaptive_threshold: float,
             eco_mode_enabled: bool,
             min_chunk_size: int,
-            max_chunk_size: int
+            max_chunk_size: int,
+            scheduler: Scheduler = "static",
+            queue_batch_size: int = 2,
+            frame_cost_estimates_path: Optional[str] = None,
+            priority: int = 0,
+            region_columns: int = 1,
+            region_rows: int = 1,
+            use_frame_cache: bool = True,
+            exr_codec: ExrCodec = "ZIP",
+            exr_color_depth: ExrColorDepth = "32",
+            exr_dwa_quality: int = BLENDER_DWA_QUALITY,
+            exr_multilayer: bool = False,
+            exr_passes: Optional[list[str]] = None,
+            write_behind: bool = False,
+            speculative_execution: bool = False,
+            progressive_stride: int = 1,
+            gpus_per_container: int = 1,
+            deadline_minutes: Optional[float] = None,
+            gpu_hours_budget: Optional[float] = None,
+            seconds_per_frame_estimate: Optional[float] = None,
+            bake_simulations: bool = False,
+            denoise_on_cpu: bool = False,
+            denoiser: str = "oidn",
+            denoise_workers: int = 4,
+            camera_names: Optional[list[str]] = None,
+            eevee_samples: int = 64
     ):
         self.job_name = job_name
         self.session_id = session_id
@@ -42,6 +90,8 @@ class Job:
         self.render_engine = render_engine
         self.blend_file_path = blend_file_path
         self.camera_name = camera_name
+        # More than one renders every frame from each camera in turn on the same loaded scene, into per-camera subdirectories.
+        self.camera_names = camera_names or [camera_name]
         self.overall_start_frame = overall_start_frame
         self.overall_end_frame = overall_end_frame
         self.width = width
@@ -49,18 +99,70 @@ class Job:
         self.render_max_samples = render_max_samples
         self.render_adaptive_threshold = render_adaptive_threshold
         self.eco_mode_enabled = eco_mode_enabled
+        self.eevee_samples = eevee_samples  # EEVEE's anti-aliasing samples per pixel, render_max_samples is Cycles'
         self.min_chunk_size = min_chunk_size
         self.max_chunk_size = max_chunk_size
+        self.scheduler = scheduler
+        self.queue_batch_size = queue_batch_size
+        self.frame_cost_estimates_path = frame_cost_estimates_path
+        self.priority = priority  # Batch runs dispatch higher priority jobs' chunks first
+        # More than one region splits every frame into a grid of border renders, stitched locally afterwards.
+        self.region_columns = region_columns
+        self.region_rows = region_rows
+        self.use_frame_cache = use_frame_cache  # Reuse identical frames rendered by earlier sessions
+        self.exr_codec = exr_codec
+        self.exr_color_depth = exr_color_depth
+        self.exr_dwa_quality = exr_dwa_quality
+        # Multilayer EXRs carry extra view layer passes (eg. "z", "normal", "vector") next to the combined image.
+        self.exr_multilayer = exr_multilayer
+        self.exr_passes = exr_passes or []
+        # Render to container-local scratch and copy finished frames to the Volume in the background.
+        self.write_behind = write_behind
+        # Back up straggling chunks with a duplicate rendering their remaining frames in reverse.
+        self.speculative_execution = speculative_execution
+        # Above 1, each chunk renders every Nth frame of its range first and fills in coarse-to-fine, so the whole shot is covered early.
+        self.progressive_stride = progressive_stride
+        # Above 1, static chunks go to containers with this many GPUs, each rendering frames of the chunk in its own Blender process.
+        self.gpus_per_container = gpus_per_container
+        # Either picks concurrency and chunk size from the simulated plans instead of the hand-picked values, see planner.py.
+        self.deadline_minutes = deadline_minutes
+        self.gpu_hours_budget = gpu_hours_budget
+        # Average render seconds per frame for planning, scales frame_cost_estimates_path when both are given.
+        self.seconds_per_frame_estimate = seconds_per_frame_estimate
+        # Bake the scene's simulation caches once on a CPU container and have every chunk read them, see sim_cache.py.
+        self.bake_simulations = bake_simulations
+        # Render noisy frames with denoising passes and denoise them on a pool of CPU containers as they land, see denoise.py.
+        self.denoise_on_cpu = denoise_on_cpu
+        self.denoiser = denoiser
+        self.denoise_workers = denoise_workers
+        # Set once the .blend is in the Volume's blob store, sessions then render from the shared blob.
+        self.blend_content_hash: Optional[str] = None
+        # Set once the shared simulation bake for this .blend is on the Volume, chunks then relink their caches to it.
+        self.sim_cache_key: Optional[str] = None
+        # Restricts rendering to these (start, end) ranges, eg. the gaps found by the frame verifier.
+        self.frame_ranges: Optional[list[tuple[int, int]]] = None
+        # While denoise_on_cpu workers run, the modal.Queue render containers announce each written frame on.
+        self.frame_ready_queue = None
 
     def __repr__(self):
         return (f"Job(name={self.job_name}, session_id={self.session_id}, render_node_concurrency_target={self.render_node_concurrency_target}, "
                 f"render_engine={self.render_engine}, "
-                f"blend_file_path={self.blend_file_path}, camera_name={self.camera_name}, "
+                f"blend_file_path={self.blend_file_path}, camera_name={self.camera_name}, camera_names={self.camera_names}, "
                 f"width={self.width}, height={self.height}, "
-                f"render_max_samples={self.render_max_samples}, render_adaptive_threshold={self.render_adaptive_threshold}, eco_mode_enabled={self.eco_mode_enabled}, "
+                f"render_max_samples={self.render_max_samples}, render_adaptive_threshold={self.render_adaptive_threshold}, eco_mode_enabled={self.eco_mode_enabled}, eevee_samples={self.eevee_samples}, "
                 f"start_frame={self.overall_start_frame}, end_frame={self.overall_end_frame}, "
                 f"min_chunk_size={self.min_chunk_size}, "
-                f"max_chunk_size={self.max_chunk_size})")
+                f"max_chunk_size={self.max_chunk_size}, "
+                f"scheduler={self.scheduler}, queue_batch_size={self.queue_batch_size}, "
+                f"frame_cost_estimates_path={self.frame_cost_estimates_path}, priority={self.priority}, "
+                f"region_columns={self.region_columns}, region_rows={self.region_rows}, use_frame_cache={self.use_frame_cache}, "
+                f"exr_codec={self.exr_codec}, exr_color_depth={self.exr_color_depth}, exr_dwa_quality={self.exr_dwa_quality}, "
+                f"exr_multilayer={self.exr_multilayer}, exr_passes={self.exr_passes}, write_behind={self.write_behind}, speculative_execution={self.speculative_execution}, "
+                f"progressive_stride={self.progressive_stride}, gpus_per_container={self.gpus_per_container}, "
+                f"deadline_minutes={self.deadline_minutes}, gpu_hours_budget={self.gpu_hours_budget}, seconds_per_frame_estimate={self.seconds_per_frame_estimate}, "
+                f"bake_simulations={self.bake_simulations}, sim_cache_key={self.sim_cache_key}, "
+                f"denoise_on_cpu={self.denoise_on_cpu}, denoiser={self.denoiser}, denoise_workers={self.denoise_workers}, "
+                f"blend_content_hash={self.blend_content_hash}, frame_ranges={self.frame_ranges})")
 
     def chunk_size(self) -> int:
         chunk_size = math.ceil(self.frame_count() / self.render_node_concurrency_target)
@@ -72,44 +174,253 @@ class Job:
             frame_count = 1
         return frame_count
 
+    def rendered_frame_ranges(self) -> list[tuple[int, int]]:
+        return self.frame_ranges or [(self.overall_start_frame, self.overall_end_frame)]
+
+    def rendered_frame_count(self) -> int:
+        return sum(end - start + 1 for start, end in self.rendered_frame_ranges())
+
+    def is_multi_camera(self) -> bool:
+        return len(self.camera_names) > 1
+
+    def frame_subdirectories(self) -> list[str]:
+        """Where the job's frames go within the session's frames directory, one per camera for multi-camera jobs."""
+        return [camera_directory(name) for name in self.camera_names] if self.is_multi_camera() else [""]
+
+    def renders_fast_frames(self) -> bool:
+        """Frames take seconds rather than minutes, so chunks favour few containers with many frames each."""
+        return self.render_engine in FAST_FRAME_ENGINE_PREFIXES
+
+    def render_samples(self) -> int:
+        if self.render_engine == "BLENDER_EEVEE_NEXT":
+            return min(self.eevee_samples, EEVEE_ECO_SAMPLES) if self.eco_mode_enabled else self.eevee_samples
+        return self.render_max_samples
+
+    def region_count(self) -> int:
+        return self.region_columns * self.region_rows
+
+    def resolution_percentage(self) -> int:
+        if self.eco_mode_enabled:
+            return 25 if self.height > 1500 else 66  # Eg. 720p if 1080p
+        return 100
+
+    def output_resolution(self) -> tuple[int, int]:
+        """Pixel size Blender actually renders, after resolution_percentage."""
+        percentage = self.resolution_percentage()
+        return self.width * percentage // 100, self.height * percentage // 100
+
+    def regions(self) -> list[Region]:
+        width, height = self.output_resolution()
+        return frame_regions(width, height, self.region_columns, self.region_rows)
+
     def validate(self):
         if self.frame_count() < 1 or self.overall_start_frame < 1:
             raise Exception("Invalid frame range")
+        if self.region_columns < 1 or self.region_rows < 1:
+            raise Exception("Invalid region grid")
+        if self.region_count() > 1 and self.scheduler == "queue":
+            raise Exception("Region rendering isn't supported by the queue scheduler")
+        for start, end in self.rendered_frame_ranges():
+            if start < self.overall_start_frame or end > self.overall_end_frame or end < start:
+                raise Exception(f"Frame range {start}-{end} is outside the job's {self.overall_start_frame}-{self.overall_end_frame}")
+        if self.queue_batch_size < 1:
+            raise Exception("Invalid queue batch size")
+        if self.exr_passes and not self.exr_multilayer:
+            raise Exception("EXR passes need exr_multilayer = True, single layer EXRs only hold the combined image")
+        if self.exr_multilayer and self.region_count() > 1:
+            raise Exception("Region rendering doesn't support multilayer EXRs")
+        if not 0 <= self.exr_dwa_quality <= 100:
+            raise Exception("Invalid EXR DWA quality")
+        if self.exr_dwa_quality != BLENDER_DWA_QUALITY:
+            raise Exception(f"Blender 4.2 can't set the EXR DWA quality, it always writes level {BLENDER_DWA_QUALITY}, "
+                            "leave exr_dwa_quality at that (local/stitch_regions.py --exr-dwa-quality can stitch at another level)")
+        if self.progressive_stride < 1 or self.progressive_stride & (self.progressive_stride - 1):
+            raise Exception("Progressive stride must be a power of two")
+        if self.progressive_stride > 1 and self.scheduler == "queue":
+            raise Exception("Progressive frame order isn't supported by the queue scheduler")
+        if self.progressive_stride > 1 and self.speculative_execution:
+            raise Exception("Speculative execution needs contiguous frame order, disable progressive_stride")
+        if self.gpus_per_container < 1:
+            raise Exception("Invalid GPUs per container")
+        if self.gpus_per_container > 1 and self.scheduler != "static":
+            raise Exception("Multi-GPU containers are only supported by the static scheduler")
+        if self.gpus_per_container > 1 and self.renders_to_scratch():
+            raise Exception("Multi-GPU containers write frames straight to the Volume, disable write_behind and speculative_execution")
+        if self.deadline_minutes is not None and self.gpu_hours_budget is not None:
+            raise Exception("Plan for either a deadline or a GPU budget, not both")
+        if self.is_planned() and (self.scheduler != "static" or self.region_count() > 1 or self.gpus_per_container > 1):
+            raise Exception("Planning only supports the static scheduler with whole frames on single-GPU containers")
+        if self.is_planned() and not (self.frame_cost_estimates_path or self.seconds_per_frame_estimate):
+            raise Exception("Planning needs seconds_per_frame_estimate or frame_cost_estimates_path")
+        if self.seconds_per_frame_estimate is not None and self.seconds_per_frame_estimate <= 0:
+            raise Exception("Invalid seconds per frame estimate")
+        if self.eevee_samples < 1:
+            raise Exception("Invalid EEVEE sample count")
+        if self.gpus_per_container > 1 and self.render_engine != "CYCLES":
+            raise Exception("Multi-GPU containers pin each Blender process to a Cycles device, EEVEE renders on the GPU EGL picks")
+        if self.denoise_on_cpu and self.render_engine != "CYCLES":
+            raise Exception("CPU denoising needs Cycles' denoising passes")
+        if self.denoise_on_cpu and (self.renders_to_scratch() or self.gpus_per_container > 1 or self.region_count() > 1):
+            raise Exception("CPU denoising needs whole frames written straight to the Volume, disable write_behind, speculative_execution, gpus_per_container and regions")
+        if self.denoise_on_cpu and self.denoiser not in DENOISERS:
+            raise Exception(f"Unknown denoiser '{self.denoiser}', expected one of {sorted(DENOISERS)}")
+        if self.denoise_on_cpu and self.denoise_workers < 1:
+            raise Exception("Invalid denoise worker count")
+        if self.camera_name not in self.camera_names:
+            raise Exception(f"Camera '{self.camera_name}' isn't one of camera_names {self.camera_names}")
+        if len({camera_directory(name) for name in self.camera_names}) != len(self.camera_names):
+            raise Exception(f"Cameras {self.camera_names} must have distinct names")
+        if self.is_multi_camera() and (self.region_count() > 1 or self.renders_to_scratch() or self.denoise_on_cpu):
+            raise Exception("Multi-camera jobs write whole frames straight to the Volume, disable regions, write_behind, speculative_execution and denoise_on_cpu")
+
+    def is_planned(self) -> bool:
+        """Concurrency and chunk size come from a RenderPlan meeting the deadline or budget."""
+        return self.deadline_minutes is not None or self.gpu_hours_budget is not None
+
+    def renders_to_scratch(self) -> bool:
+        """Frames are renamed into place from local scratch, which duplicate copies of a chunk rely on."""
+        return self.write_behind or self.speculative_execution
+
+    def exr_output_settings(self) -> dict:
+        """Everything about the written EXRs besides the pixels, eg. for cache keys and telemetry."""
+        settings = {"codec": self.exr_codec, "color_depth": self.exr_color_depth, "multilayer": self.exr_multilayer, "passes": self.exr_passes}
+        if self.denoise_on_cpu:
+            settings["denoiser"] = self.denoiser  # Not Cycles' in-loop denoiser, so different pixels
+        return settings
 
 class JobChunk:
     def __init__(
             self,
             job: Job,
             chunk_start_frame: int,
-            chunk_end_frame: int
+            chunk_end_frame: int,
+            region: Optional[Region] = None,
+            reverse: bool = False,
+            progressive_stride: int = 1
     ):
         self.job = job
         self.chunk_start_frame = chunk_start_frame
         self.chunk_end_frame = chunk_end_frame
+        self.region = region  # Only part of each frame is rendered when set
+        self.reverse = reverse  # Render from the last frame backwards, eg. a speculative duplicate of a straggler
+        self.progressive_stride = progressive_stride  # See Job.progressive_stride
 
     def __repr__(self):
-        return f"JobChunk(chunk_start_frame={self.chunk_start_frame}, chunk_end_frame={self.chunk_end_frame}, job={self.job})"
+        return f"JobChunk(chunk_start_frame={self.chunk_start_frame}, chunk_end_frame={self.chunk_end_frame}, region={self.region}, reverse={self.reverse}, progressive_stride={self.progressive_stride}, job={self.job})"
+
+    def render_passes(self) -> list[tuple[int, int, int]]:
+        """(first_frame, last_frame, frame_step) animation renders covering the chunk, in rendering order."""
+        if self.progressive_stride <= 1:
+            return [(self.chunk_start_frame, self.chunk_end_frame, 1)]
+        return progressive_passes(self.chunk_start_frame, self.chunk_end_frame, self.progressive_stride, self.job.overall_start_frame)
+
+    def frames_in_render_order(self) -> list[int]:
+        if self.reverse:
+            return list(range(self.chunk_end_frame, self.chunk_start_frame - 1, -1))
+        return [frame for first_frame, last_frame, frame_step in self.render_passes() for frame in range(first_frame, last_frame + 1, frame_step)]
 
     def remote_blender_proj_path(self) -> str:
+        if self.job.blend_content_hash:
+            return str(blend_blob_remote_path(self.job.blend_content_hash, validate=True))
         return str(blender_proj_remote_path(self.job.session_id, validate=True))
 
-    def make_remote_frame_path(self) -> str:
-        base_output_dir = remote_job_frames_directory_path(self.job.session_id)
+    def frame_file_prefix(self) -> str:
+        """Blender appends the frame number, eg. `{job}_0130.exr` or `{job}_r02_0130.exr` for a region."""
+        if self.region is not None:
+            return region_file_prefix(self.job.job_name, self.region.index)
+        return f"{self.job.job_name}_"
+
+    def make_remote_frame_path(self, camera_name: Optional[str] = None) -> str:
+        """Multi-camera jobs write each camera's frames into its own subdirectory, `camera_name` defaulting to the first camera."""
+        if self.job.denoise_on_cpu:
+            # Noisy frames, denoise workers write the final ones into the frames directory.
+            base_output_dir = remote_job_noisy_frames_directory_path(self.job.session_id)
+        else:
+            base_output_dir = remote_job_frames_directory_path(self.job.session_id)
+        if self.job.is_multi_camera():
+            base_output_dir = base_output_dir / camera_directory(camera_name or self.job.camera_names[0])
         base_output_dir.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
-        return str(base_output_dir / f"{self.job.job_name}_")  # Base file path for animation frames
+        return str(base_output_dir / self.frame_file_prefix())  # Base file path for animation frames
+
+    def make_scratch_frame_path(self) -> str:
+        scratch_dir = local_scratch_frames_directory_path(self.job.session_id)
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+        return str(scratch_dir / self.frame_file_prefix())
 
 # Helpers
 
-def job_chunks_from_job(job: Job, total_chunk_target: int) -> list[JobChunk]:
-    frame_count = job.frame_count()
+def job_chunks_from_job(job: Job, total_chunk_target: int, plan: Optional["RenderPlan"] = None) -> list[JobChunk]:
+    if job.region_count() > 1:
+        # Each frame range is rendered once per region, so the frame chunks shrink to keep the total chunk count on target.
+        regions = job.regions()
+        frame_chunks = job_chunks_from_job_frames(job, max(1, total_chunk_target // len(regions)))
+        print(f"Splitting every frame into {len(regions)} regions: {regions}")
+        return [
+            JobChunk(job=job, chunk_start_frame=chunk.chunk_start_frame, chunk_end_frame=chunk.chunk_end_frame, region=region, progressive_stride=job.progressive_stride)
+            for chunk in frame_chunks
+            for region in regions
+        ]
+    return job_chunks_from_job_frames(job, total_chunk_target, plan)
+
+def job_chunks_from_job_frames(job: Job, total_chunk_target: int, plan: Optional["RenderPlan"] = None) -> list[JobChunk]:
+    frame_count = job.rendered_frame_count()
     chunk_size = math.ceil(frame_count / total_chunk_target)
     max_chunk_size = min(job.max_chunk_size, frame_count)
     chunk_size = min(max_chunk_size, max(job.min_chunk_size, chunk_size))
-    chunks = chunk_frame_range(job.overall_start_frame, job.overall_end_frame, chunk_size=chunk_size)
-    print(f"Splitting {frame_count} frames into chunks of {chunk_size}, chunks={chunks}")
-    return [JobChunk(job=job, chunk_start_frame=chunk[0], chunk_end_frame=chunk[1]) for chunk in chunks]
+    if plan is not None:
+        chunk_size = plan.chunk_size  # Already within the job's chunk size limits
+    chunks = [chunk for start, end in job.rendered_frame_ranges() for chunk in chunk_frame_range(start, end, chunk_size=chunk_size)]
+    if job.frame_cost_estimates_path:
+        chunks = cost_weighted_chunks(job, equal_chunks=chunks)
+    else:
+        print(f"Splitting {frame_count} frames into chunks of {chunk_size}, chunks={chunks}")
+    if job.progressive_stride > 1:
+        if job.progressive_stride >= chunk_size:
+            print(f"WARNING: progressive_stride {job.progressive_stride} isn't smaller than the chunks of {chunk_size} frames, so each chunk's "
+                  f"first pass is a single frame and the order is close to sequential. Lower the stride or raise min_chunk_size.")
+        # Each chunk covers its range coarse-to-fine, and the first wave of containers gets chunks from across the whole shot.
+        chunks = [chunks[i] for i in spread_order(len(chunks))]
+        print(f"Progressive frame order with stride {job.progressive_stride}, dispatch order={chunks}")
+    return [JobChunk(job=job, chunk_start_frame=chunk[0], chunk_end_frame=chunk[1], progressive_stride=job.progressive_stride) for chunk in chunks]
 
-def selected_job(session_id: str) -> Job:
+def cost_weighted_chunks(job: Job, equal_chunks: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    samples = load_frame_costs(os.path.expanduser(job.frame_cost_estimates_path))
+    frame_costs = interpolate_frame_costs(samples, job.overall_start_frame, job.overall_end_frame)
+    chunks = []
+    for start, end in job.rendered_frame_ranges():
+        # Each range keeps the number of chunks the equal split gave it, only the boundaries move.
+        range_chunk_count = sum(1 for chunk_start, _ in equal_chunks if start <= chunk_start <= end)
+        chunks += chunk_frame_range_by_cost(
+            start,
+            end,
+            frame_costs[start - job.overall_start_frame:end - job.overall_start_frame + 1],
+            chunk_count=range_chunk_count,
+            min_chunk_size=job.min_chunk_size,
+            max_chunk_size=job.max_chunk_size
+        )
+    # Dispatch the heaviest chunks first so they aren't the ones left running at the end.
+    chunks = longest_processing_time_order(chunks, chunk_costs(chunks, job.overall_start_frame, frame_costs))
+
+    equal_makespan = predicted_makespan(chunk_costs(equal_chunks, job.overall_start_frame, frame_costs), job.render_node_concurrency_target)
+    weighted_makespan = predicted_makespan(chunk_costs(chunks, job.overall_start_frame, frame_costs), job.render_node_concurrency_target)
+    print(f"Cost-weighted split of {job.rendered_frame_count()} frames from {len(samples)} samples into {len(chunks)} chunks, chunks={chunks}")
+    print(f"Predicted makespan (estimate units): equal split {equal_makespan:.1f} ({len(equal_chunks)} chunks), "
+          f"cost-weighted {weighted_makespan:.1f} ({len(chunks)} chunks)")
+    return chunks
+
+def planning_frame_costs(job: Job) -> list[float]:
+    """Estimated render seconds of every frame of the job, from frame_cost_estimates_path and/or seconds_per_frame_estimate."""
+    if not job.frame_cost_estimates_path:
+        return [job.seconds_per_frame_estimate] * job.frame_count()
+    samples = load_frame_costs(os.path.expanduser(job.frame_cost_estimates_path))
+    frame_costs = interpolate_frame_costs(samples, job.overall_start_frame, job.overall_end_frame)
+    if job.seconds_per_frame_estimate:
+        # Eg. eco run timings only give the shape of the shot, the estimate gives the scale.
+        scale = job.seconds_per_frame_estimate * len(frame_costs) / sum(frame_costs)
+        frame_costs = [cost * scale for cost in frame_costs]
+    return frame_costs
+
+def load_jobs_config() -> configparser.ConfigParser:
     # Compute the absolute path to your INI file (one level up from the src directory).
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.abspath(os.path.join(current_dir, ".."))
@@ -120,6 +431,10 @@ def selected_job(session_id: str) -> Job:
     read_files = config.read(config_file_path)
     if not read_files:
         raise FileNotFoundError(f"Configuration file '{config_file_path}' not found.")
+    return config
+
+def selected_job(session_id: str) -> Job:
+    config = load_jobs_config()
 
     # Load the current job name from the [RUN] section.
     try:
@@ -129,7 +444,31 @@ def selected_job(session_id: str) -> Job:
             "The 'RUN' section with 'CURRENT_JOB' property is missing in the configuration file.") from e
 
     print("Current job:", current_job_name)
+    return job_from_config(config, current_job_name, session_id)
 
+def selected_batch_jobs(job_names: Optional[list[str]] = None) -> tuple[list[Job], int]:
+    """
+    Loads the jobs of a batch run, each with its own session so frames and summaries stay separate.
+
+    Job names default to the comma-separated [RUN].BATCH_JOBS. Returns the jobs and the batch-wide
+    concurrency cap ([RUN].BATCH_CONCURRENCY, defaulting to the largest job concurrency target).
+    """
+    config = load_jobs_config()
+    if not job_names:
+        try:
+            job_names = [name.strip() for name in config.get("RUN", "BATCH_JOBS").split(",") if name.strip()]
+        except (configparser.NoSectionError, configparser.NoOptionError) as e:
+            raise ValueError("No batch jobs given and [RUN].BATCH_JOBS is missing in the configuration file.") from e
+    if len(set(job_names)) != len(job_names):
+        raise ValueError(f"Duplicate jobs in batch: {job_names}")
+
+    print("Batch jobs:", job_names)
+    jobs = [job_from_config(config, job_name, str(uuid.uuid4())) for job_name in job_names]
+    default_concurrency = max(job.render_node_concurrency_target for job in jobs)
+    concurrency = config.getint("RUN", "BATCH_CONCURRENCY", fallback=default_concurrency)
+    return jobs, concurrency
+
+def job_from_config(config: configparser.ConfigParser, current_job_name: str, session_id: str) -> Job:
     # Ensure the specified job section exists.
     if current_job_name not in config.sections():
         raise ValueError(f"Job '{current_job_name}' not found in the configuration file.")
@@ -158,6 +497,9 @@ def selected_job(session_id: str) -> Job:
     # First, check that job-specific keys are defined in the job section.
     # (Using the internal _sections dict to bypass fallback to DEFAULT.)
     job_section = config._sections.get(current_job_name, {})
+    camera_names = [name.strip() for name in job_section.get("camera_names", "").split(",") if name.strip()]
+    if camera_names:
+        job_specific_keys.remove("camera_name")  # Defaults to the first of camera_names
     for key in job_specific_keys:
         if key not in job_section:
             raise ValueError(
@@ -174,21 +516,41 @@ def selected_job(session_id: str) -> Job:
             )
 
     # Read and convert the values.
-    render_node_concurrency_target = config.getint(current_job_name, "render_node_concurrency_target")
     render_engine_str = config.get(current_job_name, "render_engine").strip().upper()
 
     if render_engine_str in ("BLENDER_EEVEE_NEXT", "CYCLES"):
         render_engine: RenderEngine = render_engine_str  # type: ignore
     else:
         raise ValueError(f"Unknown render engine '{render_engine_str}'.")
+    chunking = engine_chunking_from_config(config, current_job_name, render_engine)
+
+    # Optional scheduling keys, they fall back to the static chunking behaviour when absent.
+    scheduler_str = config.get(current_job_name, "scheduler", fallback="static").strip().lower()
+    if scheduler_str in ("static", "queue", "warm"):
+        scheduler: Scheduler = scheduler_str  # type: ignore
+    else:
+        raise ValueError(f"Unknown scheduler '{scheduler_str}'.")
+
+    # Optional EXR output keys, defaulting to what Blender writes out of the box.
+    exr_codec_str = config.get(current_job_name, "exr_codec", fallback="ZIP").strip().upper()
+    if exr_codec_str in EXR_CODECS:
+        exr_codec: ExrCodec = exr_codec_str  # type: ignore
+    else:
+        raise ValueError(f"Unknown EXR codec '{exr_codec_str}'.")
+    exr_color_depth_str = config.get(current_job_name, "exr_color_depth", fallback="32").strip()
+    if exr_color_depth_str in ("16", "32"):
+        exr_color_depth: ExrColorDepth = exr_color_depth_str  # type: ignore
+    else:
+        raise ValueError(f"Unknown EXR color depth '{exr_color_depth_str}'.")
+    exr_passes = [name.strip().lower() for name in config.get(current_job_name, "exr_passes", fallback="").split(",") if name.strip()]
 
     return Job(
         job_name=current_job_name,
         session_id=session_id,
-        render_node_concurrency_target=render_node_concurrency_target,
+        render_node_concurrency_target=chunking["render_node_concurrency_target"],
         render_engine=render_engine,
         blend_file_path=config.get(current_job_name, "blend_file_path"),
-        camera_name=config.get(current_job_name, "camera_name"),
+        camera_name=config.get(current_job_name, "camera_name", fallback=None) or camera_names[0],
         overall_start_frame=config.getint(current_job_name, "start_frame"),
         overall_end_frame=config.getint(current_job_name, "end_frame"),
         width=config.getint(current_job_name, "width"),
@@ -196,6 +558,56 @@ def selected_job(session_id: str) -> Job:
         render_max_samples=config.getint(current_job_name, "render_max_samples"),
         render_adaptive_threshold=config.getfloat(current_job_name, "render_adaptive_threshold"),
         eco_mode_enabled=config.getboolean(current_job_name, "eco_mode_enabled"),
-        min_chunk_size=config.getint(current_job_name, "min_chunk_size"),
-        max_chunk_size=config.getint(current_job_name, "max_chunk_size"),
-    )
\ No newline at end of file
+        min_chunk_size=chunking["min_chunk_size"],
+        max_chunk_size=chunking["max_chunk_size"],
+        scheduler=scheduler,
+        queue_batch_size=chunking["queue_batch_size"],
+        frame_cost_estimates_path=config.get(current_job_name, "frame_cost_estimates_path", fallback=None),
+        priority=config.getint(current_job_name, "priority", fallback=0),
+        region_columns=config.getint(current_job_name, "region_columns", fallback=1),
+        region_rows=config.getint(current_job_name, "region_rows", fallback=1),
+        use_frame_cache=config.getboolean(current_job_name, "use_frame_cache", fallback=True),
+        exr_codec=exr_codec,
+        exr_color_depth=exr_color_depth,
+        exr_dwa_quality=config.getint(current_job_name, "exr_dwa_quality", fallback=BLENDER_DWA_QUALITY),
+        exr_multilayer=config.getboolean(current_job_name, "exr_multilayer", fallback=False),
+        exr_passes=exr_passes,
+        write_behind=config.getboolean(current_job_name, "write_behind", fallback=False),
+        speculative_execution=config.getboolean(current_job_name, "speculative_execution", fallback=False),
+        progressive_stride=config.getint(current_job_name, "progressive_stride", fallback=1),
+        gpus_per_container=config.getint(current_job_name, "gpus_per_container", fallback=1),
+        deadline_minutes=optional_float(config, current_job_name, "deadline_minutes"),
+        gpu_hours_budget=optional_float(config, current_job_name, "gpu_hours_budget"),
+        seconds_per_frame_estimate=optional_float(config, current_job_name, "seconds_per_frame_estimate"),
+        bake_simulations=config.getboolean(current_job_name, "bake_simulations", fallback=False),
+        denoise_on_cpu=config.getboolean(current_job_name, "denoise_on_cpu", fallback=False),
+        denoiser=config.get(current_job_name, "denoiser", fallback="oidn").strip().lower(),
+        denoise_workers=config.getint(current_job_name, "denoise_workers", fallback=4),
+        camera_names=camera_names or None,
+        eevee_samples=config.getint(current_job_name, "eevee_samples", fallback=64),
+    )
+
+def engine_chunking_from_config(config: configparser.ConfigParser, current_job_name: str, render_engine: RenderEngine) -> dict:
+    """
+    Concurrency, chunk size and queue batch size for the job: its own section's values, then for fast-frame engines
+    the [RUN] <prefix>_<key> ones (eg. EEVEE_MIN_CHUNK_SIZE, falling back to FAST_FRAME_CHUNKING_DEFAULTS), then [DEFAULT].
+    """
+    prefix = FAST_FRAME_ENGINE_PREFIXES.get(render_engine)
+    chunking = {}
+    for key, fast_frame_default in FAST_FRAME_CHUNKING_DEFAULTS.items():
+        if prefix is not None and not job_sets_option(config, current_job_name, key):
+            chunking[key] = config.getint("RUN", f"{prefix}_{key}", fallback=fast_frame_default)
+        else:
+            chunking[key] = config.getint(current_job_name, key, fallback=2 if key == "queue_batch_size" else None)
+    return chunking
+
+def job_sets_option(config: configparser.ConfigParser, section: str, key: str) -> bool:
+    """Whether the job's own section sets `key`, rather than inheriting it from [DEFAULT]."""
+    # (Using the internal _sections dict to bypass fallback to DEFAULT, like job_from_config.)
+    return config.optionxform(key) in config._sections.get(section, {})
+
+
+def optional_float(config: configparser.ConfigParser, section: str, key: str) -> Optional[float]:
+    """A float key that's unset when absent or left empty, eg. `deadline_minutes =` in [DEFAULT]."""
+    value = config.get(section, key, fallback="").strip()
+    return float(value) if value else None
\ No newline at end of file
@@ -1,46 +1,568 @@
 ####
-# Sample command: `modal run src/main.py --frame-count 60 --blend-path my-project.blend`
+# Sample command: `modal run src/main.py::main --frame-count 60 --blend-path my-project.blend`
 ####
 
+import json
+import math
+import os
 import modal
+import threading
+import time
 import uuid
+from contextlib import ExitStack, contextmanager
+from typing import Optional
 from pathlib import Path
-from dependencies import app, volume
-from cloud_render import render_sequence
-from paths import validate_blender_path, blender_proj_remote_volume_upload_path, remote_job_frames_absolute_volume_directory_path
-from job import Job, job_chunks_from_job, selected_job
+from dependencies import app, volume, addons, bpy_package_name
+from cloud_render import render_sequence, render_queue_worker, WarmRenderer, MultiGpuRenderer, render_function_options, verify_session_frames, profile_startup, SnapshotStartupProfiler, bake_simulations, denoise_frames
+from paths import blend_blob_remote_path, validate_blender_path, remote_job_frames_absolute_volume_directory_path, remote_job_telemetry_absolute_volume_directory_path
+from job import Job, JobChunk, job_chunks_from_job, planning_frame_costs, selected_job, selected_batch_jobs, load_jobs_config, job_from_config
+from chunking import chunk_frame_range
+from frame_queue import WorkerStats, print_utilization_report
+from progress import RenderProgress, setup_seconds_saved, format_duration
+from storage import ModalVolumeStorage
+from blend_cache import upload_blend, write_session_manifest, collect_unreferenced_blobs
+from download import FrameDownloader, summarize_downloads
+from fault_tolerance import RunReport, render_with_retries, retry_policy_from_config
+from frame_verify import parse_frame_ranges, format_frame_ranges, print_verification, contiguous_ranges
+from frame_cache import FrameCache, job_frame_prefixes, renderer_versions, restore_cached_frames, store_rendered_frames
+from speculation import SpeculativeRunner, StragglerDetector, FrameListing, ModalCallHandle, speculation_policy_from_config
+from sim_cache import bake_key, read_bake_manifest
+from multi_camera import CameraSyncComparison, single_camera_jobs
+from telemetry import telemetry_file_name
+from denoise import DenoiseReport, ModalFrameReadyQueue, gpu_denoise_seconds_from_config
+from planner import RenderPlan, candidate_plans, pareto_front, choose_plan, print_plans, planner_config_from_config
+from startup import summarize_profiles, append_startup_history, load_startup_history, print_startup_summary, print_startup_history
+
+# Part of every frame cache key, so cached frames from another Blender or addon build are never reused.
+RENDERER_VERSIONS = renderer_versions(addons, bpy_package_name)
 
 @app.local_entrypoint()
-def main():
-    current_job: Job = selected_job(str(uuid.uuid4()))
+def main(download: bool = False, download_workers: int = 8, frames: str = "", session_id: str = ""):
+    """
+    Renders [RUN].CURRENT_JOB. `--frames 130-140,200` limits rendering to those frames, and with
+    `--session-id <id>` they are rendered into an existing session, eg. to fill the gaps `verify` reports.
+    """
+    current_job: Job = selected_job(session_id or str(uuid.uuid4()))
+    if frames:
+        current_job.frame_ranges = parse_frame_ranges(frames)
     print(f"current job: {current_job}")
     current_job.validate()
 
-    # 1. Upload the .blend file into the Volume
-    print(f"Uploading to remove server... {current_job.blend_file_path}")
-    with volume.batch_upload() as batch:
-        local_blend = Path(current_job.blend_file_path)
+    # 1. Upload the .blend file into the Volume (skipped if this exact file is already there)
+    upload_job_blends([current_job])
+    frame_cache = FrameCache(ModalVolumeStorage(volume)) if current_job.use_frame_cache else None
+    needs_rendering = restore_from_frame_cache(frame_cache, current_job) if frame_cache else True
+    # Planned for the frames actually left to render, after --frames and the frame cache.
+    plan = plan_job(current_job) if needs_rendering and current_job.is_planned() else None
+    if needs_rendering:
+        bake_job_simulations([current_job])
+
+    # 2. Render, optionally pulling finished frames down in the background
+    downloaders = frame_downloaders(current_job.session_id, current_job.job_name, download_workers, subdirectories=current_job.frame_subdirectories())
+    stop_following = threading.Event()
+    followers = [threading.Thread(target=downloader.follow, args=(stop_following,), daemon=True) for downloader in downloaders]
+    if download:
+        for follower in followers:
+            follower.start()
+
+    run_report = None
+    if not needs_rendering:
+        print("Every frame came from the frame cache, nothing to render.")
+    else:
+        with cpu_denoising(current_job):
+            if current_job.scheduler == "queue":
+                run_report = render_with_frame_queue(current_job)
+            elif current_job.scheduler == "warm":
+                run_report = render_warm_chunks(current_job)
+            else:
+                run_report = render_static_chunks(current_job, plan)
+    if frame_cache and needs_rendering:
+        save_to_frame_cache(frame_cache, [current_job], run_report)
+    if run_report is not None and not run_report.is_success():
+        failed_frames = format_frame_ranges(run_report.failed_frame_ranges(current_job.job_name))
+        print(f"Some frames failed, re-render them with:\nmodal run src/main.py::main --session-id {current_job.session_id} --frames {failed_frames}")
+    else:
+        print("All frames rendered into the Volume.")
+
+    # 3. Download the frames, or show how to do it later
+    if download:
+        stop_following.set()
+        for follower in followers:
+            follower.join()
+        for downloader in downloaders:
+            summarize_downloads(downloader.download_all())
+            print(f"Frames downloaded to {downloader.local_dir}")
+    else:
+        command = f"modal run src/main.py::download --session-id {current_job.session_id} --job-name {current_job.job_name}"
+        print(f"\nTo download locally, run:\n{command}\n")
+
+    print("Done!")
+
+
+@app.local_entrypoint()
+def download(session_id: str, job_name: str, workers: int = 8, verify_hashes: bool = False, telemetry: bool = False):
+    """Parallel, resumable frame download: `modal run src/main.py::download --session-id <id> --job-name <job>`"""
+    for downloader in frame_downloaders(session_id, job_name, workers, verify_hashes=verify_hashes):
+        summarize_downloads(downloader.download_all())
+        print(f"Frames downloaded to {downloader.local_dir}")
+
+    if telemetry:
+        # Render telemetry for local/telemetry_report.py
+        telemetry_downloader = FrameDownloader(ModalVolumeStorage(volume), remote_job_telemetry_absolute_volume_directory_path(session_id), local_frames_directory(session_id, job_name) / "telemetry", workers=workers)
+        summarize_downloads(telemetry_downloader.download_all())
+        print(f"Telemetry downloaded to {telemetry_downloader.local_dir}")
+
+
+def frame_downloaders(session_id: str, job_name: str, workers: int, verify_hashes: bool = False, subdirectories: Optional[list[str]] = None) -> list[FrameDownloader]:
+    """
+    One downloader per frames directory: the session's, or each camera's of a multi-camera job, mirrored locally.
+    Without `subdirectories` (see Job.frame_subdirectories) they're whatever the session has on the Volume.
+    """
+    storage = ModalVolumeStorage(volume)
+    remote_frames_dir_path = remote_job_frames_absolute_volume_directory_path(session_id)
+    if subdirectories is None:
+        subdirectories = [Path(entry.path).name for entry in storage.listdir(remote_frames_dir_path) if entry.is_dir] or [""]
+    return [
+        FrameDownloader(storage, remote_frames_dir_path / subdirectory, local_frames_directory(session_id, job_name) / subdirectory, workers=workers, verify_hashes=verify_hashes)
+        for subdirectory in subdirectories
+    ]
+
+
+def local_frames_directory(session_id: str, job_name: str) -> Path:
+    return Path(f"~/frames/{job_name}_{session_id}").expanduser()
+
+
+@app.local_entrypoint()
+def batch(jobs: str = "", download: bool = False, download_workers: int = 8):
+    """Renders several jobs in one shared container pool: `modal run src/main.py::batch --jobs fire-c-fun,fire-c3`"""
+    batch_jobs, concurrency = selected_batch_jobs([name.strip() for name in jobs.split(",") if name.strip()])
+    for job in batch_jobs:
+        print(f"batch job: {job}")
+        job.validate()
+        if job.is_planned():
+            # A plan's concurrency and chunk size assume the job has its containers to itself, not a share of the pool.
+            raise Exception(f"Job '{job.job_name}' sets deadline_minutes or gpu_hours_budget, which batch runs can't plan for; "
+                            f"render it on its own with main, or clear them to render it in the batch")
+        if job.scheduler == "queue":
+            print(f"Job '{job.job_name}' uses the queue scheduler, which batch runs don't support; rendering static chunks instead")
+
+    # 1. Upload each distinct .blend once, and take whatever frames the frame cache already has
+    upload_job_blends(batch_jobs)
+    frame_cache = FrameCache(ModalVolumeStorage(volume)) if any(job.use_frame_cache for job in batch_jobs) else None
+    render_jobs = [job for job in batch_jobs if not job.use_frame_cache or restore_from_frame_cache(frame_cache, job)]
+    bake_job_simulations(render_jobs)
+
+    # 2. Schedule every job's chunks into a single pool, higher priority jobs first
+    batch_chunks = []
+    # Spread the chunk budget across jobs in proportion to their frame counts, so all jobs get similarly sized chunks.
+    total_frames = sum(job.rendered_frame_count() * job.region_count() for job in render_jobs)
+    chunk_counts = {}
+    for job in render_jobs:
+        total_chunk_target = max(1, math.ceil(concurrency * 2 * job.rendered_frame_count() * job.region_count() / total_frames))
+        job_chunks = job_chunks_from_job(job, total_chunk_target=total_chunk_target)
+        chunk_counts[job.job_name] = len(job_chunks)
+        batch_chunks += job_chunks
+    print(f"Dispatching {len(batch_chunks)} chunks from {len(batch_jobs)} jobs with at most {concurrency} in flight")
+
+    overall = RenderProgress(total_frames=total_frames, concurrency=concurrency)
+    per_job = {job.job_name: RenderProgress(total_frames=job.rendered_frame_count() * job.region_count(), concurrency=min(concurrency, chunk_counts[job.job_name])) for job in render_jobs}
+
+    def record(result):
+        overall.record(result)
+        per_job[result.job_name].record(result)
+        print(f"{result.job_name} chunk {result.start_frame}-{result.end_frame} done in {result.render_seconds:.0f}s. "
+              f"Job: {per_job[result.job_name].status_line()} Batch: {overall.status_line()}")
+
+    # speculative_execution jobs spawn their chunks through a runner of their own, so stragglers are backed up like in main().
+    runners = {job.job_name: speculative_runner(job, chunk_counts[job.job_name], batch_chunk_function(job).spawn) for job in render_jobs if job.speculative_execution}
+
+    def render_chunk(job_chunk: JobChunk):
+        runner = runners.get(job_chunk.job.job_name)
+        return runner.render(job_chunk) if runner is not None else render_batch_chunk(job_chunk)
+
+    with ExitStack() as denoising:
+        for job in render_jobs:
+            denoising.enter_context(cpu_denoising(job))
+        run_report = render_with_retries(batch_chunks, render_chunk, chunk_written_frames, max_in_flight=concurrency, policy=retry_policy_from_config(load_jobs_config()), on_result=record)
+    run_report.print_summary()
+    for job_name, runner in runners.items():
+        print(f"{job_name} speculation: {runner.detector.duplicates_launched} duplicates launched, {runner.cancelled_copies} redundant copies cancelled, "
+              f"~{format_duration(runner.detector.reserved_gpu_seconds)} of speculative GPU time")
+    cached_jobs = [job for job in render_jobs if job.use_frame_cache]
+    if cached_jobs:
+        save_to_frame_cache(frame_cache, cached_jobs, run_report)
+
+    # 3. Per-job summaries and downloads
+    for job in batch_jobs:
+        progress = per_job.get(job.job_name)
+        if progress is None:
+            print(f"{job.job_name} (session {job.session_id}): every frame came from the frame cache")
+        else:
+            print(f"{job.job_name} (session {job.session_id}): {progress.frames_done} frames, "
+                  f"{progress.gpu_seconds / 3600:.2f} GPU-hours, {progress.frames_per_gpu_minute():.2f} frames/GPU-min")
+        if run_report.failed_frame_ranges(job.job_name):
+            print(f"  re-render failed frames with: modal run src/main.py::main --session-id {job.session_id} --frames {format_frame_ranges(run_report.failed_frame_ranges(job.job_name))}")
+        if download:
+            for downloader in frame_downloaders(job.session_id, job.job_name, download_workers, subdirectories=job.frame_subdirectories()):
+                summarize_downloads(downloader.download_all())
+                print(f"Frames downloaded to {downloader.local_dir}")
+        else:
+            print(f"  modal run src/main.py::download --session-id {job.session_id} --job-name {job.job_name}")
+    print("Done!")
+
+
+def render_batch_chunk(job_chunk: JobChunk):
+    return batch_chunk_function(job_chunk.job).remote(job_chunk)
+
+
+def batch_chunk_function(job: Job):
+    """The Modal function (or method) rendering a batch job's chunks, called with .remote or, for speculation, .spawn."""
+    if job.scheduler == "warm":
+        # No preloaded blend_path: containers load whichever job's scene they get first and reload when it changes.
+        return WarmRenderer().render_chunk
+    if job.gpus_per_container > 1:
+        return multi_gpu_renderer(job).render_chunk
+    return render_sequence
+
+
+def upload_job_blends(jobs: list[Job]):
+    storage = ModalVolumeStorage(volume)
+    blend_hashes = {}
+    for job in jobs:
+        local_blend = Path(job.blend_file_path)
         validate_blender_path(local_blend)
-        batch.put_file(local_blend, blender_proj_remote_volume_upload_path(current_job.session_id))
+        if local_blend.resolve() in blend_hashes:
+            # Same file as an earlier job in this run, just point this job's session at the blob.
+            job.blend_content_hash = blend_hashes[local_blend.resolve()]
+            write_session_manifest(storage, session_id=job.session_id, job_name=job.job_name, blend_hash=job.blend_content_hash)
+            continue
+        print(f"Uploading to remove server... {job.blend_file_path}")
+        job.blend_content_hash = upload_blend(storage, local_blend, job.session_id, job.job_name)
+        blend_hashes[local_blend.resolve()] = job.blend_content_hash
+
+
+def bake_job_simulations(jobs: list[Job]):
+    """
+    Points jobs with bake_simulations at a shared bake of their scene's simulation caches, baking it on a CPU
+    container first unless one for the same .blend content and Blender build is already on the Volume.
+    """
+    storage = ModalVolumeStorage(volume)
+    for job in jobs:
+        if not job.bake_simulations:
+            continue
+        key = bake_key(job.blend_content_hash, RENDERER_VERSIONS)
+        manifest = read_bake_manifest(storage, key)
+        if manifest is not None:
+            print(f"Reusing simulation bake {key} from {time.ctime(manifest['baked_at'])}: {len(manifest['slots'])} caches, frames {manifest['frame_range']}")
+        else:
+            print(f"Baking simulation caches of {job.blend_file_path} into {key}...")
+            manifest = bake_simulations.remote(job, key, RENDERER_VERSIONS)
+            print(f"Baked {len(manifest['slots'])} caches in {format_duration(manifest['bake_seconds'])}")
+        job.sim_cache_key = key
+
+
+@contextmanager
+def cpu_denoising(job: Job):
+    """
+    For denoise_on_cpu jobs, runs job.denoise_workers CPU containers alongside rendering, denoising frames as render
+    containers announce them. Leaving the block waits for the backlog, so every frame is final before the frame cache
+    and downloads see it, then reports the GPU time saved.
+    """
+    if not job.denoise_on_cpu:
+        yield
+        return
+
+    with modal.Queue.ephemeral() as frame_ready_queue:
+        job.frame_ready_queue = frame_ready_queue
+        print(f"Denoising {job.job_name} frames on {job.denoise_workers} CPU containers with {job.denoiser}")
+        calls = [denoise_frames.spawn(job, frame_ready_queue, worker_id) for worker_id in range(job.denoise_workers)]
+        try:
+            yield
+        finally:
+            job.frame_ready_queue = None
+            ModalFrameReadyQueue(frame_ready_queue).close(len(calls))
+            print("Rendering done, waiting for the denoise workers to finish the backlog...")
+            report = DenoiseReport([call.get() for call in calls], gpu_denoise_seconds_from_config(load_jobs_config()), job.rendered_frame_count())
+            report.print()
+            if report.failed_frames():
+                print(f"Noisy frames are in {job.session_id}/noisy, re-render them with:\n"
+                      f"modal run src/main.py::main --session-id {job.session_id} --frames {format_frame_ranges(contiguous_ranges(report.failed_frames()))}")
+
+
+def restore_from_frame_cache(frame_cache: FrameCache, job: Job) -> bool:
+    """Copies cached frames into the job's session and narrows it to the misses. Returns False if nothing is left to render."""
+    misses = restore_cached_frames(frame_cache, job, RENDERER_VERSIONS)
+    if not misses:
+        return False
+    if len(misses) < job.rendered_frame_count():
+        # Only narrow on a hit, so a cold cache keeps the job's own split (eg. cost-weighted over the whole shot).
+        job.frame_ranges = contiguous_ranges(misses)
+    return True
+
+
+def save_to_frame_cache(frame_cache: FrameCache, jobs: list[Job], run_report: Optional[RunReport]):
+    """Adds the frames these jobs just rendered to the cache, then evicts down to the [RUN] limits."""
+    for job in jobs:
+        failed_ranges = run_report.failed_frame_ranges(job.job_name) if run_report else []
+        failed = {frame for start, end in failed_ranges for frame in range(start, end + 1)}
+        frames = [frame for start, end in job.rendered_frame_ranges() for frame in range(start, end + 1) if frame not in failed]
+        print(f"Frame cache: stored {store_rendered_frames(frame_cache, job, frames, RENDERER_VERSIONS)} frames of {job.job_name}")
+
+    config = load_jobs_config()
+    max_bytes = config.getfloat("RUN", "FRAME_CACHE_MAX_GB", fallback=500) * 1024 ** 3
+    max_age_seconds = config.getfloat("RUN", "FRAME_CACHE_MAX_AGE_DAYS", fallback=30) * 24 * 60 * 60
+    evicted = frame_cache.evict(max_bytes=int(max_bytes), max_age_seconds=max_age_seconds)
+    frame_cache.save()
+    print(f"Frame cache: {len(frame_cache.index)} frames, {frame_cache.total_bytes() / 1024 ** 3:.1f} GB after evicting {len(evicted)}")
+
 
-    total_chunk_target = current_job.render_node_concurrency_target
-    if current_job.render_node_concurrency_target > 1:
+@app.local_entrypoint()
+def verify(session_id: str, job_name: str = ""):
+    """Checks a session's frames on the Volume for gaps and broken EXRs: `modal run src/main.py::verify --session-id <id>`"""
+    job = job_from_config(load_jobs_config(), job_name, session_id) if job_name else selected_job(session_id)
+    rerender_frames = []
+    prefixes = job_frame_prefixes(job).values()
+    for prefix in prefixes:
+        # Each region tile (`{job}_rNN_`) or camera directory of the job separately
+        subdirectory, file_prefix = os.path.dirname(prefix), os.path.basename(prefix)
+        if len(prefixes) > 1:
+            print(f"{prefix}NNNN.exr:")
+        verification = verify_session_frames.remote(session_id, file_prefix[:-1], job.overall_start_frame, job.overall_end_frame, subdirectory=subdirectory)
+        print_verification(verification)
+        rerender_frames += [frame for start, end in verification.rerender_ranges() for frame in range(start, end + 1)]
+    if rerender_frames:
+        # Chunks render every tile or camera of their frames, so a frame missing any of them is rendered again for all.
+        print(f"\nRe-render with:\nmodal run src/main.py::main --session-id {session_id} --frames {format_frame_ranges(contiguous_ranges(rerender_frames))}")
+
+
+@app.local_entrypoint()
+def startup(runs: int = 3, snapshot: bool = True):
+    """
+    Profiles render container cold starts and records them: `modal run src/main.py::startup --runs 3`
+
+    Runs are submitted together so each lands on a fresh container. The medians are appended to the local
+    startup history and compared with the previous entry, to track startup time across changes. The snapshot
+    variant only restores from a snapshot once one exists, ie. from the second run after a code change.
+    """
+    submitted_at = time.time()
+    profiles = list(profile_startup.map([submitted_at] * runs))
+    if snapshot:
+        submitted_at = time.time()
+        profiles += list(SnapshotStartupProfiler().profile.map([submitted_at] * runs))
+
+    history = load_startup_history()
+    summary = summarize_profiles(profiles)
+    print_startup_summary(summary, previous=history[-1] if history else None)
+    history.append(append_startup_history(summary))
+    print_startup_history(history)
+
+
+@app.local_entrypoint()
+def camera_sync(frames: str = "", job_name: str = ""):
+    """
+    Measures what rendering a multi-camera job's cameras from one loaded scene saves over a chunk per camera:
+    `modal run src/main.py::camera_sync --frames 1-4`
+
+    Renders the frames once as a single multi-camera chunk and once per camera, all in a fresh session, and
+    compares setup, scene sync and camera switch times from their ChunkResults and telemetry.
+    """
+    session_id = str(uuid.uuid4())
+    job = job_from_config(load_jobs_config(), job_name, session_id) if job_name else selected_job(session_id)
+    if not job.is_multi_camera():
+        raise Exception(f"{job.job_name} renders a single camera, set camera_names to compare")
+    start_frame, end_frame = parse_frame_ranges(frames)[0] if frames else (job.overall_start_frame, min(job.overall_end_frame, job.overall_start_frame + 3))
+    job.frame_ranges = [(start_frame, end_frame)]
+    job.validate()
+    upload_job_blends([job])
+    bake_job_simulations([job])
+    camera_jobs = single_camera_jobs(job)  # After uploading, so they share the blob and bake
+
+    shared_call = render_sequence.spawn(JobChunk(job, start_frame, end_frame))
+    camera_calls = {camera_name: render_sequence.spawn(JobChunk(camera_job, start_frame, end_frame)) for camera_name, camera_job in camera_jobs.items()}
+    storage = ModalVolumeStorage(volume)
+    telemetry_dir = remote_job_telemetry_absolute_volume_directory_path(session_id)
+
+    def telemetry_record(name: str) -> dict:
+        lines = storage.read_bytes(telemetry_dir / telemetry_file_name(name, start_frame, end_frame)).decode().splitlines()
+        return json.loads(lines[-1])
+
+    shared = shared_call.get()
+    per_camera = {camera_name: (call.get(), telemetry_record(camera_jobs[camera_name].job_name)) for camera_name, call in camera_calls.items()}
+    CameraSyncComparison(shared, telemetry_record(job.job_name), per_camera).print()
+
+
+@app.local_entrypoint()
+def gc(dry_run: bool = False, min_age_hours: float = 24):
+    """Prunes uploaded .blend blobs that no session references: `modal run src/main.py::gc --dry-run`"""
+    removed = collect_unreferenced_blobs(ModalVolumeStorage(volume), min_age_seconds=min_age_hours * 60 * 60, dry_run=dry_run)
+    print(f"{'Found' if dry_run else 'Removed'} {len(removed)} unreferenced blobs")
+
+
+def static_chunk_target(job: Job) -> int:
+    total_chunk_target = job.render_node_concurrency_target
+    # Fast-frame engines' stragglers cost seconds, while every extra chunk pays a whole container's setup.
+    if job.render_node_concurrency_target > 1 and not job.renders_fast_frames():
         # Keep max nodes at original concurrency target, but break down further to better parallelize computationally-intensive localized frame-regions.
-        # There's a tricky tradeoff here between startup latency and long stragglers
-        total_chunk_target = current_job.render_node_concurrency_target * 2
+        # There's a tricky tradeoff here between startup latency and long stragglers (see local/benchmark_chunking.py)
+        total_chunk_target = job.render_node_concurrency_target * 2
+    return total_chunk_target
+
+
+def plan_job(job: Job) -> RenderPlan:
+    """Simulates the job's concurrency and chunk size choices and picks one by its deadline or GPU budget."""
+    config = planner_config_from_config(load_jobs_config(), max_containers=min(job.render_node_concurrency_target, render_function_options["max_containers"]))
+    print(f"Planning with {config}")
+    front = pareto_front(candidate_plans(
+        job.rendered_frame_ranges(),
+        job.overall_start_frame,
+        planning_frame_costs(job),
+        config,
+        min_chunk_size=job.min_chunk_size,
+        max_chunk_size=job.max_chunk_size
+    ))
+    plan = choose_plan(
+        front,
+        deadline_seconds=job.deadline_minutes * 60 if job.deadline_minutes is not None else None,
+        gpu_seconds_budget=job.gpu_hours_budget * 3600 if job.gpu_hours_budget is not None else None
+    )
+    print_plans(front, plan)
+    return plan
+
 
-    job_chunks = job_chunks_from_job(current_job, total_chunk_target=total_chunk_target)
+def render_static_chunks(job: Job, plan: Optional[RenderPlan] = None) -> RunReport:
+    job_chunks = job_chunks_from_job(job, total_chunk_target=static_chunk_target(job), plan=plan)
     print(job_chunks)
-    args = [[job_chunk] for job_chunk in job_chunks]
-    results = list(render_sequence.starmap(args))
-    for r in results:
-        print(r)
-    print("All frames rendered into the Volume.")
-
-    # 4. Show how to download it locally via CLI
-    remote_frames_dir_path = remote_job_frames_absolute_volume_directory_path(current_job.session_id)
-    local_frames_dir_path = f"~/frames/{current_job.job_name}_{current_job.session_id}"
-    command = f"mkdir -p {local_frames_dir_path} && modal volume get distributed-render {remote_frames_dir_path} {local_frames_dir_path}"
-    print(f"\nTo download locally, run:\n{command}\n")
+    # Every chunk is submitted up front, Modal's max_containers caps how many run at once. A plan caps them at its concurrency instead.
+    max_in_flight = plan.concurrency if plan is not None else len(job_chunks)
+    if job.gpus_per_container > 1:
+        renderer = multi_gpu_renderer(job)
+        _, run_report = render_job_chunks(job, job_chunks, renderer.render_chunk.remote, renderer.render_chunk.spawn)
+    else:
+        _, run_report = render_job_chunks(job, job_chunks, render_sequence.remote, render_sequence.spawn, max_in_flight=max_in_flight)
+    return run_report
 
-    print("Done!")
+
+def multi_gpu_renderer(job: Job) -> MultiGpuRenderer:
+    """MultiGpuRenderer with job.gpus_per_container GPUs per container, and CPU and memory scaled to match."""
+    gpus = job.gpus_per_container
+    renderer_cls = MultiGpuRenderer.with_options(
+        gpu=f"{render_function_options['gpu']}:{gpus}",
+        cpu=render_function_options["cpu"] * gpus,
+        memory=render_function_options["memory"] * gpus,
+        max_containers=job.render_node_concurrency_target
+    )
+    return renderer_cls()
+
+
+def render_warm_chunks(job: Job) -> RunReport:
+    job_chunks = job_chunks_from_job(job, total_chunk_target=static_chunk_target(job))
+    print(job_chunks)
+    # Cap containers at the concurrency target so the extra chunks land on already-warm containers instead of new ones.
+    renderer_cls = WarmRenderer.with_options(max_containers=job.render_node_concurrency_target)
+    renderer = renderer_cls(blend_path=str(blend_blob_remote_path(job.blend_content_hash, validate=False)))
+    progress, run_report = render_job_chunks(job, job_chunks, renderer.render_chunk.remote, renderer.render_chunk.spawn)
+    reused = sum(1 for result in progress.results if result.scene_reused)
+    print(f"Warm containers reused the loaded scene for {reused}/{len(progress.results)} chunks, "
+          f"saving ~{format_duration(setup_seconds_saved(progress.results))} of setup")
+    return run_report
+
+
+def render_job_chunks(job: Job, job_chunks: list[JobChunk], render_fn, spawn_fn, max_in_flight: Optional[int] = None) -> tuple[RenderProgress, RunReport]:
+    """
+    Renders the chunks as they finish, retrying the missing frames of failed chunks, and prints progress.
+
+    With speculative_execution, chunks are spawned through `spawn_fn` instead so stragglers can be backed up and cancelled.
+    """
+    runner = speculative_runner(job, len(job_chunks), spawn_fn) if job.speculative_execution else None
+    if runner is not None:
+        render_fn = runner.render
+    # Region jobs count every rendered region of a frame as one unit of progress.
+    max_in_flight = max_in_flight or len(job_chunks)
+    progress = RenderProgress(total_frames=job.rendered_frame_count() * job.region_count(), concurrency=min(job.render_node_concurrency_target, max_in_flight, len(job_chunks)))
+
+    def record(result):
+        progress.record(result)
+        print(f"Chunk {result.start_frame}-{result.end_frame} done in {result.render_seconds:.0f}s "
+              f"({result.seconds_per_frame():.1f}s/frame). {progress.status_line()}")
+
+    run_report = render_with_retries(job_chunks, render_fn, chunk_written_frames, max_in_flight=max_in_flight, policy=retry_policy_from_config(load_jobs_config()), on_result=record)
+    run_report.print_summary()
+    if runner is not None:
+        print(f"Speculation: {runner.detector.duplicates_launched} duplicates launched, {runner.cancelled_copies} redundant copies cancelled, "
+              f"~{format_duration(runner.detector.reserved_gpu_seconds)} of speculative GPU time")
+    return progress, run_report
+
+
+def speculative_runner(job: Job, chunk_count: int, spawn_fn) -> SpeculativeRunner:
+    policy = speculation_policy_from_config(load_jobs_config())
+    print(f"Speculative execution: {policy}")
+    # One listing of the frames directory per poll serves every chunk's progress.
+    listing = FrameListing(ModalVolumeStorage(volume), str(remote_job_frames_absolute_volume_directory_path(job.session_id)), ttl_seconds=policy.poll_seconds)
+    return SpeculativeRunner(
+        spawn=lambda job_chunk: ModalCallHandle(spawn_fn(job_chunk)),
+        written_frames=listing.written_frames,
+        detector=StragglerDetector(policy, chunk_count)
+    )
+
+
+def chunk_written_frames(job_chunk: JobChunk) -> set:
+    """
+    Frames of a (failed) chunk that are on the Volume as complete EXRs; truncated ones count as missing.
+    Multi-camera frames only count once every camera's is written.
+    """
+    written = set(range(job_chunk.chunk_start_frame, job_chunk.chunk_end_frame + 1))
+    for subdirectory in job_chunk.job.frame_subdirectories():
+        verification = verify_session_frames.remote(job_chunk.job.session_id, job_chunk.frame_file_prefix()[:-1], job_chunk.chunk_start_frame, job_chunk.chunk_end_frame,
+                                                    noisy=job_chunk.job.denoise_on_cpu, subdirectory=subdirectory)
+        written -= set(verification.missing) | set(verification.invalid)
+    return written
+
+
+def render_with_frame_queue(job: Job) -> RunReport:
+    """
+    Workers pull small batches until the queue is empty, so a heavy section of the shot
+    is spread across whichever containers free up first instead of stalling one chunk.
+
+    Frames no worker finished (a failed batch, a crashed worker or a queue nobody was left to drain) are
+    rendered again as chunks with the static scheduler's retries, and reported like its failures.
+    """
+    batches = [batch for start, end in job.rendered_frame_ranges() for batch in chunk_frame_range(start, end, chunk_size=job.queue_batch_size)]
+    worker_count = max(1, min(job.render_node_concurrency_target, len(batches)))
+    print(f"Queueing {len(batches)} batches of up to {job.queue_batch_size} frames for {worker_count} workers")
+
+    with modal.Queue.ephemeral() as queue:
+        queue.put_many(batches)
+        args = [[job, queue, worker_id] for worker_id in range(worker_count)]
+        worker_results = list(render_queue_worker.starmap(args, return_exceptions=True))
+
+    worker_stats = [result for result in worker_results if isinstance(result, WorkerStats)]
+    for result in worker_results:
+        if not isinstance(result, WorkerStats):
+            print(f"Queue worker failed: {result!r}")
+    print_utilization_report(worker_stats)
+
+    run_report = RunReport()
+    for stats in worker_stats:
+        for (start, end), error in stats.failed_batches:
+            run_report.chunk_errors.append((JobChunk(job=job, chunk_start_frame=start, chunk_end_frame=end), error))
+    rendered = {frame for stats in worker_stats for start, end in stats.batches for frame in range(start, end + 1)}
+    unfinished = [frame for start, end in batches for frame in range(start, end + 1) if frame not in rendered]
+    if not unfinished:
+        return run_report
+
+    # A crashed worker may have written some of its frames before it died.
+    written = set()
+    for start, end in contiguous_ranges(unfinished):
+        written |= chunk_written_frames(JobChunk(job=job, chunk_start_frame=start, chunk_end_frame=end))
+    missing = [frame for frame in unfinished if frame not in written]
+    print(f"Queue workers left {len(unfinished)} frames unfinished, {len(unfinished) - len(missing)} of them are on the Volume")
+    if missing:
+        retry_chunks = [JobChunk(job=job, chunk_start_frame=chunk_start, chunk_end_frame=chunk_end)
+                        for start, end in contiguous_ranges(missing) for chunk_start, chunk_end in chunk_frame_range(start, end, chunk_size=job.queue_batch_size)]
+        print(f"Rendering the {len(missing)} missing frames as {len(retry_chunks)} chunks")
+        retry_report = render_with_retries(retry_chunks, render_sequence.remote, chunk_written_frames, max_in_flight=worker_count, policy=retry_policy_from_config(load_jobs_config()))
+        retry_report.chunk_errors = run_report.chunk_errors + retry_report.chunk_errors
+        run_report = retry_report
+    run_report.recovered_frames += len(unfinished) - len(missing)
+    run_report.print_summary()
+    return run_report
@@ -0,0 +1,96 @@
+import copy
+import statistics
+from typing import Dict, List, Tuple
+from job import Job
+from paths import camera_directory
+from progress import ChunkResult, format_duration
+
+
+def single_camera_jobs(job: Job) -> Dict[str, Job]:
+    """
+    A copy of a multi-camera job per camera, as it would have to be rendered without camera_names: separate chunks,
+    each loading the scene for one camera. Each gets its own job name so frames and telemetry don't collide.
+    """
+    jobs = {}
+    for camera_name in job.camera_names:
+        camera_job = copy.copy(job)
+        camera_job.job_name = f"{job.job_name}_{camera_directory(camera_name)}"
+        camera_job.camera_name = camera_name
+        camera_job.camera_names = [camera_name]
+        jobs[camera_name] = camera_job
+    return jobs
+
+
+def render_seconds_by_camera(record: dict) -> Dict[str, List[float]]:
+    """Render seconds of a telemetry record's renders per camera, in rendering order."""
+    seconds: Dict[str, List[float]] = {}
+    for frame in record["frames"]:
+        seconds.setdefault(frame.get("camera") or record["camera_name"], []).append(frame["finished_at"] - frame["started_at"])
+    return seconds
+
+
+def first_render_overhead(render_seconds: List[float]) -> float:
+    """
+    How much longer the first render of a chunk took than the median of the rest: mostly scene sync (BVH build,
+    image and shader loading) that persistent data keeps for later renders.
+    """
+    if len(render_seconds) < 2:
+        return 0.0
+    return max(0.0, render_seconds[0] - statistics.median(render_seconds[1:]))
+
+
+class CameraSyncComparison:
+    """
+    The same frames rendered as one multi-camera chunk (one scene load and sync, camera switches between renders)
+    and as one chunk per camera, from their ChunkResults and telemetry records.
+    """
+
+    def __init__(self, shared: ChunkResult, shared_record: dict, per_camera: Dict[str, Tuple[ChunkResult, dict]]):
+        self.shared = shared
+        self.shared_record = shared_record
+        self.per_camera = per_camera
+
+    def per_camera_gpu_seconds(self) -> float:
+        return sum(result.gpu_seconds() for result, _ in self.per_camera.values())
+
+    def setup_seconds_saved(self) -> float:
+        """Import, addon checks, .blend load and configuration paid once instead of once per camera."""
+        return sum(result.setup_seconds for result, _ in self.per_camera.values()) - self.shared.setup_seconds
+
+    def render_seconds_saved(self) -> float:
+        """Rendering time the shared chunk saved, ie. the scene syncs it skipped minus what switching cameras cost."""
+        return sum(result.render_seconds for result, _ in self.per_camera.values()) - self.shared.render_seconds
+
+    def scene_sync_seconds(self) -> Dict[str, float]:
+        """First render overhead of every per-camera chunk, each one syncing the whole scene."""
+        return {camera_name: first_render_overhead(render_seconds_by_camera(record).get(camera_name, [])) for camera_name, (_, record) in self.per_camera.items()}
+
+    def camera_switch_seconds(self) -> Dict[str, float]:
+        """
+        Median extra seconds per render of each camera in the shared chunk over its own chunk's later renders,
+        what resyncing after a camera switch costs. The shared chunk's very first render (the full sync) is left out.
+        """
+        shared_seconds = render_seconds_by_camera(dict(self.shared_record, frames=self.shared_record["frames"][1:]))
+        switch_seconds = {}
+        for camera_name, (_, record) in self.per_camera.items():
+            own_seconds = render_seconds_by_camera(record).get(camera_name, [])[1:]
+            if own_seconds and shared_seconds.get(camera_name):
+                switch_seconds[camera_name] = statistics.median(shared_seconds[camera_name]) - statistics.median(own_seconds)
+        return switch_seconds
+
+    def print(self):
+        cameras = len(self.per_camera)
+        shared_sync = first_render_overhead([frame["finished_at"] - frame["started_at"] for frame in self.shared_record["frames"]])
+        print(f"{cameras} cameras, frames {self.shared.start_frame}-{self.shared.end_frame}:")
+        print(f"  Setup (bpy import, addons, .blend load, configure): {format_duration(self.shared.setup_seconds)} shared vs "
+              f"{format_duration(self.shared.setup_seconds + self.setup_seconds_saved())} for per-camera chunks, saved {self.setup_seconds_saved():.1f}s")
+        for camera_name, seconds in self.scene_sync_seconds().items():
+            print(f"  Scene sync of the per-camera chunk for {camera_name}: {seconds:.1f}s")
+        print(f"  Scene sync of the shared chunk, paid once: {shared_sync:.1f}s")
+        for camera_name, seconds in self.camera_switch_seconds().items():
+            print(f"  Camera switch to {camera_name}: {seconds:+.1f}s per render")
+        per_camera_gpu_seconds = self.per_camera_gpu_seconds()
+        saved = per_camera_gpu_seconds - self.shared.gpu_seconds()
+        print(f"  Rendering: saved {self.render_seconds_saved():.1f}s. GPU time: {format_duration(self.shared.gpu_seconds())} shared vs "
+              f"{format_duration(per_camera_gpu_seconds)} per-camera, saved {saved:.1f}s "
+              f"({saved / per_camera_gpu_seconds if per_camera_gpu_seconds else 0:.0%})")
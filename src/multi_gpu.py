@@ -0,0 +1,175 @@
+import multiprocessing
+import multiprocessing.connection
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class DeviceRenderer:
+    """One worker's scene, set up for a single device. Renders one frame per call until closed."""
+
+    def render_frame(self, frame: int):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class DeviceWorkerStats:
+    def __init__(self, device_index: int):
+        self.device_index = device_index
+        self.frames: List[int] = []
+        self.setup_seconds = 0.0
+        self.render_seconds = 0.0
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return (f"DeviceWorkerStats(device_index={self.device_index}, frames={len(self.frames)}, setup_seconds={self.setup_seconds:.1f}, "
+                f"render_seconds={self.render_seconds:.1f}, error={self.error})")
+
+
+class MultiDeviceResult:
+    def __init__(self, workers: List[DeviceWorkerStats], failed_frames: Dict[int, str], requeued_frames: int, wall_seconds: float):
+        self.workers = workers
+        self.failed_frames = failed_frames
+        self.requeued_frames = requeued_frames
+        self.wall_seconds = wall_seconds
+
+    def __repr__(self):
+        return (f"MultiDeviceResult(devices={len(self.workers)}, frames={len(self.rendered_frames())}, failed={len(self.failed_frames)}, "
+                f"requeued={self.requeued_frames}, wall_seconds={self.wall_seconds:.1f})")
+
+    def rendered_frames(self) -> List[int]:
+        return sorted(frame for worker in self.workers for frame in worker.frames)
+
+    def setup_seconds(self) -> float:
+        """Until the slowest worker was ready. Workers set up in parallel, so this is the container's setup cost."""
+        return max((worker.setup_seconds for worker in self.workers), default=0.0)
+
+
+def device_worker(device_index: int, setup: Callable[[int], DeviceRenderer], connection):
+    """
+    Worker loop, in its own process (one Blender per GPU) or a thread in local tests.
+
+    Renders the frames the parent sends it on `connection`, one at a time, until it gets None, and reports
+    every step back on it.
+    """
+    try:
+        started_at = time.monotonic()
+        renderer = setup(device_index)
+        connection.send(("ready", time.monotonic() - started_at))
+    except BaseException:
+        connection.send(("setup_failed", traceback.format_exc()))
+        return
+    try:
+        while (frame := connection.recv()) is not None:
+            started_at = time.monotonic()
+            renderer.render_frame(frame)
+            connection.send(("rendered", frame, time.monotonic() - started_at))
+        renderer.close()
+        connection.send(("exited",))
+    except BaseException:
+        # A device that failed a frame isn't trusted with more, the frame goes back to the others.
+        connection.send(("failed", traceback.format_exc()))
+
+
+def render_frames_on_devices(
+        frames: List[int],
+        device_count: int,
+        setup: Callable[[int], DeviceRenderer],
+        processes: bool = True,
+        max_attempts: int = 2,
+        poll_seconds: float = 1.0
+) -> MultiDeviceResult:
+    """
+    Renders `frames` with one worker per device, each handed the next frame as soon as it finishes one.
+
+    Faster devices simply take more frames. A frame whose worker failed or died is handed to the others
+    again, up to `max_attempts` times per frame, and is reported in `failed_frames` after that or when no
+    worker is left. `setup` must be picklable (eg. a module level function or a functools.partial of one)
+    when running worker processes.
+    """
+    started_at = time.monotonic()
+    context = multiprocessing.get_context("spawn")  # Blender isn't fork-safe
+    # A pipe per worker rather than shared queues: a crashed process can't take a lock the others need with
+    # it, the parent always knows which frame each worker holds and reads EOF when one dies without a word.
+    pipes = [context.Pipe() for _ in range(device_count)]
+    connections = [parent for parent, _ in pipes]
+    workers = [
+        (context.Process if processes else threading.Thread)(target=device_worker, args=(device_index, setup, child), daemon=True)
+        for device_index, (_, child) in enumerate(pipes)
+    ]
+    stats = [DeviceWorkerStats(device_index) for device_index in range(device_count)]
+    for worker in workers:
+        worker.start()
+    if processes:
+        for _, child in pipes:
+            child.close()
+
+    pending = deque(frames)
+    outstanding = set(frames)
+    attempts = {frame: 0 for frame in frames}
+    failed_frames: Dict[int, str] = {}
+    current: Dict[int, int] = {}  # device index -> frame being rendered
+    running = set(range(device_count))
+    requeued = 0
+
+    def dispatch(device_index: int):
+        if pending:
+            current[device_index] = pending.popleft()
+            connections[device_index].send(current[device_index])
+
+    def lose_device(device_index: int, error: str):
+        nonlocal requeued
+        running.discard(device_index)
+        stats[device_index].error = error.strip().splitlines()[-1] if error.strip() else error
+        print(f"Device {device_index} stopped: {error}")
+        frame = current.pop(device_index, None)
+        if frame is None:
+            return
+        attempts[frame] += 1
+        if attempts[frame] < max_attempts and running:
+            pending.appendleft(frame)
+            requeued += 1
+            for idle in running - current.keys():
+                dispatch(idle)
+        else:
+            outstanding.discard(frame)
+            failed_frames[frame] = stats[device_index].error
+
+    while outstanding and running:
+        ready = multiprocessing.connection.wait([connections[device_index] for device_index in running], timeout=poll_seconds)
+        for connection in ready:
+            device_index = connections.index(connection)
+            try:
+                event = connection.recv()
+            except (EOFError, OSError):
+                workers[device_index].join(poll_seconds)
+                lose_device(device_index, f"worker exited with code {getattr(workers[device_index], 'exitcode', None)}")
+                continue
+            kind = event[0]
+            if kind == "ready":
+                stats[device_index].setup_seconds = event[1]
+                dispatch(device_index)
+            elif kind == "rendered":
+                frame, seconds = event[1], event[2]
+                current.pop(device_index, None)
+                stats[device_index].frames.append(frame)
+                stats[device_index].render_seconds += seconds
+                outstanding.discard(frame)
+                dispatch(device_index)
+            elif kind in ("setup_failed", "failed"):
+                lose_device(device_index, event[-1])
+
+    for frame in outstanding - failed_frames.keys():
+        failed_frames[frame] = "no device left to render it"
+    for device_index in running:
+        connections[device_index].send(None)
+    # Let the remaining workers close their renderers (eg. write their telemetry) before returning.
+    for worker in workers:
+        worker.join()
+    for connection in connections:
+        connection.close()
+    return MultiDeviceResult(stats, failed_frames, requeued, time.monotonic() - started_at)
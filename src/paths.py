@@ -1,6 +1,9 @@
+import re
 from pathlib import Path
 
 VOLUME_MOUNT_PATH = Path("/jobs")
+# Container-local disk that write-behind jobs render to before frames are copied onto the Volume.
+LOCAL_SCRATCH_PATH = Path("/tmp/render_scratch")
 
 def validate_blender_path(path: Path):
     assert path.exists()
@@ -10,15 +13,70 @@ def validate_blender_path(path: Path):
 def blender_proj_remote_volume_upload_path(session_id: str) -> Path:
     return Path(f"{session_id}/project.blend")
 
+def session_manifest_volume_path(session_id: str) -> Path:
+    return Path(f"{session_id}/session.json")
+
+# Content-addressed .blend uploads shared between sessions.
+BLOBS_DIRECTORY = "blobs"
+
+def blend_blob_volume_path(content_hash: str) -> Path:
+    return Path(f"{BLOBS_DIRECTORY}/{content_hash}.blend")
+
+def blend_blob_manifest_volume_path(content_hash: str) -> Path:
+    return Path(f"{BLOBS_DIRECTORY}/{content_hash}.json")
+
+def blend_blob_remote_path(content_hash: str, validate: bool) -> Path:
+    path = VOLUME_MOUNT_PATH / blend_blob_volume_path(content_hash)
+    if validate:
+        validate_blender_path(path)
+    return path
+
+# Rendered frames shared between sessions, keyed by a hash of everything that affects the pixels (see frame_cache.py).
+FRAME_CACHE_DIRECTORY = "frame_cache"
+
+def frame_cache_index_volume_path() -> Path:
+    return Path(f"{FRAME_CACHE_DIRECTORY}/index.json")
+
+def frame_cache_object_volume_path(cache_key: str) -> Path:
+    return Path(f"{FRAME_CACHE_DIRECTORY}/{cache_key[:2]}/{cache_key}.exr")
+
+# Simulation caches baked once per .blend content and Blender build, shared between sessions (see sim_cache.py).
+SIM_CACHE_DIRECTORY = "sim_cache"
+
+def sim_cache_volume_path(bake_key: str) -> Path:
+    return Path(f"{SIM_CACHE_DIRECTORY}/{bake_key}")
+
+def sim_cache_manifest_volume_path(bake_key: str) -> Path:
+    return Path(f"{SIM_CACHE_DIRECTORY}/{bake_key}.json")
+
+def sim_cache_remote_path(bake_key: str) -> Path:
+    return VOLUME_MOUNT_PATH / sim_cache_volume_path(bake_key)
+
 def remote_job_path(session_id: str) -> Path:
     return VOLUME_MOUNT_PATH / session_id
 
 def remote_job_frames_directory_path(session_id: str) -> Path:
     return VOLUME_MOUNT_PATH / session_id / "frames"
 
+def camera_directory(camera_name: str) -> str:
+    """Per-camera subdirectory of a multi-camera job's frames, eg. "Camera.Fun"."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", camera_name).strip(".") or "camera"
+
+def remote_job_noisy_frames_directory_path(session_id: str) -> Path:
+    return VOLUME_MOUNT_PATH / session_id / "noisy"
+
 def remote_job_frames_absolute_volume_directory_path(session_id: str) -> Path:
     return Path("/") / session_id / "frames"
 
+def local_scratch_frames_directory_path(session_id: str) -> Path:
+    return LOCAL_SCRATCH_PATH / session_id / "frames"
+
+def remote_job_telemetry_directory_path(session_id: str) -> Path:
+    return VOLUME_MOUNT_PATH / session_id / "telemetry"
+
+def remote_job_telemetry_absolute_volume_directory_path(session_id: str) -> Path:
+    return Path("/") / session_id / "telemetry"
+
 def blender_proj_remote_path(session_id: str, validate: bool) -> Path:
     path = remote_job_path(session_id) / "project.blend"
     if validate:
@@ -0,0 +1,111 @@
+import configparser
+from typing import List, Optional, Tuple
+from chunking import chunk_frame_range
+from progress import format_duration
+from simulator import SimulationConfig, simulate_chunks
+from startup import load_startup_history
+
+
+class RenderPlan:
+    """One (concurrency, chunk size) choice for a static render, with its simulated wall clock and billed GPU time."""
+
+    def __init__(self, concurrency: int, chunk_size: int, chunk_count: int, makespan: float, gpu_seconds: float):
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.chunk_count = chunk_count
+        self.makespan = makespan
+        self.gpu_seconds = gpu_seconds
+
+    def __repr__(self):
+        return (f"RenderPlan(concurrency={self.concurrency}, chunk_size={self.chunk_size}, chunks={self.chunk_count}, "
+                f"wall_clock={format_duration(self.makespan)}, gpu_hours={self.gpu_seconds / 3600:.2f})")
+
+
+def candidate_chunk_sizes(frame_count: int, min_chunk_size: int, max_chunk_size: int) -> List[int]:
+    """Chunk sizes that give distinct chunk counts, within the job's chunk size limits."""
+    max_chunk_size = max(1, min(max_chunk_size, frame_count))
+    min_chunk_size = max(1, min(min_chunk_size, max_chunk_size))
+    sizes = {-(-frame_count // chunk_count) for chunk_count in range(1, frame_count + 1)}
+    return sorted(size for size in sizes if min_chunk_size <= size <= max_chunk_size) or [max_chunk_size]
+
+
+def candidate_plans(
+        frame_ranges: List[Tuple[int, int]],
+        start_frame: int,
+        frame_costs: List[float],
+        config: SimulationConfig,
+        min_chunk_size: int = 1,
+        max_chunk_size: Optional[int] = None
+) -> List[RenderPlan]:
+    """
+    Simulates every concurrency up to `config.max_containers` against every chunk size, see simulate_chunks.
+
+    `frame_costs` are seconds per frame, frame_costs[0] belonging to `start_frame`.
+    """
+    frame_count = sum(end - start + 1 for start, end in frame_ranges)
+    plans = []
+    for chunk_size in candidate_chunk_sizes(frame_count, min_chunk_size, max_chunk_size or frame_count):
+        chunks = [chunk for start, end in frame_ranges for chunk in chunk_frame_range(start, end, chunk_size)]
+        for concurrency in range(1, min(config.max_containers, len(chunks)) + 1):
+            capped = SimulationConfig(config.cold_start_seconds, config.scene_load_seconds, concurrency, config.scaledown_seconds)
+            result = simulate_chunks(chunks, start_frame, frame_costs, capped)
+            plans.append(RenderPlan(concurrency, chunk_size, len(chunks), result.makespan, result.gpu_seconds))
+    return plans
+
+
+def pareto_front(plans: List[RenderPlan]) -> List[RenderPlan]:
+    """Plans no other plan beats on both wall clock and GPU time, fastest first."""
+    front = []
+    for plan in sorted(plans, key=lambda plan: (plan.makespan, plan.gpu_seconds)):
+        if not front or plan.gpu_seconds < front[-1].gpu_seconds:
+            front.append(plan)
+    return front
+
+
+def choose_plan(front: List[RenderPlan], deadline_seconds: Optional[float] = None, gpu_seconds_budget: Optional[float] = None) -> RenderPlan:
+    """
+    The cheapest plan finishing within the deadline, or the fastest one within the GPU budget.
+
+    When nothing meets the goal, the closest plan (fastest, or cheapest) is returned with a warning.
+    """
+    if deadline_seconds is not None:
+        meeting = [plan for plan in front if plan.makespan <= deadline_seconds]
+        if meeting:
+            return min(meeting, key=lambda plan: plan.gpu_seconds)
+        print(f"WARNING: No plan finishes within {format_duration(deadline_seconds)}, using the fastest one")
+        return min(front, key=lambda plan: plan.makespan)
+    if gpu_seconds_budget is not None:
+        meeting = [plan for plan in front if plan.gpu_seconds <= gpu_seconds_budget]
+        if meeting:
+            return min(meeting, key=lambda plan: plan.makespan)
+        print(f"WARNING: No plan stays within {gpu_seconds_budget / 3600:.2f} GPU hours, using the cheapest one")
+        return min(front, key=lambda plan: plan.gpu_seconds)
+    raise ValueError("A plan needs a deadline or a GPU budget to choose by")
+
+
+def print_plans(front: List[RenderPlan], chosen: RenderPlan, rows: int = 20):
+    """Prints up to `rows` plans spread along the front, always including both ends and the chosen one."""
+    shown = front if len(front) <= rows else [front[round(i * (len(front) - 1) / (rows - 1))] for i in range(rows)]
+    if chosen not in shown:
+        shown = sorted(shown + [chosen], key=lambda plan: plan.makespan)
+    print(f"Pareto front of {len(front)} plans (wall clock vs billed GPU time){', sampled' if len(shown) < len(front) else ''}:")
+    for plan in shown:
+        print(f"  {'*' if plan is chosen else ' '} concurrency {plan.concurrency:>3}, chunks of {plan.chunk_size:>3} ({plan.chunk_count:>3}): "
+              f"{format_duration(plan.makespan):>10}, {plan.gpu_seconds / 3600:7.2f} GPU hours")
+    print(f"Chosen plan: {chosen}")
+
+
+def planner_config_from_config(config: configparser.ConfigParser, max_containers: int) -> SimulationConfig:
+    """
+    Fleet timings for planning: [RUN].PLANNER_SCENE_LOAD_SECONDS and the cold start median last recorded by
+    `modal run src/main.py::startup`, falling back to [RUN].PLANNER_COLD_START_SECONDS before it has run.
+    """
+    cold_start_seconds = config.getfloat("RUN", "PLANNER_COLD_START_SECONDS", fallback=60)
+    history = load_startup_history()
+    if history and "cold" in history[-1]["summary"]:
+        cold_start_seconds = history[-1]["summary"]["cold"]["total"]
+    return SimulationConfig(
+        cold_start_seconds=cold_start_seconds,
+        scene_load_seconds=config.getfloat("RUN", "PLANNER_SCENE_LOAD_SECONDS", fallback=45),
+        max_containers=max_containers
+    )
@@ -0,0 +1,290 @@
+import os
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+from frame_verify import check_exr, find_frames
+from regions import read_tile
+
+# Linear ACEScg (AP1, D60) to linear Rec.709/sRGB primaries (D65, Bradford adapted).
+ACESCG_TO_LINEAR_SRGB = (
+    (1.70505, -0.62179, -0.08326),
+    (-0.13026, 1.14080, -0.01055),
+    (-0.02400, -0.12897, 1.15297),
+)
+
+# How frames missing from the range are filled: "repeat" holds the previous frame, "blend" crossfades between
+# the rendered frames on either side, eg. for a fill-in preview of a progressive render.
+FillMode = Literal["repeat", "blend"]
+
+
+# Color conversion. NumPy is only needed locally, so it's imported lazily like in regions.py.
+
+def tonemap_acescg_to_srgb(pixels, exposure: float = 0.0):
+    """
+    (height, width, 3+) linear ACEScg float array -> (height, width, 3) sRGB uint8.
+
+    Applies the exposure in stops, the ACES filmic curve fit by Narkowicz and the sRGB transfer function.
+    Good enough for review previews, not a substitute for a proper OCIO view transform.
+    """
+    import numpy as np
+
+    rgb = np.asarray(pixels[:, :, :3], dtype=np.float32) @ np.asarray(ACESCG_TO_LINEAR_SRGB, dtype=np.float32).T
+    rgb *= np.float32(2.0 ** exposure)
+    # The curve saturates long before half float's max, clamping keeps fireflies and NaNs from overflowing it.
+    np.nan_to_num(rgb, copy=False, nan=0.0, posinf=65504.0)
+    np.clip(rgb, 0.0, 65504.0, out=rgb)
+    rgb = (rgb * (2.51 * rgb + 0.03)) / (rgb * (2.43 * rgb + 0.59) + 0.14)
+    np.clip(rgb, 0.0, 1.0, out=rgb)
+    srgb = np.where(rgb <= 0.0031308, 12.92 * rgb, 1.055 * np.power(rgb, 1 / 2.4) - 0.055)
+    return (srgb * 255.0 + 0.5).astype(np.uint8)
+
+
+def downscale(rgb, factor: int):
+    """Box filter by an integer factor, cropping rows/columns that don't fill a whole box."""
+    import numpy as np
+
+    if factor <= 1:
+        return rgb
+    height, width = rgb.shape[0] // factor * factor, rgb.shape[1] // factor * factor
+    boxes = rgb[:height, :width].reshape(height // factor, factor, width // factor, factor, rgb.shape[2])
+    return boxes.mean(axis=(1, 3), dtype=np.float32).round().astype(np.uint8)
+
+
+def blend_frames(before: bytes, after: bytes, width: int, height: int, t: float):
+    """Crossfades two rgb24 frames, `t` being the position between them (0 = before, 1 = after)."""
+    import numpy as np
+
+    before = np.frombuffer(before, dtype=np.uint8).reshape(height, width, 3).astype(np.float32)
+    after = np.frombuffer(after, dtype=np.uint8).reshape(height, width, 3).astype(np.float32)
+    return (before + (after - before) * np.float32(t) + 0.5).astype(np.uint8)
+
+
+def write_png(path: Path, rgb, compress_level: int = 1):
+    """Writes a (height, width, 3) uint8 array as an 8-bit RGB PNG, renamed into place once complete."""
+    import numpy as np
+
+    height, width, _ = rgb.shape
+    # Every scanline is prefixed with filter type 0 (none).
+    scanlines = np.empty((height, 1 + width * 3), dtype=np.uint8)
+    scanlines[:, 0] = 0
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compress_level)))
+        f.write(chunk(b"IEND", b""))
+    os.replace(temporary, path)
+
+
+class PreviewSettings:
+    def __init__(self, previews_dir: Optional[Path], exposure: float = 0.0, scale: int = 1, png_compress_level: int = 1):
+        self.previews_dir = Path(previews_dir) if previews_dir is not None else None
+        self.exposure = exposure
+        self.scale = max(1, scale)
+        self.png_compress_level = png_compress_level
+
+    def __repr__(self):
+        return f"PreviewSettings(previews_dir={self.previews_dir}, exposure={self.exposure}, scale={self.scale}, png_compress_level={self.png_compress_level})"
+
+
+def process_frame(path: Path, preview_path: Optional[Path], settings: PreviewSettings) -> Tuple[int, int, bytes]:
+    """Runs in a pool process: EXR -> tonemapped preview PNG, returning (width, height, rgb24 bytes) for the encoder."""
+    problem = check_exr(path)
+    if problem is not None:
+        raise ValueError(f"{path.name} is {problem}")
+    rgb = downscale(tonemap_acescg_to_srgb(read_tile(path), settings.exposure), settings.scale)
+    if preview_path is not None:
+        write_png(preview_path, rgb, settings.png_compress_level)
+    return rgb.shape[1], rgb.shape[0], rgb.tobytes()
+
+
+class FfmpegEncoder:
+    """Pipes raw rgb24 frames, in order, into an ffmpeg process writing H.264."""
+
+    def __init__(self, output_path: Path, fps: float, crf: int = 18, ffmpeg: str = "ffmpeg"):
+        if shutil.which(ffmpeg) is None:
+            raise RuntimeError(f"{ffmpeg} not found on PATH, install it or skip the video")
+        self.output_path = Path(output_path)
+        self.fps = fps
+        self.crf = crf
+        self.ffmpeg = ffmpeg
+        self.process: Optional[subprocess.Popen] = None
+
+    def write(self, width: int, height: int, data: bytes):
+        if self.process is None:
+            self.process = subprocess.Popen([
+                self.ffmpeg, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                # yuv420p needs even dimensions.
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-crf", str(self.crf), "-pix_fmt", "yuv420p",
+                str(self.output_path)
+            ], stdin=subprocess.PIPE)
+        self.process.stdin.write(data)
+
+    def close(self):
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with {self.process.returncode} writing {self.output_path}")
+
+
+class PostProcessStats:
+    def __init__(self):
+        self.frames = 0
+        self.encoded_frames = 0
+        self.missing: List[int] = []  # Never arrived or broken, filled with the previous frame in the video
+        self.interpolated: List[int] = []  # Never arrived or broken, blended from their rendered neighbours
+        self.failed: Dict[int, str] = {}
+        self.seconds = 0.0
+        self.encode_seconds = 0.0
+        self.peak_buffered_frames = 0
+
+    def __repr__(self):
+        return (f"PostProcessStats(frames={self.frames}, encoded_frames={self.encoded_frames}, fps={self.frames_per_second():.2f}, "
+                f"seconds={self.seconds:.1f}, encode_seconds={self.encode_seconds:.1f}, peak_buffered_frames={self.peak_buffered_frames}, "
+                f"missing={len(self.missing)}, interpolated={len(self.interpolated)}, failed={len(self.failed)})")
+
+    def frames_per_second(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+class PostProcessPipeline:
+    """
+    Turns a job's EXR frames into previews and a video while they are still arriving.
+
+    Frames are converted across a process pool. Results go through a reorder buffer into `encoder` as
+    soon as they extend the contiguous prefix of frames already encoded. At most `max_buffered` frames
+    (plus the first one the encoder can use next) are converting or waiting for their turn, so memory stays
+    bounded however out of order the frames arrive.
+    """
+
+    def __init__(
+            self,
+            frames_dir: Path,
+            job_name: str,
+            start_frame: int,
+            end_frame: int,
+            settings: PreviewSettings,
+            encoder=None,
+            workers: int = os.cpu_count() or 4,
+            max_buffered: Optional[int] = None,
+            fill: FillMode = "repeat",
+            process_fn: Callable[[Path, Optional[Path], PreviewSettings], Tuple[int, int, bytes]] = process_frame
+    ):
+        self.frames_dir = Path(frames_dir)
+        self.job_name = job_name
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.settings = settings
+        self.encoder = encoder
+        self.workers = max(1, workers)
+        self.max_buffered = max_buffered or 2 * self.workers
+        self.fill = fill
+        self.process_fn = process_fn
+        self.stats = PostProcessStats()
+
+    def preview_path(self, frame: int) -> Optional[Path]:
+        if self.settings.previews_dir is None:
+            return None
+        return self.settings.previews_dir / f"{self.job_name}_{frame:04d}.png"
+
+    def run(self, stop_event: Optional[threading.Event] = None, poll_seconds: float = 5) -> PostProcessStats:
+        """
+        Processes every frame of the range, waiting for new ones until they all exist or `stop_event` is set.
+
+        Without a `stop_event`, only the frames already in `frames_dir` are processed. Frames that never
+        arrived, or failed to convert, are then filled in the video (and, when blending, the previews) according to `fill`.
+        """
+        started_at = time.monotonic()
+        if self.settings.previews_dir is not None:
+            self.settings.previews_dir.mkdir(parents=True, exist_ok=True)
+        next_frame = self.start_frame
+        submitted = set()
+        pending: Dict[Future, int] = {}
+        buffered: Dict[int, Tuple[int, int, bytes]] = {}
+        last_encoded: Optional[Tuple[int, Tuple[int, int, bytes]]] = None  # (frame, converted)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while next_frame <= self.end_frame:
+                finished = stop_event is None or stop_event.is_set()
+                available = {frame: path for frame, path in (find_frames(self.frames_dir, self.job_name) if self.frames_dir.is_dir() else {}).items()
+                             if next_frame <= frame <= self.end_frame and frame not in self.stats.failed}
+                for i, frame in enumerate(sorted(available)):
+                    # The first frame the encoder can use next is always let through, or a full buffer could wait on it forever.
+                    if i and len(pending) + len(buffered) >= self.max_buffered:
+                        break
+                    if frame not in submitted:
+                        pending[executor.submit(self.process_fn, available[frame], self.preview_path(frame), self.settings)] = frame
+                        submitted.add(frame)
+                self.stats.peak_buffered_frames = max(self.stats.peak_buffered_frames, len(pending) + len(buffered))
+
+                if pending:
+                    done, _ = wait(pending, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        frame = pending.pop(future)
+                        try:
+                            buffered[frame] = future.result()
+                            self.stats.frames += 1
+                        except Exception as e:
+                            self.stats.failed[frame] = str(e)
+                            print(f"Frame {frame} failed: {e}")
+
+                while next_frame <= self.end_frame:
+                    if next_frame in buffered:
+                        last_encoded = (next_frame, buffered.pop(next_frame))
+                        self._encode(last_encoded[1])
+                        next_frame += 1
+                        continue
+                    if next_frame not in self.stats.failed and (not finished or next_frame in available):
+                        break  # Still on its way
+                    # Broken, or never arrived and won't anymore.
+                    following = min((frame for frame in available if frame > next_frame and frame not in self.stats.failed), default=None)
+                    if self.fill == "blend" and last_encoded is not None and following is not None:
+                        if following not in buffered:
+                            break
+                        for frame in range(next_frame, following):
+                            self._fill_blended(executor, frame, last_encoded, (following, buffered[following]))
+                        next_frame = following
+                    else:
+                        self.stats.missing.append(next_frame)
+                        if last_encoded is not None:
+                            self._encode(last_encoded[1])
+                        next_frame += 1
+
+                if not pending and not finished and next_frame <= self.end_frame and next_frame not in available:
+                    stop_event.wait(poll_seconds)
+
+        if self.encoder is not None:
+            encode_started_at = time.monotonic()
+            self.encoder.close()
+            self.stats.encode_seconds += time.monotonic() - encode_started_at
+        self.stats.seconds = time.monotonic() - started_at
+        return self.stats
+
+    def _fill_blended(self, executor: ProcessPoolExecutor, frame: int, before: Tuple[int, Tuple[int, int, bytes]], after: Tuple[int, Tuple[int, int, bytes]]):
+        (before_frame, (width, height, before_data)), (after_frame, (_, _, after_data)) = before, after
+        rgb = blend_frames(before_data, after_data, width, height, (frame - before_frame) / (after_frame - before_frame))
+        self.stats.interpolated.append(frame)
+        self._encode((width, height, rgb.tobytes()))
+        if self.settings.previews_dir is not None:
+            executor.submit(write_png, self.preview_path(frame), rgb, self.settings.png_compress_level)
+
+    def _encode(self, converted: Tuple[int, int, bytes]):
+        if self.encoder is None:
+            return
+        started_at = time.monotonic()
+        self.encoder.write(*converted)
+        self.stats.encoded_frames += 1
+        self.stats.encode_seconds += time.monotonic() - started_at
@@ -0,0 +1,114 @@
+import time
+from typing import Callable, List, Optional
+
+
+class ChunkResult:
+    """Structured outcome of one render_sequence call, replacing the free-form status string."""
+
+    def __init__(
+            self,
+            job_name: str,
+            camera_name: str,
+            start_frame: int,
+            end_frame: int,
+            setup_seconds: float,
+            render_seconds: float,
+            output_path: str,
+            scene_reused: bool = False,
+            gpu_count: int = 1
+    ):
+        self.job_name = job_name
+        self.camera_name = camera_name
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.setup_seconds = setup_seconds
+        self.render_seconds = render_seconds
+        self.output_path = output_path
+        self.scene_reused = scene_reused  # Rendered by a warm container without reloading the scene
+        self.gpu_count = gpu_count  # GPUs of the container, all billed for the chunk's wall time
+
+    def __repr__(self):
+        return (f"ChunkResult(job_name={self.job_name}, camera_name={self.camera_name}, "
+                f"frames={self.start_frame}-{self.end_frame}, setup_seconds={self.setup_seconds:.1f}, "
+                f"render_seconds={self.render_seconds:.1f}, output_path={self.output_path}, scene_reused={self.scene_reused}, gpu_count={self.gpu_count})")
+
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame + 1
+
+    def gpu_seconds(self) -> float:
+        """Container time attributable to this chunk (times its GPUs), setup included since it's billed too."""
+        return (self.setup_seconds + self.render_seconds) * self.gpu_count
+
+    def seconds_per_frame(self) -> float:
+        return self.render_seconds / self.frame_count()
+
+
+class RenderProgress:
+    """
+    Running totals over completed chunks: frames done/remaining, throughput and ETA.
+
+    It is fed ChunkResults in completion order and holds no Modal state,
+    so it can be driven by synthetic results in tests.
+    """
+
+    def __init__(self, total_frames: int, concurrency: int, clock: Callable[[], float] = time.monotonic):
+        self.total_frames = total_frames
+        self.concurrency = max(1, concurrency)
+        self.clock = clock
+        self.started_at = clock()
+        self.results: List[ChunkResult] = []
+        self.frames_done = 0
+        self.render_seconds = 0.0
+        self.gpu_seconds = 0.0
+
+    def record(self, result: ChunkResult):
+        self.results.append(result)
+        self.frames_done += result.frame_count()
+        self.render_seconds += result.render_seconds
+        self.gpu_seconds += result.gpu_seconds()
+
+    def frames_remaining(self) -> int:
+        return max(0, self.total_frames - self.frames_done)
+
+    def elapsed_seconds(self) -> float:
+        return self.clock() - self.started_at
+
+    def frames_per_gpu_minute(self) -> float:
+        return self.frames_done / (self.gpu_seconds / 60) if self.gpu_seconds > 0 else 0.0
+
+    def mean_seconds_per_frame(self) -> Optional[float]:
+        return self.render_seconds / self.frames_done if self.frames_done else None
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining frames at the observed per-frame cost, spread over the concurrency target."""
+        seconds_per_frame = self.mean_seconds_per_frame()
+        if seconds_per_frame is None:
+            return None
+        return self.frames_remaining() * seconds_per_frame / self.concurrency
+
+    def status_line(self) -> str:
+        eta_seconds = self.eta_seconds()
+        eta = format_duration(eta_seconds) if eta_seconds is not None else "?"
+        percent = self.frames_done / self.total_frames if self.total_frames else 1.0
+        return (f"[{self.frames_done}/{self.total_frames} frames, {percent:.0%}] "
+                f"{self.frames_remaining()} remaining, {self.frames_per_gpu_minute():.2f} frames/GPU-min, "
+                f"elapsed {format_duration(self.elapsed_seconds())}, ETA {eta}")
+
+
+def setup_seconds_saved(results: List[ChunkResult]) -> float:
+    """
+    Estimated setup time saved by warm containers: each reused-scene chunk is credited with the
+    mean setup time of the chunks that had to load the scene, minus what it actually spent.
+    """
+    cold = [result.setup_seconds for result in results if not result.scene_reused]
+    warm = [result.setup_seconds for result in results if result.scene_reused]
+    if not cold or not warm:
+        return 0.0
+    return len(warm) * (sum(cold) / len(cold)) - sum(warm)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
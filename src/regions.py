@@ -0,0 +1,166 @@
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+class Region:
+    """
+    A rectangle of the output frame in pixels, top-down image coordinates with exclusive ends.
+    """
+
+    def __init__(self, index: int, x0: int, x1: int, y0: int, y1: int):
+        self.index = index
+        self.x0 = x0
+        self.x1 = x1
+        self.y0 = y0
+        self.y1 = y1
+
+    def __repr__(self):
+        return f"Region(index={self.index}, x={self.x0}:{self.x1}, y={self.y0}:{self.y1})"
+
+    def width(self) -> int:
+        return self.x1 - self.x0
+
+    def height(self) -> int:
+        return self.y1 - self.y0
+
+    def blender_border(self, width: int, height: int) -> Tuple[float, float, float, float]:
+        """
+        (border_min_x, border_max_x, border_min_y, border_max_y) for this region.
+
+        Blender measures y from the bottom and truncates border * resolution to whole pixels,
+        so each edge is placed half a pixel past the intended boundary to land on it exactly.
+        """
+        return (
+            (self.x0 + 0.5) / width,
+            (self.x1 + 0.5) / width if self.x1 < width else 1.0,
+            (height - self.y1 + 0.5) / height if self.y1 < height else 0.0,
+            (height - self.y0 + 0.5) / height if self.y0 > 0 else 1.0,
+        )
+
+
+def frame_regions(width: int, height: int, columns: int, rows: int) -> List[Region]:
+    """Splits a width x height frame into a columns x rows grid, row-major from the top left."""
+    if columns < 1 or rows < 1 or columns > width or rows > height:
+        raise ValueError(f"Invalid region grid {columns}x{rows} for {width}x{height}")
+    xs = [round(i * width / columns) for i in range(columns + 1)]
+    ys = [round(i * height / rows) for i in range(rows + 1)]
+    return [
+        Region(index=row * columns + column, x0=xs[column], x1=xs[column + 1], y0=ys[row], y1=ys[row + 1])
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def region_file_prefix(job_name: str, region_index: int) -> str:
+    return f"{job_name}_r{region_index:02d}_"
+
+
+def find_region_tiles(directory: Path, job_name: str) -> Dict[int, Dict[int, Path]]:
+    """Maps frame -> region index -> tile path for `{job_name}_rNN_FFFF.exr` (or `.npy`) files."""
+    pattern = re.compile(rf"^{re.escape(job_name)}_r(\d+)_(\d+)\.(exr|npy)$")
+    tiles: Dict[int, Dict[int, Path]] = {}
+    for path in Path(directory).iterdir():
+        match = pattern.match(path.name)
+        if match:
+            tiles.setdefault(int(match.group(2)), {})[int(match.group(1))] = path
+    return tiles
+
+
+# Stitching. NumPy (and OpenEXR for .exr tiles/output) are only needed locally, so they're imported lazily.
+
+def read_tile(path: Path):
+    """Returns a (height, width, channels) float32 array, memory-mapped for raw .npy tiles."""
+    import numpy as np
+
+    if path.suffix == ".npy":
+        return np.load(path, mmap_mode="r")
+
+    import OpenEXR
+    import Imath
+    exr = OpenEXR.InputFile(str(path))
+    data_window = exr.header()["dataWindow"]
+    width = data_window.max.x - data_window.min.x + 1
+    height = data_window.max.y - data_window.min.y + 1
+    channel_names = tile_channel_names(exr.header()["channels"])
+    if not channel_names:
+        exr.close()
+        raise ValueError(f"{path.name} has neither R, G, B channels nor a Combined pass: {sorted(exr.header()['channels'])}")
+    tile = np.empty((height, width, len(channel_names)), dtype=np.float32)
+    float_type = Imath.PixelType(Imath.PixelType.FLOAT)
+    for i, name in enumerate(channel_names):  # One channel in memory at a time
+        tile[:, :, i] = np.frombuffer(exr.channel(name, float_type), dtype=np.float32).reshape(height, width)
+    exr.close()
+    return tile
+
+
+def tile_channel_names(channels: dict) -> list:
+    """
+    The beauty's channels, in RGBA order: the bare R, G, B (A) of single layer EXRs, or the Combined pass of
+    multilayer ones (exr_multilayer), eg. "ViewLayer.Combined.R". Empty if there's neither.
+    """
+    from denoise import COMBINED_PASS, pass_channels
+    names = pass_channels(channels, COMBINED_PASS, "RGB")
+    if names is None:
+        return []
+    return names + (pass_channels(channels, COMBINED_PASS, "A") or [])
+
+
+def stitch_frame(
+        tiles: Dict[int, Path],
+        regions: List[Region],
+        output_path: Path,
+        width: int,
+        height: int,
+        read: Callable[[Path], object] = read_tile
+):
+    """
+    Assembles region tiles into a memory-mapped (height, width, channels) float32 .npy frame.
+
+    Tiles are read and copied one at a time, so peak memory is one tile rather than the whole set.
+    """
+    import numpy as np
+
+    missing = [region.index for region in regions if region.index not in tiles]
+    if missing:
+        raise ValueError(f"Missing region tiles {missing} for {output_path.name}")
+
+    output = None
+    for region in regions:
+        tile = read(tiles[region.index])
+        if tile.shape[0] != region.height() or tile.shape[1] != region.width():
+            raise ValueError(f"Tile {tiles[region.index]} is {tile.shape[1]}x{tile.shape[0]}, expected {region.width()}x{region.height()} for {region}")
+        if output is None:
+            output = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float32, shape=(height, width, tile.shape[2]))
+        output[region.y0:region.y1, region.x0:region.x1, :] = tile
+        del tile
+    output.flush()
+    return output
+
+
+def write_exr(frame, path: Path, codec: str = "ZIP", color_depth: str = "32", dwa_quality: int = 45, rows_per_block: int = 64):
+    """
+    Writes a (height, width, channels) float32 array as an EXR with a job's exr_codec, exr_color_depth and
+    exr_dwa_quality, `rows_per_block` scanlines at a time so only that much of a memory-mapped frame is converted at once.
+    """
+    import numpy as np
+    import OpenEXR
+    import Imath
+
+    height, width, channel_count = frame.shape
+    channel_names = ["R", "G", "B", "A"][:channel_count]
+    half = color_depth == "16"
+    header = OpenEXR.Header(width, height)
+    header["channels"] = {name: Imath.Channel(Imath.PixelType(Imath.PixelType.HALF if half else Imath.PixelType.FLOAT)) for name in channel_names}
+    header["compression"] = Imath.Compression(getattr(Imath.Compression, f"{codec}_COMPRESSION" if codec != "NONE" else "NO_COMPRESSION"))
+    if codec in ("DWAA", "DWAB"):
+        header["dwaCompressionLevel"] = float(dwa_quality)
+    exr = OpenEXR.OutputFile(str(path), header)
+    try:
+        for y0 in range(0, height, rows_per_block):
+            block = frame[y0:y0 + rows_per_block]
+            # Each call appends the next block.shape[0] scanlines
+            exr.writePixels({name: np.ascontiguousarray(block[:, :, i], dtype=np.float16 if half else np.float32).tobytes()
+                             for i, name in enumerate(channel_names)}, block.shape[0])
+    finally:
+        exr.close()
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import List, Literal, Optional, Tuple
+from paths import sim_cache_manifest_volume_path
+from storage import RenderStorage
+
+# Bump whenever baking or relinking changes how caches are laid out, invalidating every bake.
+SIM_CACHE_FORMAT_VERSION = 1
+# The scene is saved next to its caches before baking, so point caches land in "//blendcache_bake".
+BAKE_BLEND_NAME = "bake.blend"
+POINT_CACHE_DIRECTORY = "blendcache_bake"
+
+# fluid: Mantaflow domains (fire, smoke, liquid). point_cache: particles, cloth, soft bodies and the rigid body world.
+# geometry_nodes: simulation and bake nodes of a geometry nodes modifier.
+CacheKind = Literal["fluid", "point_cache", "geometry_nodes"]
+
+
+class CacheSlot:
+    """
+    One simulation cache of the scene, identified by names that survive reopening the .blend.
+
+    `file_index` is the point cache index Blender picked while baking, part of the cache file names.
+    """
+
+    def __init__(self, kind: CacheKind, object_name: str, modifier_name: str, file_index: int = -1):
+        self.kind = kind
+        self.object_name = object_name
+        self.modifier_name = modifier_name
+        self.file_index = file_index
+
+    def __repr__(self):
+        return f"CacheSlot(kind={self.kind}, object={self.object_name}, modifier={self.modifier_name})"
+
+    def __eq__(self, other):
+        return isinstance(other, CacheSlot) and self.identity() == other.identity()
+
+    def __hash__(self):
+        return hash(self.identity())
+
+    def identity(self) -> tuple:
+        return self.kind, self.object_name, self.modifier_name
+
+    def as_dict(self) -> dict:
+        return {"kind": self.kind, "object": self.object_name, "modifier": self.modifier_name, "file_index": self.file_index}
+
+    @staticmethod
+    def from_dict(data: dict) -> "CacheSlot":
+        return CacheSlot(data["kind"], data["object"], data["modifier"], data["file_index"])
+
+    def cache_name(self) -> str:
+        """Point cache file name stem, set before baking so relinked external caches find the same files."""
+        return re.sub(r"[^A-Za-z0-9]+", "_", f"{self.object_name}_{self.modifier_name}").strip("_") or "cache"
+
+    def directory(self, bake_dir: Path) -> Path:
+        if self.kind == "point_cache":
+            return bake_dir / POINT_CACHE_DIRECTORY
+        # Object and modifier names may hold anything, the hash keeps directories apart and valid.
+        digest = hashlib.sha256(f"{self.object_name}\0{self.modifier_name}".encode()).hexdigest()[:12]
+        return bake_dir / self.kind / f"{self.cache_name()}-{digest}"
+
+
+def bake_key(blend_hash: str, versions: dict) -> str:
+    """sha256 over everything a bake depends on: the scene's content and the Blender build simulating it."""
+    inputs = {"format": SIM_CACHE_FORMAT_VERSION, "blend_sha256": blend_hash, "versions": versions}
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def read_bake_manifest(storage: RenderStorage, key: str) -> Optional[dict]:
+    """The manifest of a finished bake, None if there's none (or it's still running, the manifest is written last)."""
+    path = sim_cache_manifest_volume_path(key)
+    if not storage.exists(path):
+        return None
+    manifest = json.loads(storage.read_bytes(path))
+    return manifest if manifest.get("key") == key else None
+
+
+def bake_manifest(key: str, blend_hash: str, versions: dict, slots: List[CacheSlot], frame_range: Tuple[int, int], bake_seconds: float) -> dict:
+    return {
+        "key": key,
+        "blend_sha256": blend_hash,
+        "versions": versions,
+        "slots": [slot.as_dict() for slot in slots],
+        "frame_range": list(frame_range),
+        "bake_seconds": bake_seconds,
+        "baked_at": time.time(),
+    }
+
+
+def manifest_slots(manifest: dict) -> List[CacheSlot]:
+    return [CacheSlot.from_dict(slot) for slot in manifest["slots"]]
+
+
+# Blender side: everything below takes objects from bpy (or look-alikes in local/simulate_sim_cache.py).
+
+POINT_CACHE_MODIFIERS = ("PARTICLE_SYSTEM", "CLOTH", "SOFT_BODY")
+RIGID_BODY_WORLD = "RigidBodyWorld"
+
+
+def scene_cache_slots(bpy) -> List[Tuple[CacheSlot, object]]:
+    """Every cache of the scene with the settings that point at its files (domain settings, point cache or modifier)."""
+    slots = []
+    for obj in bpy.data.objects:
+        for modifier in obj.modifiers:
+            if modifier.type == "FLUID" and modifier.fluid_type == "DOMAIN":
+                slots.append((CacheSlot("fluid", obj.name, modifier.name), modifier.domain_settings))
+            elif modifier.type == "PARTICLE_SYSTEM":
+                slots.append((CacheSlot("point_cache", obj.name, modifier.name), modifier.particle_system.point_cache))
+            elif modifier.type in POINT_CACHE_MODIFIERS:
+                slots.append((CacheSlot("point_cache", obj.name, modifier.name), modifier.point_cache))
+            elif modifier.type == "NODES" and getattr(modifier, "bakes", None):
+                slots.append((CacheSlot("geometry_nodes", obj.name, modifier.name), modifier))
+    rigid_body_world = bpy.context.scene.rigidbody_world
+    if rigid_body_world is not None:
+        slots.append((CacheSlot("point_cache", RIGID_BODY_WORLD, RIGID_BODY_WORLD), rigid_body_world.point_cache))
+    return slots
+
+
+def prepare_for_bake(slot: CacheSlot, settings, bake_dir: Path):
+    """Points a cache at its directory in `bake_dir` before baking, with the layout relink_cache expects."""
+    if slot.kind == "fluid":
+        settings.cache_directory = str(slot.directory(bake_dir))
+        settings.cache_type = "ALL"
+    elif slot.kind == "point_cache":
+        settings.use_external = False
+        settings.use_disk_cache = True  # Into //blendcache_bake, next to the saved bake.blend
+        settings.name = slot.cache_name()
+    else:
+        settings.bake_directory = str(slot.directory(bake_dir))
+        for bake in settings.bakes:
+            bake.use_custom_path = False
+
+
+def relink_cache(slot: CacheSlot, settings, bake_dir: Path):
+    """Points a cache of a freshly opened scene at the baked files, so any frame reads it instead of simulating up to it."""
+    if slot.kind == "fluid":
+        settings.cache_directory = str(slot.directory(bake_dir))
+        # Replay reads whatever frames are on disk, without the "baked" flags only the baking session's .blend has.
+        settings.cache_type = "REPLAY"
+    elif slot.kind == "point_cache":
+        settings.use_external = True
+        settings.filepath = str(slot.directory(bake_dir))
+        settings.name = slot.cache_name()
+        settings.index = slot.file_index
+    else:
+        settings.bake_directory = str(slot.directory(bake_dir))
+        for bake in settings.bakes:
+            bake.use_custom_path = False
+
+
+def relink_scene_caches(bpy, bake_dir: Path, manifest: dict) -> Tuple[List[CacheSlot], List[CacheSlot]]:
+    """
+    Relinks every cache of the scene that the bake covers.
+
+    Returns:
+        tuple: The relinked slots, and the scene's slots the bake doesn't have (they simulate as before).
+    """
+    baked = {slot: slot for slot in manifest_slots(manifest)}
+    relinked, missing = [], []
+    for slot, settings in scene_cache_slots(bpy):
+        if slot in baked:
+            relink_cache(baked[slot], settings, bake_dir)
+            relinked.append(baked[slot])
+        else:
+            missing.append(slot)
+    return relinked, missing
+
+
+def bake_scene_caches(bpy, bake_dir: Path) -> List[CacheSlot]:
+    """
+    Bakes every simulation cache of the open scene into `bake_dir`, CPU only.
+
+    The scene is saved into `bake_dir` first: point caches can only bake next to their .blend.
+    """
+    if bake_dir.exists():
+        shutil.rmtree(bake_dir)  # Leftovers of an interrupted bake
+    bake_dir.mkdir(parents=True)
+    slots = scene_cache_slots(bpy)
+    for slot, settings in slots:
+        prepare_for_bake(slot, settings, bake_dir)
+    bpy.ops.wm.save_as_mainfile(filepath=str(bake_dir / BAKE_BLEND_NAME))
+
+    objects = bpy.data.objects
+    for slot, settings in slots:
+        started_at = time.monotonic()
+        if slot.kind == "fluid":
+            with bpy.context.temp_override(object=objects[slot.object_name], active_object=objects[slot.object_name]):
+                bpy.ops.fluid.bake_all()
+        elif slot.kind == "geometry_nodes":
+            # Bakes each simulation zone / Bake node of just this modifier (there's no per-object "bake all" operator in 4.2).
+            for bake in settings.bakes:
+                bpy.ops.object.geometry_node_bake_single(
+                    session_uid=objects[slot.object_name].session_uid, modifier_name=slot.modifier_name, bake_id=bake.bake_id)
+        else:
+            continue
+        print(f"Baked {slot} in {time.monotonic() - started_at:.1f}s")
+    if any(slot.kind == "point_cache" for slot, _ in slots):
+        started_at = time.monotonic()
+        bpy.ops.ptcache.bake_all(bake=True)
+        print(f"Baked point caches in {time.monotonic() - started_at:.1f}s")
+        record_point_cache_indices(slots)
+    return [slot for slot, _ in slots]
+
+
+def record_point_cache_indices(slots: List[Tuple[CacheSlot, object]]):
+    """Keeps the index each point cache got while baking, the reopened scene's caches start out without one."""
+    for slot, settings in slots:
+        if slot.kind == "point_cache":
+            slot.file_index = settings.index
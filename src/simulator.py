@@ -0,0 +1,281 @@
+import heapq
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from speculation import ChunkProgress, SpeculationPolicy, StragglerDetector
+
+
+class SimulationConfig:
+    """
+    Timing model for a render fleet.
+
+    Args:
+        cold_start_seconds: Container boot plus image pull, paid once per container.
+        scene_load_seconds: Addon verification, .blend load and device setup, paid per chunk
+            by render_sequence (once per worker in queue mode).
+        max_containers: Upper bound on concurrently running containers (render_sequence's max_containers).
+        scaledown_seconds: Billed idle time before an out-of-work container shuts down.
+    """
+
+    def __init__(self, cold_start_seconds: float = 60, scene_load_seconds: float = 45, max_containers: int = 40, scaledown_seconds: float = 60):
+        self.cold_start_seconds = cold_start_seconds
+        self.scene_load_seconds = scene_load_seconds
+        self.max_containers = max_containers
+        self.scaledown_seconds = scaledown_seconds
+
+    def __repr__(self):
+        return (f"SimulationConfig(cold_start_seconds={self.cold_start_seconds}, scene_load_seconds={self.scene_load_seconds}, "
+                f"max_containers={self.max_containers}, scaledown_seconds={self.scaledown_seconds})")
+
+
+class SimulationResult:
+    def __init__(self, makespan: float, gpu_seconds: float, render_seconds: float, container_count: int, container_finish_times: List[float]):
+        self.makespan = makespan
+        self.gpu_seconds = gpu_seconds
+        self.render_seconds = render_seconds
+        self.container_count = container_count
+        self.container_finish_times = container_finish_times
+
+    def __repr__(self):
+        return (f"SimulationResult(makespan={self.makespan:.0f}s, gpu_seconds={self.gpu_seconds:.0f}, "
+                f"idle_seconds={self.idle_seconds():.0f}, containers={self.container_count})")
+
+    def idle_seconds(self) -> float:
+        """Billed GPU time not spent rendering frames: cold starts, scene loads, waiting and scaledown."""
+        return self.gpu_seconds - self.render_seconds
+
+
+def chunk_cost(chunk: Tuple[int, int], start_frame: int, frame_costs: List[float]) -> float:
+    return sum(frame_costs[chunk[0] - start_frame:chunk[1] - start_frame + 1])
+
+
+def simulate_chunks(chunks: List[Tuple[int, int]], start_frame: int, frame_costs: List[float], config: SimulationConfig) -> SimulationResult:
+    """
+    Replays static chunks (one render_sequence input each) handed out in list order to the first free container.
+
+    Every chunk pays `scene_load_seconds`, every container pays `cold_start_seconds` once.
+    """
+    container_count = max(1, min(config.max_containers, len(chunks)))
+    # (time the container becomes free, container index)
+    free_at = [(config.cold_start_seconds, i) for i in range(container_count)]
+    heapq.heapify(free_at)
+    finish_times = [config.cold_start_seconds] * container_count
+    used = [False] * container_count
+    for chunk in chunks:
+        available_at, container = heapq.heappop(free_at)
+        finished_at = available_at + config.scene_load_seconds + chunk_cost(chunk, start_frame, frame_costs)
+        finish_times[container] = finished_at
+        used[container] = True
+        heapq.heappush(free_at, (finished_at, container))
+    return _result(finish_times, used, chunks, start_frame, frame_costs, config)
+
+
+def simulate_queue(batches: List[Tuple[int, int]], start_frame: int, frame_costs: List[float], workers: int, config: SimulationConfig) -> SimulationResult:
+    """Replays the pull-based frame queue: workers load the scene once, then pull batches until it's empty."""
+    container_count = max(1, min(config.max_containers, workers, len(batches)))
+    ready_at = config.cold_start_seconds + config.scene_load_seconds
+    free_at = [(ready_at, i) for i in range(container_count)]
+    heapq.heapify(free_at)
+    finish_times = [ready_at] * container_count
+    used = [False] * container_count
+    for batch in batches:
+        available_at, container = heapq.heappop(free_at)
+        finished_at = available_at + chunk_cost(batch, start_frame, frame_costs)
+        finish_times[container] = finished_at
+        used[container] = True
+        heapq.heappush(free_at, (finished_at, container))
+    return _result(finish_times, used, batches, start_frame, frame_costs, config)
+
+
+def _result(finish_times: List[float], used: List[bool], chunks: List[Tuple[int, int]], start_frame: int, frame_costs: List[float], config: SimulationConfig) -> SimulationResult:
+    finish_times = [finished_at for finished_at, was_used in zip(finish_times, used) if was_used]
+    gpu_seconds = sum(finished_at + config.scaledown_seconds for finished_at in finish_times)
+    render_seconds = sum(chunk_cost(chunk, start_frame, frame_costs) for chunk in chunks)
+    return SimulationResult(
+        makespan=max(finish_times) if finish_times else 0.0,
+        gpu_seconds=gpu_seconds,
+        render_seconds=render_seconds,
+        container_count=len(finish_times),
+        container_finish_times=finish_times
+    )
+
+
+def simulate_frame_times(chunk_frame_orders: List[List[int]], start_frame: int, frame_costs: List[float], config: SimulationConfig) -> Dict[int, float]:
+    """
+    Like simulate_chunks, but with each chunk given as its frames in rendering order, returning when every frame finishes.
+    """
+    container_count = max(1, min(config.max_containers, len(chunk_frame_orders)))
+    free_at = [(config.cold_start_seconds, i) for i in range(container_count)]
+    heapq.heapify(free_at)
+    frame_times = {}
+    for frames in chunk_frame_orders:
+        available_at, container = heapq.heappop(free_at)
+        finished_at = available_at + config.scene_load_seconds
+        for frame in frames:
+            finished_at += frame_costs[frame - start_frame]
+            frame_times[frame] = finished_at
+        heapq.heappush(free_at, (finished_at, container))
+    return frame_times
+
+
+def coverage_time(frame_times: Dict[int, float], start_frame: int, end_frame: int, max_gap: int) -> float:
+    """Earliest time at which no run of more than `max_gap - 1` consecutive frames (shot ends included) is still unrendered."""
+    done = bytearray(end_frame - start_frame + 1)
+    for frame, finished_at in sorted(frame_times.items(), key=lambda item: item[1]):
+        done[frame - start_frame] = 1
+        run = 0
+        for rendered in done:
+            run = 0 if rendered else run + 1
+            if run >= max_gap:
+                break
+        else:
+            return finished_at
+    return math.inf
+
+
+class SpeculationSimulationResult(SimulationResult):
+    def __init__(self, makespan: float, gpu_seconds: float, render_seconds: float, container_count: int, container_finish_times: List[float],
+                 duplicates: int, speculative_gpu_seconds: float, frames_completed: int):
+        super().__init__(makespan, gpu_seconds, render_seconds, container_count, container_finish_times)
+        self.duplicates = duplicates
+        self.frames_completed = frames_completed
+        self.speculative_gpu_seconds = speculative_gpu_seconds
+
+    def __repr__(self):
+        return (f"SpeculationSimulationResult(makespan={self.makespan:.0f}s, gpu_seconds={self.gpu_seconds:.0f}, "
+                f"duplicates={self.duplicates}, speculative_gpu_seconds={self.speculative_gpu_seconds:.0f}, containers={self.container_count})")
+
+
+class _SimulatedCopy:
+    def __init__(self, chunk_index: int, frames: List[int], frame_seconds: List[float], started_at: float, ready_at: float, duplicate: bool):
+        self.chunk_index = chunk_index
+        self.frames = frames  # In rendering order
+        self.finish_times = []
+        finished_at = ready_at
+        for seconds in frame_seconds:
+            finished_at += seconds
+            self.finish_times.append(finished_at)
+        self.started_at = started_at
+        self.duplicate = duplicate
+        self.estimate_gpu_seconds = 0.0  # What the detector reserved, for duplicates
+        self.position = 0
+
+
+def simulate_speculation(
+        chunks: List[Tuple[int, int]],
+        start_frame: int,
+        frame_costs: List[float],
+        config: SimulationConfig,
+        slowdowns: Dict[int, float],
+        policy: Optional[SpeculationPolicy] = None
+) -> SpeculationSimulationResult:
+    """
+    Replays static chunks where the containers of some chunks are slow (chunk index -> cost multiplier),
+    optionally backing up stragglers with the same StragglerDetector SpeculativeRunner uses.
+
+    Every copy, duplicates included, runs on its own new container within `max_containers`. Progress is
+    checked every `policy.poll_seconds`; a duplicate renders the remaining frames backwards until the two
+    copies meet, then both stop, or until the speculative GPU budget runs out.
+    """
+    poll_seconds = policy.poll_seconds if policy is not None else 30
+    detector = StragglerDetector(policy, len(chunks)) if policy is not None else None
+    pending = deque(range(len(chunks)))
+    running: List[_SimulatedCopy] = []
+    progress: Dict[int, ChunkProgress] = {}
+    speculated = set()
+    copy_finish_times: List[float] = []
+    gpu_seconds = speculative_gpu_seconds = 0.0
+    now = 0.0
+
+    while pending or running:
+        while pending and len(running) < config.max_containers:
+            index = pending.popleft()
+            chunk = chunks[index]
+            frames = list(range(chunk[0], chunk[1] + 1))
+            seconds = [frame_costs[frame - start_frame] * slowdowns.get(index, 1.0) for frame in frames]
+            running.append(_SimulatedCopy(index, frames, seconds, now, now + config.cold_start_seconds + config.scene_load_seconds, duplicate=False))
+            progress[index] = ChunkProgress(chunk[0], chunk[1], now)
+
+        now += poll_seconds
+        for copy in running:
+            while copy.position < len(copy.frames) and copy.finish_times[copy.position] <= now:
+                progress[copy.chunk_index].frame_done(copy.frames[copy.position], copy.finish_times[copy.position])
+                copy.position += 1
+
+        for index in {copy.chunk_index for copy in running}:
+            chunk_progress = progress[index]
+            if not chunk_progress.is_complete():
+                continue
+            finished_at = max(chunk_progress.done.values())
+            for copy in [copy for copy in running if copy.chunk_index == index]:
+                running.remove(copy)
+                copy_finish_times.append(finished_at)
+                gpu_seconds += finished_at - copy.started_at + config.scaledown_seconds
+                if copy.duplicate:
+                    speculative_gpu_seconds += finished_at - copy.started_at
+                    detector.settle(copy.estimate_gpu_seconds, finished_at - copy.started_at)
+            if detector is not None:
+                detector.chunk_finished(chunk_progress, finished_at)
+
+        if detector is None:
+            continue
+        for copy in [copy for copy in running if copy.duplicate]:
+            reservation = detector.extend_reservation(copy.estimate_gpu_seconds, now - copy.started_at)
+            if reservation is None:
+                # Out of budget: cancelled, the original carries on through the frames the duplicate didn't reach.
+                running.remove(copy)
+                copy_finish_times.append(now)
+                gpu_seconds += now - copy.started_at + config.scaledown_seconds
+                speculative_gpu_seconds += now - copy.started_at
+                detector.settle(copy.estimate_gpu_seconds, now - copy.started_at)
+            else:
+                copy.estimate_gpu_seconds = reservation
+        for copy in list(running):
+            index = copy.chunk_index
+            if index in speculated or len(running) >= config.max_containers or not detector.try_speculate(progress[index], now):
+                continue
+            speculated.add(index)
+            remaining = list(reversed(progress[index].remaining_frames()))
+            seconds = [frame_costs[frame - start_frame] for frame in remaining]
+            duplicate = _SimulatedCopy(index, remaining, seconds, now, now + config.cold_start_seconds + config.scene_load_seconds, duplicate=True)
+            duplicate.estimate_gpu_seconds = policy.duplicate_startup_seconds + len(remaining) * detector.p90_duration() / progress[index].frame_count()
+            running.append(duplicate)
+
+    return SpeculationSimulationResult(
+        makespan=max(copy_finish_times) if copy_finish_times else 0.0,
+        gpu_seconds=gpu_seconds,
+        render_seconds=sum(chunk_cost(chunk, start_frame, frame_costs) for chunk in chunks),
+        container_count=len(copy_finish_times),
+        container_finish_times=copy_finish_times,
+        duplicates=len(speculated),
+        speculative_gpu_seconds=speculative_gpu_seconds,
+        frames_completed=sum(len(chunk_progress.done) for chunk_progress in progress.values())
+    )
+
+
+# Canned per-frame cost profiles, in seconds per frame.
+
+def uniform_profile(frame_count: int, seconds_per_frame: float = 60) -> List[float]:
+    return [seconds_per_frame] * frame_count
+
+
+def ramp_profile(frame_count: int, low_seconds: float = 30, high_seconds: float = 240) -> List[float]:
+    """Cost grows linearly across the shot, eg. fire spreading until it fills the frame."""
+    if frame_count == 1:
+        return [low_seconds]
+    return [low_seconds + (high_seconds - low_seconds) * i / (frame_count - 1) for i in range(frame_count)]
+
+
+def spike_profile(frame_count: int, base_seconds: float = 40, spike_seconds: float = 360, spike_center: float = 0.6, spike_width: float = 0.1) -> List[float]:
+    """Cheap frames with a localized heavy section, eg. an explosion filling the frame for a few seconds."""
+    center = spike_center * frame_count
+    width = max(1.0, spike_width * frame_count)
+    return [base_seconds + (spike_seconds - base_seconds) * math.exp(-((i - center) / width) ** 2) for i in range(frame_count)]
+
+
+def benchmark_profiles(frame_count: int) -> dict:
+    return {
+        "uniform": uniform_profile(frame_count),
+        "ramp": ramp_profile(frame_count),
+        "spike": spike_profile(frame_count),
+    }
@@ -0,0 +1,290 @@
+import configparser
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from frame_verify import frame_file_pattern
+from job import JobChunk
+from progress import ChunkResult
+from storage import RenderStorage
+from telemetry import percentile
+
+
+class SpeculationPolicy:
+    """
+    Args:
+        slowdown_factor: A chunk is a straggler once its projected duration exceeds this multiple of the p90 duration of finished chunks.
+        min_finished_fraction: Share of chunks that must have finished before the p90 is trusted.
+        min_remaining_frames: Chunks closer than this to finishing aren't worth a duplicate's cold start.
+        max_speculative_gpu_seconds: Cap on GPU time spent by duplicates over the whole run, estimated up front and charged as they run.
+        poll_seconds: How often progress is checked.
+        duplicate_startup_seconds: Cold start plus scene load a duplicate pays before its first frame, for cost estimates.
+    """
+
+    def __init__(
+            self,
+            slowdown_factor: float = 1.5,
+            min_finished_fraction: float = 0.5,
+            min_remaining_frames: int = 2,
+            max_speculative_gpu_seconds: float = 2 * 60 * 60,
+            poll_seconds: float = 30,
+            duplicate_startup_seconds: float = 120
+    ):
+        self.slowdown_factor = slowdown_factor
+        self.min_finished_fraction = min_finished_fraction
+        self.min_remaining_frames = min_remaining_frames
+        self.max_speculative_gpu_seconds = max_speculative_gpu_seconds
+        self.poll_seconds = poll_seconds
+        self.duplicate_startup_seconds = duplicate_startup_seconds
+
+    def __repr__(self):
+        return (f"SpeculationPolicy(slowdown_factor={self.slowdown_factor}, min_finished_fraction={self.min_finished_fraction}, "
+                f"min_remaining_frames={self.min_remaining_frames}, max_speculative_gpu_seconds={self.max_speculative_gpu_seconds}, "
+                f"poll_seconds={self.poll_seconds}, duplicate_startup_seconds={self.duplicate_startup_seconds})")
+
+
+def speculation_policy_from_config(config: configparser.ConfigParser) -> SpeculationPolicy:
+    """Reads the optional [RUN] SPECULATION_SLOWDOWN, SPECULATION_MAX_GPU_HOURS and SPECULATION_POLL_SECONDS keys."""
+    return SpeculationPolicy(
+        slowdown_factor=config.getfloat("RUN", "SPECULATION_SLOWDOWN", fallback=1.5),
+        max_speculative_gpu_seconds=config.getfloat("RUN", "SPECULATION_MAX_GPU_HOURS", fallback=2) * 60 * 60,
+        poll_seconds=config.getfloat("RUN", "SPECULATION_POLL_SECONDS", fallback=30)
+    )
+
+
+class ChunkProgress:
+    """Frames of one chunk seen completed, from whichever copy rendered them."""
+
+    def __init__(self, start_frame: int, end_frame: int, started_at: float):
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.started_at = started_at
+        self.done: Dict[int, float] = {}  # frame -> when it was first seen
+        self.finished_at: Optional[float] = None
+
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame + 1
+
+    def frame_done(self, frame: int, at: float):
+        self.done.setdefault(frame, at)
+
+    def is_complete(self) -> bool:
+        return len(self.done) == self.frame_count()
+
+    def remaining_frames(self) -> List[int]:
+        return [frame for frame in range(self.start_frame, self.end_frame + 1) if frame not in self.done]
+
+    def projected_duration(self, now: float) -> float:
+        """Elapsed time scaled up by the share of frames still missing; just the elapsed time before the first frame."""
+        if self.finished_at is not None:
+            return self.finished_at - self.started_at
+        elapsed = now - self.started_at
+        if not self.done:
+            return elapsed
+        return elapsed * self.frame_count() / len(self.done)
+
+
+class StragglerDetector:
+    """
+    Decides which running chunks get a duplicate, shared by the real runner and the simulator.
+
+    Thread-safe, so every dispatcher thread can report into one instance.
+    """
+
+    def __init__(self, policy: SpeculationPolicy, chunk_count: int):
+        self.policy = policy
+        self.chunk_count = chunk_count
+        self.finished_durations: List[float] = []
+        self.reserved_gpu_seconds = 0.0
+        self.duplicates_launched = 0
+        self._lock = threading.Lock()
+
+    def chunk_finished(self, progress: ChunkProgress, at: float):
+        with self._lock:
+            progress.finished_at = at
+            self.finished_durations.append(at - progress.started_at)
+
+    def p90_duration(self) -> Optional[float]:
+        with self._lock:
+            if len(self.finished_durations) < max(1, self.policy.min_finished_fraction * self.chunk_count):
+                return None
+            return percentile(self.finished_durations, 0.9)
+
+    def try_speculate(self, progress: ChunkProgress, now: float) -> bool:
+        """True (and the duplicate's estimated cost reserved) if `progress` should get a duplicate now."""
+        p90 = self.p90_duration()
+        if p90 is None or progress.finished_at is not None:
+            return False
+        remaining = len(progress.remaining_frames())
+        if remaining < self.policy.min_remaining_frames:
+            return False
+        if progress.projected_duration(now) <= self.policy.slowdown_factor * p90:
+            return False
+
+        # A healthy container would take about p90 / frames per frame.
+        estimate = self.policy.duplicate_startup_seconds + remaining * p90 / progress.frame_count()
+        with self._lock:
+            if self.reserved_gpu_seconds + estimate > self.policy.max_speculative_gpu_seconds:
+                return False
+            self.reserved_gpu_seconds += estimate
+            self.duplicates_launched += 1
+        return True
+
+    def extend_reservation(self, reserved_gpu_seconds: float, elapsed_seconds: float) -> Optional[float]:
+        """
+        Grows a running duplicate's reservation to cover its next poll interval once it outruns the estimate.
+
+        Returns the new reservation, or None (and nothing changed) if that would pass the cap; the duplicate
+        must then be cancelled, which keeps the cap a hard limit even when estimates are too low.
+        """
+        needed = elapsed_seconds + self.policy.poll_seconds
+        if needed <= reserved_gpu_seconds:
+            return reserved_gpu_seconds
+        with self._lock:
+            if self.reserved_gpu_seconds + needed - reserved_gpu_seconds > self.policy.max_speculative_gpu_seconds:
+                return None
+            self.reserved_gpu_seconds += needed - reserved_gpu_seconds
+        return needed
+
+    def settle(self, estimate_gpu_seconds: float, actual_gpu_seconds: float):
+        """Replaces a duplicate's reserved estimate with what it actually ran for."""
+        with self._lock:
+            self.reserved_gpu_seconds += actual_gpu_seconds - estimate_gpu_seconds
+
+
+class FrameListing:
+    """Completed frames in a session's frames directory, listed at most once per `ttl_seconds` however many chunks ask."""
+
+    def __init__(self, storage: RenderStorage, frames_directory: str, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.storage = storage
+        self.frames_directory = frames_directory
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._names: set = set()
+        self._listed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def written_frames(self, job_chunk: JobChunk) -> set:
+        with self._lock:
+            if self._listed_at is None or self.clock() - self._listed_at >= self.ttl_seconds:
+                self._names = {entry.path.rsplit("/", 1)[-1] for entry in self.storage.listdir(self.frames_directory) if not entry.is_dir and entry.size > 0}
+                self._listed_at = self.clock()
+            names = self._names
+        pattern = frame_file_pattern(job_chunk.frame_file_prefix()[:-1])
+        frames = {int(match.group(1)) for name in names if (match := pattern.match(name))}
+        return {frame for frame in frames if job_chunk.chunk_start_frame <= frame <= job_chunk.chunk_end_frame}
+
+
+class ModalCallHandle:
+    """Wraps a modal.FunctionCall (from `.spawn`) so SpeculativeRunner can poll and cancel it."""
+
+    def __init__(self, function_call):
+        self.function_call = function_call
+
+    def poll(self, timeout: float) -> Tuple[bool, object]:
+        from modal.exception import TimeoutError as ModalTimeoutError
+        try:
+            return True, self.function_call.get(timeout=timeout)
+        except (TimeoutError, ModalTimeoutError):
+            return False, None
+
+    def cancel(self):
+        self.function_call.cancel()
+
+
+class SpeculativeRunner:
+    """
+    Render function for ChunkDispatcher that backs up stragglers.
+
+    Each chunk is spawned as usual. While it runs, its progress comes from the frames appearing in storage.
+    Once the detector flags it, a duplicate renders the chunk's remaining frames from the end backwards. When
+    the two meet, ie. every frame of the chunk exists, whichever copy is still running is cancelled. Frames
+    are renamed into place by both copies, so a frame rendered twice is simply replaced by an identical one.
+    """
+
+    def __init__(
+            self,
+            spawn: Callable[[JobChunk], object],
+            written_frames: Callable[[JobChunk], set],
+            detector: StragglerDetector,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.spawn = spawn
+        self.written_frames = written_frames
+        self.detector = detector
+        self.clock = clock
+        self.cancelled_copies = 0
+
+    def render(self, job_chunk: JobChunk) -> ChunkResult:
+        policy = self.detector.policy
+        progress = ChunkProgress(job_chunk.chunk_start_frame, job_chunk.chunk_end_frame, self.clock())
+        original = self.spawn(job_chunk)
+        duplicate, duplicate_started_at, duplicate_estimate = None, 0.0, 0.0
+        speculated = False  # At most one duplicate per chunk
+
+        def stop_duplicate(cancel: bool):
+            if duplicate is not None:
+                if cancel:
+                    duplicate.cancel()
+                    self.cancelled_copies += 1
+                self.detector.settle(duplicate_estimate, self.clock() - duplicate_started_at)
+
+        while True:
+            try:
+                done, result = original.poll(timeout=policy.poll_seconds if duplicate is None else 0)
+            except Exception:
+                stop_duplicate(cancel=True)
+                raise
+            if done:
+                stop_duplicate(cancel=True)
+                self.detector.chunk_finished(progress, self.clock())
+                return result
+
+            if duplicate is not None:
+                try:
+                    duplicate_done, _ = duplicate.poll(timeout=policy.poll_seconds)
+                except Exception as e:
+                    print(f"Duplicate of chunk {job_chunk.chunk_start_frame}-{job_chunk.chunk_end_frame} failed, keeping the original: {e!r}")
+                    stop_duplicate(cancel=False)
+                    duplicate, duplicate_done = None, False
+                if duplicate_done:
+                    stop_duplicate(cancel=False)
+                    duplicate = None
+                elif duplicate is not None:
+                    reservation = self.detector.extend_reservation(duplicate_estimate, self.clock() - duplicate_started_at)
+                    if reservation is None:
+                        print(f"Speculative GPU budget spent, cancelling the duplicate of chunk {job_chunk.chunk_start_frame}-{job_chunk.chunk_end_frame}")
+                        stop_duplicate(cancel=True)
+                        duplicate = None
+                    else:
+                        duplicate_estimate = reservation
+
+            now = self.clock()
+            for frame in self.written_frames(job_chunk):
+                progress.frame_done(frame, now)
+            if progress.is_complete():
+                # The copies met in the middle.
+                original.cancel()
+                self.cancelled_copies += 1
+                stop_duplicate(cancel=duplicate is not None)
+                self.detector.chunk_finished(progress, now)
+                print(f"Chunk {job_chunk.chunk_start_frame}-{job_chunk.chunk_end_frame} completed by its duplicate")
+                return ChunkResult(
+                    job_name=job_chunk.job.job_name,
+                    camera_name=job_chunk.job.camera_name,
+                    start_frame=job_chunk.chunk_start_frame,
+                    end_frame=job_chunk.chunk_end_frame,
+                    setup_seconds=0.0,
+                    render_seconds=now - progress.started_at,
+                    output_path=job_chunk.make_remote_frame_path()
+                )
+
+            if not speculated and self.detector.try_speculate(progress, now):
+                remaining = progress.remaining_frames()
+                duplicate_chunk = JobChunk(job=job_chunk.job, chunk_start_frame=remaining[0], chunk_end_frame=job_chunk.chunk_end_frame, region=job_chunk.region, reverse=True)
+                duplicate_estimate = policy.duplicate_startup_seconds + len(remaining) * self.detector.p90_duration() / progress.frame_count()
+                print(f"Chunk {job_chunk.chunk_start_frame}-{job_chunk.chunk_end_frame} is straggling "
+                      f"({len(progress.done)}/{progress.frame_count()} frames after {now - progress.started_at:.0f}s), "
+                      f"launching a duplicate for frames {duplicate_chunk.chunk_end_frame}-{duplicate_chunk.chunk_start_frame}")
+                duplicate = self.spawn(duplicate_chunk)
+                duplicate_started_at = now
+                speculated = True
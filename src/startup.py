@@ -0,0 +1,87 @@
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Local record of startup profiles, one JSON line per `modal run src/main.py::startup` run.
+STARTUP_HISTORY_PATH = Path("~/.cache/distributed-render/startup_history.jsonl").expanduser()
+
+
+class StartupProfile:
+    """
+    Cold start of one container split into phases, in seconds.
+
+    Phases before our code runs (queueing, image pull, container boot or snapshot restore) are measured
+    against the caller's `submitted_at`, so they include any clock skew between the two machines.
+    """
+
+    def __init__(self, variant: str, submitted_at: float, phases: Dict[str, float]):
+        self.variant = variant
+        self.phases = dict(phases)
+        self.submitted_at = submitted_at
+        self.ready_at: Optional[float] = None
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds:.2f}" for name, seconds in self.phases.items())
+        return f"StartupProfile(variant={self.variant}, {phases})"
+
+    def add(self, name: str, started_at: float):
+        self.phases[name] = self.phases.get(name, 0.0) + time.time() - started_at
+
+    def finish(self) -> dict:
+        self.ready_at = time.time()
+        return {"variant": self.variant, "phases": self.phases, "total": self.ready_at - self.submitted_at}
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True).stdout.strip()
+        return revision + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize_profiles(profiles: List[dict]) -> Dict[str, Dict[str, float]]:
+    """variant -> phase (and "total") -> median seconds across runs."""
+    summary = {}
+    for variant in dict.fromkeys(profile["variant"] for profile in profiles):
+        runs = [profile for profile in profiles if profile["variant"] == variant]
+        phase_names = dict.fromkeys(name for run in runs for name in run["phases"])
+        medians = {name: statistics.median(run["phases"][name] for run in runs if name in run["phases"]) for name in phase_names}
+        medians["total"] = statistics.median(run["total"] for run in runs)
+        summary[variant] = medians
+    return summary
+
+
+def append_startup_history(summary: Dict[str, Dict[str, float]], path: Path = STARTUP_HISTORY_PATH) -> dict:
+    entry = {"recorded_at": time.time(), "revision": git_revision(), "summary": summary}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_startup_history(path: Path = STARTUP_HISTORY_PATH) -> List[dict]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_startup_summary(summary: Dict[str, Dict[str, float]], previous: Optional[dict] = None):
+    for variant, medians in summary.items():
+        before = (previous or {}).get("summary", {}).get(variant, {})
+        print(f"{variant}:")
+        for name, seconds in medians.items():
+            delta = f" ({seconds - before[name]:+.2f}s vs {previous['revision']})" if name in before else ""
+            print(f"  {name:>24} {seconds:7.2f}s{delta}")
+
+
+def print_startup_history(history: List[dict], last: int = 10):
+    print(f"Startup history ({STARTUP_HISTORY_PATH}), median total seconds:")
+    for entry in history[-last:]:
+        totals = ", ".join(f"{variant} {medians['total']:.1f}s" for variant, medians in entry["summary"].items())
+        print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['recorded_at']))} {entry['revision']:>14}: {totals}")
@@ -0,0 +1,171 @@
+import io
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Union
+
+# Paths are relative to the Volume root, eg. "blobs/<hash>.blend" or "<session_id>/frames".
+StoragePath = Union[str, Path]
+
+
+class StorageEntry:
+    def __init__(self, path: str, size: int, is_dir: bool):
+        self.path = path
+        self.size = size
+        self.is_dir = is_dir
+
+    def __repr__(self):
+        return f"StorageEntry(path={self.path}, size={self.size}, is_dir={self.is_dir})"
+
+
+class RenderStorage:
+    """
+    Minimal file interface over the render Volume.
+
+    Orchestration code (uploads, downloads, verification) talks to this instead of modal.Volume,
+    so it can run against LocalDirectoryStorage in tests and benchmarks.
+    """
+
+    def listdir(self, path: StoragePath) -> List[StorageEntry]:
+        """Lists the direct children of `path`, or an empty list if it doesn't exist."""
+        raise NotImplementedError
+
+    def exists(self, path: StoragePath) -> bool:
+        raise NotImplementedError
+
+    def size(self, path: StoragePath) -> int:
+        raise NotImplementedError
+
+    def read_stream(self, path: StoragePath, offset: int = 0) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def put_file(self, local_path: Path, path: StoragePath):
+        raise NotImplementedError
+
+    def put_bytes(self, data: bytes, path: StoragePath):
+        raise NotImplementedError
+
+    def remove(self, path: StoragePath):
+        raise NotImplementedError
+
+    def copy(self, source: StoragePath, destination: StoragePath):
+        """Copies a file within the storage, without passing its bytes through the caller."""
+        raise NotImplementedError
+
+    def read_bytes(self, path: StoragePath) -> bytes:
+        return b"".join(self.read_stream(path))
+
+
+class LocalDirectoryStorage(RenderStorage):
+    """Stand-in for the Volume backed by a local directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _local(self, path: StoragePath) -> Path:
+        return self.root / str(path).lstrip("/")
+
+    def listdir(self, path: StoragePath) -> List[StorageEntry]:
+        directory = self._local(path)
+        if not directory.is_dir():
+            return []
+        entries = []
+        for entry in os.scandir(directory):
+            is_dir = entry.is_dir()
+            relative_path = str(Path(entry.path).relative_to(self.root))
+            entries.append(StorageEntry(path=relative_path, size=0 if is_dir else entry.stat().st_size, is_dir=is_dir))
+        return entries
+
+    def exists(self, path: StoragePath) -> bool:
+        return self._local(path).exists()
+
+    def size(self, path: StoragePath) -> int:
+        return self._local(path).stat().st_size
+
+    def read_stream(self, path: StoragePath, offset: int = 0) -> Iterator[bytes]:
+        with open(self._local(path), "rb") as f:
+            f.seek(offset)
+            while block := f.read(1024 * 1024):
+                yield block
+
+    def put_file(self, local_path: Path, path: StoragePath):
+        destination = self._local(path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_path, destination)
+
+    def put_bytes(self, data: bytes, path: StoragePath):
+        destination = self._local(path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(data)
+
+    def remove(self, path: StoragePath):
+        target = self._local(path)
+        if target.is_dir():
+            shutil.rmtree(target)
+        elif target.exists():
+            target.unlink()
+
+    def copy(self, source: StoragePath, destination: StoragePath):
+        target = self._local(destination)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._local(source), target)
+
+
+class ModalVolumeStorage(RenderStorage):
+    def __init__(self, volume):
+        # `volume` is a modal.Volume, passed in so this module doesn't need Modal installed.
+        self.volume = volume
+
+    def listdir(self, path: StoragePath) -> List[StorageEntry]:
+        from modal.exception import NotFoundError
+        from modal.volume import FileEntryType
+        try:
+            entries = self.volume.listdir(str(path))
+        except (FileNotFoundError, NotFoundError):
+            return []
+        return [
+            StorageEntry(path=entry.path, size=entry.size, is_dir=entry.type == FileEntryType.DIRECTORY)
+            for entry in entries
+        ]
+
+    def exists(self, path: StoragePath) -> bool:
+        return self._entry(path) is not None
+
+    def size(self, path: StoragePath) -> int:
+        entry = self._entry(path)
+        if entry is None:
+            raise FileNotFoundError(str(path))
+        return entry.size
+
+    def _entry(self, path: StoragePath):
+        path = Path(str(path).lstrip("/"))
+        parent = "/" if str(path.parent) == "." else path.parent
+        for entry in self.listdir(parent):
+            if Path(entry.path) == path:
+                return entry
+        return None
+
+    def read_stream(self, path: StoragePath, offset: int = 0) -> Iterator[bytes]:
+        # Volume reads can't seek, so the first `offset` bytes are streamed and dropped.
+        skip = offset
+        for block in self.volume.read_file(str(path)):
+            if skip >= len(block):
+                skip -= len(block)
+                continue
+            yield block[skip:]
+            skip = 0
+
+    def put_file(self, local_path: Path, path: StoragePath):
+        with self.volume.batch_upload(force=True) as batch:
+            batch.put_file(local_path, str(path))
+
+    def put_bytes(self, data: bytes, path: StoragePath):
+        with self.volume.batch_upload(force=True) as batch:
+            batch.put_file(io.BytesIO(data), str(path))
+
+    def remove(self, path: StoragePath):
+        self.volume.remove_file(str(path), recursive=True)
+
+    def copy(self, source: StoragePath, destination: StoragePath):
+        # Server-side copy, the frame data never leaves Modal.
+        self.volume.copy_files([str(source)], str(destination))
@@ -0,0 +1,254 @@
+import json
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Captured when the module is first imported, ie. as soon as the container starts running our code.
+CONTAINER_STARTED_AT = time.time()
+
+
+def process_started_at() -> float:
+    """When the Python process started, from /proc, so interpreter startup and earlier imports can be measured too."""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + int(fields[19]) / os.sysconf("SC_CLK_TCK")  # Field 22, starttime in clock ticks
+    except (OSError, ValueError, IndexError):
+        return CONTAINER_STARTED_AT
+
+
+PROCESS_STARTED_AT = process_started_at()
+
+
+class RenderTelemetry:
+    """
+    Collects one JSONL record per render call: setup phase timings plus per-frame render times and output sizes.
+    """
+
+    records_started = 0  # In this process, warm containers start one record per chunk
+
+    def __init__(self, job_name: str, session_id: str, camera_name: str, start_frame: int, end_frame: int, worker_id: Optional[str] = None, region_index: Optional[int] = None,
+                 container_started_at: Optional[float] = None):
+        """
+        `container_started_at` overrides the module level start times, which a memory snapshot restores from when
+        the snapshot was taken rather than when this container started. The process then counts as started at restore.
+        """
+        self.record = {
+            "job_name": job_name,
+            "session_id": session_id,
+            "camera_name": camera_name,
+            "start_frame": start_frame,
+            "end_frame": end_frame,
+            "worker_id": worker_id,
+            "region_index": region_index,
+            "process_started_at": container_started_at or PROCESS_STARTED_AT,
+            "container_started_at": container_started_at or CONTAINER_STARTED_AT,
+            "function_started_at": time.time(),
+            "function_finished_at": None,
+            "error": None,
+            # Only a container's first record pays for its start, later ones are billed from their own call.
+            "first_in_container": RenderTelemetry.records_started == 0,
+            "phases": {},
+            "frames": [],
+        }
+        self._frame_started_at: Optional[float] = None
+        self._handlers = []
+        RenderTelemetry.records_started += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        started_at = time.time()
+        try:
+            yield
+        finally:
+            self.record["phases"][name] = self.record["phases"].get(name, 0.0) + time.time() - started_at
+
+    def frame_started(self, frame: int):
+        self._frame_started_at = time.time()
+
+    def frame_finished(self, frame: int, camera_name: Optional[str] = None):
+        """`camera_name` tells apart the renders of one frame in multi-camera jobs."""
+        finished_at = time.time()
+        started_at = self._frame_started_at if self._frame_started_at is not None else finished_at
+        self.record["frames"].append({"frame": frame, "camera": camera_name, "started_at": started_at, "finished_at": finished_at, "output_bytes": None})
+        self._frame_started_at = None
+
+    def frame_written(self, frame: int, output_path: str):
+        for entry in reversed(self.record["frames"]):
+            if entry["frame"] == frame:
+                entry["output_bytes"] = os.path.getsize(output_path) if os.path.exists(output_path) else None
+                return
+
+    def install_handlers(self, bpy):
+        """Hooks render_pre/render_post/render_write so every frame of an animation render is timed."""
+        @bpy.app.handlers.persistent
+        def on_render_pre(scene, *args):
+            self.frame_started(scene.frame_current)
+
+        @bpy.app.handlers.persistent
+        def on_render_post(scene, *args):
+            self.frame_finished(scene.frame_current, scene.camera.name if scene.camera is not None else None)
+
+        @bpy.app.handlers.persistent
+        def on_render_write(scene, *args):
+            self.frame_written(scene.frame_current, scene.render.frame_path(frame=scene.frame_current))
+
+        self._handlers = [
+            (bpy.app.handlers.render_pre, on_render_pre),
+            (bpy.app.handlers.render_post, on_render_post),
+            (bpy.app.handlers.render_write, on_render_write),
+        ]
+        for handler_list, handler in self._handlers:
+            handler_list.append(handler)
+
+    def remove_handlers(self):
+        for handler_list, handler in self._handlers:
+            if handler in handler_list:
+                handler_list.remove(handler)
+        self._handlers = []
+
+    @contextmanager
+    def recording(self, bpy, directory: Path):
+        """
+        Times every frame rendered inside the block, then writes the record into `directory`.
+
+        Leaving the block (also on error) removes the handlers, so a warm container's next chunk isn't timed twice,
+        and still writes the record, with the error that ended it.
+        """
+        self.install_handlers(bpy)
+        try:
+            yield self
+        except BaseException as e:
+            self.record["error"] = repr(e)
+            raise
+        finally:
+            self.remove_handlers()
+            self.write(directory)
+
+    def write(self, directory: Path) -> Path:
+        self.record["function_finished_at"] = time.time()
+        directory.mkdir(parents=True, exist_ok=True)
+        record = self.record
+        path = directory / telemetry_file_name(record["job_name"], record["start_frame"], record["end_frame"], record["region_index"], record["worker_id"])
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return path
+
+
+def telemetry_file_name(job_name: str, start_frame: int, end_frame: int, region_index: Optional[int] = None, worker_id: Optional[str] = None) -> str:
+    """One JSONL file per chunk (or queue worker), each render call appending its record."""
+    name = f"{job_name}_{start_frame}-{end_frame}"
+    if region_index is not None:
+        name += f"_r{region_index:02d}"
+    if worker_id is not None:
+        name += f"_{worker_id}"
+    return f"{name}.jsonl"
+
+
+# Aggregation, used by local/telemetry_report.py
+
+def load_telemetry(directory: Path) -> List[dict]:
+    records = []
+    for path in sorted(Path(directory).glob("*.jsonl")):
+        with open(path) as f:
+            records += [json.loads(line) for line in f if line.strip()]
+    return records
+
+
+def first_frame_started_at(record: dict) -> float:
+    frames = record["frames"]
+    return frames[0]["started_at"] if frames else record["function_finished_at"]
+
+
+def billed_from(record: dict) -> float:
+    """The container start for a container's first record (and records from before the flag), else the record's own call."""
+    return record["container_started_at"] if record.get("first_in_container", True) else record["function_started_at"]
+
+
+def cold_start_overhead(record: dict) -> float:
+    """Seconds between the record's billing starting and its first frame starting to render."""
+    return first_frame_started_at(record) - billed_from(record)
+
+
+def billed_seconds(record: dict) -> float:
+    """Per record, so summing them over a warm container's records counts its time once."""
+    return record["function_finished_at"] - billed_from(record)
+
+
+def frame_costs(records: List[dict]) -> Dict[int, float]:
+    """
+    Median render seconds per frame across all records, in the format chunking.load_frame_costs reads.
+
+    A multi-camera record's renders of the same frame add up, chunks of such jobs render them all.
+    """
+    samples: Dict[int, List[float]] = {}
+    for record in records:
+        record_seconds: Dict[int, float] = {}
+        for frame in record["frames"]:
+            record_seconds[frame["frame"]] = record_seconds.get(frame["frame"], 0.0) + frame["finished_at"] - frame["started_at"]
+        for frame, seconds in record_seconds.items():
+            samples.setdefault(frame, []).append(seconds)
+    return {frame: statistics.median(seconds) for frame, seconds in sorted(samples.items())}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def stragglers(records: List[dict], threshold: float = 1.5) -> List[dict]:
+    """Records whose wall time exceeds `threshold` x the median record wall time."""
+    durations = [billed_seconds(record) for record in records]
+    if not durations:
+        return []
+    median = statistics.median(durations)
+    return [record for record, duration in zip(records, durations) if duration > threshold * median]
+
+
+def rendered_seconds(record: dict) -> float:
+    return sum(frame["finished_at"] - frame["started_at"] for frame in record["frames"])
+
+
+class EngineOverhead:
+    """Billed time of one render engine's records split into rendering and everything else (cold start, setup, writes)."""
+
+    def __init__(self, render_engine: str, records: List[dict]):
+        self.render_engine = render_engine
+        self.chunks = len(records)
+        self.frames = sum(len(record["frames"]) for record in records)
+        self.billed_seconds = sum(billed_seconds(record) for record in records)
+        self.render_seconds = sum(rendered_seconds(record) for record in records)
+
+    def overhead_seconds(self) -> float:
+        return self.billed_seconds - self.render_seconds
+
+    def overhead_ratio(self) -> float:
+        """Seconds of overhead per second of rendering."""
+        return self.overhead_seconds() / self.render_seconds if self.render_seconds else float("inf")
+
+    def overhead_per_chunk(self) -> float:
+        return self.overhead_seconds() / self.chunks if self.chunks else 0.0
+
+    def seconds_per_frame(self) -> float:
+        return self.render_seconds / self.frames if self.frames else 0.0
+
+    def chunk_size_for_overhead_share(self, share: float) -> int:
+        """Frames a chunk needs for its overhead to be at most `share` of its billed time, at the measured averages."""
+        if not self.seconds_per_frame():
+            return 0
+        return math.ceil(self.overhead_per_chunk() * (1 - share) / (share * self.seconds_per_frame()))
+
+
+def overhead_by_engine(records: List[dict]) -> Dict[str, EngineOverhead]:
+    """Records grouped by render engine, older records without one count as Cycles, the only engine they could use."""
+    grouped: Dict[str, List[dict]] = {}
+    for record in records:
+        grouped.setdefault(record.get("render_engine") or "CYCLES", []).append(record)
+    return {engine: EngineOverhead(engine, engine_records) for engine, engine_records in sorted(grouped.items())}
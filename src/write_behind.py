@@ -0,0 +1,127 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class WriteBehindStats:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.copy_seconds = 0.0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.blocked_seconds = 0.0  # Render loop time spent waiting on a full scratch directory
+        self.flush_seconds = 0.0  # Time spent draining the backlog after the last frame
+
+    def __repr__(self):
+        return (f"WriteBehindStats(frames={self.frames}, bytes={self.bytes}, copy_seconds={self.copy_seconds:.1f}, "
+                f"commits={self.commits}, commit_seconds={self.commit_seconds:.1f}, "
+                f"blocked_seconds={self.blocked_seconds:.1f}, flush_seconds={self.flush_seconds:.1f})")
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class WriteBehindUploader:
+    """
+    Moves frames rendered to container-local scratch onto the Volume mount on a background thread.
+
+    Each frame is copied to a hidden temp name next to its destination and renamed into place, so readers
+    never see a partial EXR, then removed from scratch. `commit` (eg. volume.commit) runs every `commit_every`
+    frames and on `flush`. When more than `max_pending_bytes` wait in scratch, `frame_ready` blocks the render
+    loop until the copier catches up.
+    """
+
+    def __init__(
+            self,
+            destination_dir: Path,
+            commit: Optional[Callable[[], None]] = None,
+            commit_every: int = 8,
+            max_pending_bytes: int = 4 * 1024 ** 3,
+            copy_file: Callable[[Path, Path], None] = shutil.copyfile
+    ):
+        self.destination_dir = Path(destination_dir)
+        self.commit = commit
+        self.commit_every = max(1, commit_every)
+        self.max_pending_bytes = max_pending_bytes
+        self.copy_file = copy_file
+        self.stats = WriteBehindStats()
+        self._queue = queue.Queue()
+        self._pending_bytes = 0
+        self._uncommitted = 0
+        self._condition = threading.Condition()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.destination_dir.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+
+    def frame_ready(self, path: Path):
+        """Queues a finished scratch frame, blocking while scratch holds more than max_pending_bytes."""
+        self._raise_copy_error()
+        size = os.path.getsize(path)
+        started_at = time.monotonic()
+        with self._condition:
+            while self._pending_bytes and self._pending_bytes + size > self.max_pending_bytes and self._error is None:
+                self._condition.wait()
+            self._pending_bytes += size
+        self.stats.blocked_seconds += time.monotonic() - started_at
+        self._queue.put(Path(path))
+
+    def flush(self) -> WriteBehindStats:
+        """Copies everything still queued, commits and stops the thread. Call before the function returns."""
+        started_at = time.monotonic()
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_copy_error()
+        if self._uncommitted:
+            self._commit()
+        self.stats.flush_seconds = time.monotonic() - started_at
+        return self.stats
+
+    def _run(self):
+        while (path := self._queue.get()) is not None:
+            if self._error is not None:
+                continue  # Keep draining so flush() can return and report the error
+            try:
+                self._copy(path)
+            except BaseException as e:
+                self._error = e
+                with self._condition:
+                    self._condition.notify_all()
+
+    def _copy(self, path: Path):
+        started_at = time.monotonic()
+        size = os.path.getsize(path)
+        destination = self.destination_dir / path.name
+        temporary = self.destination_dir / f".{path.name}.tmp"
+        self.copy_file(path, temporary)
+        os.replace(temporary, destination)
+        path.unlink()
+        self.stats.frames += 1
+        self.stats.bytes += size
+        self.stats.copy_seconds += time.monotonic() - started_at
+        with self._condition:
+            self._pending_bytes -= size
+            self._condition.notify_all()
+
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self._commit()
+
+    def _commit(self):
+        if self.commit is not None:
+            started_at = time.monotonic()
+            self.commit()
+            self.stats.commit_seconds += time.monotonic() - started_at
+            self.stats.commits += 1
+        self._uncommitted = 0
+
+    def _raise_copy_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Copying frames to {self.destination_dir} failed") from self._error